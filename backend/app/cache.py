@@ -0,0 +1,47 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache whose entries expire `ttl` seconds after being set.
+
+    Every entry gets the same TTL, so insertion order is also expiry order: when the cache
+    is full, expired entries are evicted first and then the oldest live ones, never the
+    whole cache at once.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if the key is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            # Re-inserted at the end so the dict stays ordered by expiry
+            self._entries.pop(key, None)
+            now = time.monotonic()
+            while self._entries:
+                oldest_key = next(iter(self._entries))
+                if len(self._entries) < self.maxsize and self._entries[oldest_key][0] >= now:
+                    break
+                del self._entries[oldest_key]
+            self._entries[key] = (now + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,5 +1,12 @@
 import os
-from supabase import create_client, Client
+import asyncio
+import random
+import threading
+import httpx
+import orjson
+from postgrest.exceptions import APIError
+from supabase import create_client, Client, ClientOptions
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
 from typing import Optional
 
@@ -9,17 +16,105 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Connection pool for the shared client. Supabase's pooler allows few connections per
+# client, so keep the pool small and the connections warm instead of re-handshaking TLS
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 60.0
+HTTP_TIMEOUT = 10.0
+
+# SQLSTATEs worth retrying: connection exceptions (08), insufficient resources (53),
+# operator intervention such as a shutdown or crash (57P), serialization failure and deadlock
+TRANSIENT_SQLSTATES = ("08", "53", "57P", "40001", "40P01")
+RETRY_BASE_DELAY = 0.1
+
 _supabase_client: Optional[Client] = None
+_supabase_client_lock = threading.Lock()
+
+_async_supabase_client: Optional[AsyncClient] = None
+_async_supabase_client_lock: Optional[asyncio.Lock] = None
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+class _OrjsonResponse(httpx.Response):
+    """Response whose json() decodes with orjson; postgrest builds response.data from json()."""
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers' handlers still match
+        return orjson.loads(self.content)
+
+def _orjson_response(response: httpx.Response, request: httpx.Request) -> _OrjsonResponse:
+    return _OrjsonResponse(
+        response.status_code,
+        headers=response.headers,
+        stream=response.stream,
+        extensions=response.extensions,
+        request=request,
+    )
+
+class _OrjsonTransport(httpx.HTTPTransport):
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return _orjson_response(super().handle_request(request), request)
+
+class _AsyncOrjsonTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return _orjson_response(await super().handle_async_request(request), request)
+
+def is_transient_error(error: Exception) -> bool:
+    """Network failures and Postgres connection, resource and concurrency errors are worth retrying."""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, APIError):
+        return bool(error.code) and str(error.code).startswith(TRANSIENT_SQLSTATES)
+    return False
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait after failed attempt `attempt` (1-based): exponential backoff plus jitter."""
+    return RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, RETRY_BASE_DELAY)
 
 def get_supabase_client() -> Client:
-    """Get or create Supabase client instance."""
+    """Get or create the shared Supabase client instance (thread-safe, pooled HTTP/2, orjson decoding)."""
     global _supabase_client
     if _supabase_client is None:
-        if not SUPABASE_URL or not SUPABASE_KEY:
-            raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        with _supabase_client_lock:
+            if _supabase_client is None:
+                if not SUPABASE_URL or not SUPABASE_KEY:
+                    raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
+                http_client = httpx.Client(
+                    transport=_OrjsonTransport(http2=True, limits=_http_limits()),
+                    timeout=httpx.Timeout(HTTP_TIMEOUT),
+                )
+                _supabase_client = create_client(
+                    SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client)
+                )
     return _supabase_client
 
+async def get_async_supabase_client() -> AsyncClient:
+    """Get or create the shared async Supabase client instance (pooled HTTP/2, orjson decoding) for use in coroutines."""
+    global _async_supabase_client, _async_supabase_client_lock
+    if _async_supabase_client is None:
+        if _async_supabase_client_lock is None:
+            _async_supabase_client_lock = asyncio.Lock()
+        async with _async_supabase_client_lock:
+            if _async_supabase_client is None:
+                if not SUPABASE_URL or not SUPABASE_KEY:
+                    raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
+                http_client = httpx.AsyncClient(
+                    transport=_AsyncOrjsonTransport(http2=True, limits=_http_limits()),
+                    timeout=httpx.Timeout(HTTP_TIMEOUT),
+                )
+                _async_supabase_client = await acreate_client(
+                    SUPABASE_URL, SUPABASE_KEY, options=AsyncClientOptions(httpx_client=http_client)
+                )
+    return _async_supabase_client
+
 # For backward compatibility with SQLAlchemy-based code
 # This is a dummy Base class that won't be used but prevents import errors
 class DummyBase:
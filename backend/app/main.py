@@ -1,9 +1,16 @@
 import os
+import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 
+# Service modules log through the logging module; debug output is off unless LOG_LEVEL=DEBUG
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 # Import routers
 from .routers import users, element_list, element_regulations, file_management, regulations, data_processing, utilities, projects, files, wall_extraction, pdf_parser, categories, boqs, custom_positions
 app = FastAPI(
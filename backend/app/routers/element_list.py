@@ -5,16 +5,22 @@ This module contains all API endpoints related to element list management.
 Provides CRUD operations for elements in the element_list table.
 """
 
-from fastapi import APIRouter, HTTPException, Body
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+from ..schemas import ElementCreate, ElementBulkCreate, ElementUpdate
 from ..services.element_list_service import (
     create_element,
+    create_elements_bulk,
     get_element_by_id,
     get_elements_by_user_id,
+    list_element_summaries,
     get_elements_by_type,
     get_elements_by_user_and_type,
     search_elements_by_name,
     get_all_elements,
+    get_elements_after,
     update_element,
     delete_element,
     delete_elements_by_user_id,
@@ -36,9 +42,7 @@ router = APIRouter(
 
 # CREATE Operations
 @router.post("/")
-async def create_element_endpoint(
-    element_data: Dict[str, Any] = Body(...)
-):
+async def create_element_endpoint(element: ElementCreate):
     """
     Create a new element.
     
@@ -49,34 +53,12 @@ async def create_element_endpoint(
     
     Optional fields:
     - description: Description of the element
+    - category_id: UUID of the category this element belongs to
     """
     try:
-        # Validate required fields
-        required_fields = ["name", "type", "user_id"]
-        for field in required_fields:
-            if field not in element_data:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Missing required field: {field}"
-                )
-        
-        name = element_data["name"]
-        element_type = element_data["type"]
-        user_id = element_data["user_id"]
-        description = element_data.get("description")
-        category_id = element_data.get("category_id")
-
-        # Validate field values
-        if not name or not name.strip():
-            raise HTTPException(status_code=400, detail="Element name cannot be empty")
-
-        if not element_type or not element_type.strip():
-            raise HTTPException(status_code=400, detail="Element type cannot be empty")
-
-        if not user_id or not user_id.strip():
-            raise HTTPException(status_code=400, detail="User ID cannot be empty")
-
-        result = create_element(name, element_type, user_id, description, category_id)
+        result = await create_element(
+            element.name, element.type, element.user_id, element.description, element.category_id
+        )
         
         if result["success"]:
             return {
@@ -91,14 +73,85 @@ async def create_element_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating element: {str(e)}")
 
+@router.post("/bulk")
+async def create_elements_bulk_endpoint(request_data: ElementBulkCreate):
+    """
+    Create many elements in a single request.
+    
+    Required fields:
+    - elements: Non-empty list of element objects, each with name, type and user_id
+      (description and category_id are optional)
+    """
+    try:
+        result = await create_elements_bulk([element.model_dump() for element in request_data.elements])
+        
+        if result["success"]:
+            return {
+                "message": f"Created {result['created_count']} elements",
+                "elements": result["data"],
+                "created_count": result["created_count"]
+            }
+        else:
+            raise HTTPException(status_code=400, detail=result["error"])
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating elements: {str(e)}")
+
 # READ Operations
+@router.get("/cursor/")
+async def get_elements_after_endpoint(
+    cursor_updated_at: Optional[datetime] = None,
+    cursor_id: Optional[UUID] = None,
+    limit: int = 100
+):
+    """
+    Retrieve elements newest-first with keyset (cursor) pagination.
+    
+    Both cursor values are parsed by FastAPI, so a malformed cursor is rejected with 422
+    before it reaches the PostgREST filter.
+    
+    Args:
+        cursor_updated_at: updated_at from the previous page's next_cursor (omit for the first page)
+        cursor_id: id from the previous page's next_cursor (omit for the first page)
+        limit: Maximum number of elements to return (default: 100)
+    """
+    try:
+        if limit < 1 or limit > 1000:
+            raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000")
+        
+        if (cursor_updated_at is None) != (cursor_id is None):
+            raise HTTPException(status_code=400, detail="cursor_updated_at and cursor_id must be given together")
+        
+        result = await get_elements_after(
+            cursor_updated_at.isoformat() if cursor_updated_at else None,
+            str(cursor_id) if cursor_id else None,
+            limit
+        )
+        
+        if result["success"]:
+            return {
+                "elements": result["data"],
+                "count": result["count"],
+                "limit": limit,
+                "next_cursor": result["next_cursor"]
+            }
+        else:
+            raise HTTPException(status_code=500, detail=result["error"])
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving elements: {str(e)}")
+
 @router.get("/{element_id}")
 async def get_element_endpoint(element_id: str):
     """
     Retrieve an element by its ID.
     """
     try:
-        result = get_element_by_id(element_id)
+        result = await get_element_by_id(element_id)
         
         if result["success"]:
             return result["data"]
@@ -131,7 +184,7 @@ async def get_elements_by_user_endpoint(
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_elements_by_user_with_regulation_counts(user_id, limit, offset)
+        result = await get_elements_by_user_with_regulation_counts(user_id, limit, offset)
         
         if result["success"]:
             return {
@@ -139,7 +192,7 @@ async def get_elements_by_user_endpoint(
                 "count": result["count"],
                 "limit": limit,
                 "offset": offset,
-                "total_elements_for_user": get_element_count_by_user(user_id)
+                "total_elements_for_user": result["total"]
             }
         else:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -149,6 +202,44 @@ async def get_elements_by_user_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving elements for user: {str(e)}")
 
+@router.get("/user/{user_id}/summaries")
+async def list_element_summaries_endpoint(
+    user_id: str,
+    limit: int = 100,
+    offset: int = 0
+):
+    """
+    Retrieve a compact list (id, name, type, category_id, updated_at) of a user's elements.
+    
+    Args:
+        user_id: UUID of the user whose elements to retrieve
+        limit: Maximum number of elements to return (default: 100)
+        offset: Number of elements to skip (default: 0)
+    """
+    try:
+        if limit < 1 or limit > 1000:
+            raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000")
+        
+        if offset < 0:
+            raise HTTPException(status_code=400, detail="Offset must be non-negative")
+        
+        result = await list_element_summaries(user_id, limit, offset)
+        
+        if result["success"]:
+            return {
+                "elements": result["data"],
+                "count": result["count"],
+                "limit": limit,
+                "offset": offset
+            }
+        else:
+            raise HTTPException(status_code=500, detail=result["error"])
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving element summaries for user: {str(e)}")
+
 @router.get("/type/{element_type}")
 async def get_elements_by_type_endpoint(
     element_type: str,
@@ -170,7 +261,7 @@ async def get_elements_by_type_endpoint(
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_elements_by_type(element_type, limit, offset)
+        result = await get_elements_by_type(element_type, limit, offset)
         
         if result["success"]:
             return {
@@ -179,7 +270,7 @@ async def get_elements_by_type_endpoint(
                 "element_type": element_type,
                 "limit": limit,
                 "offset": offset,
-                "total_elements_of_type": get_element_count_by_type(element_type)
+                "total_elements_of_type": result["total"]
             }
         else:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -212,7 +303,7 @@ async def get_elements_by_user_and_type_endpoint(
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_elements_by_user_and_type(user_id, element_type, limit, offset)
+        result = await get_elements_by_user_and_type(user_id, element_type, limit, offset)
         
         if result["success"]:
             return {
@@ -236,7 +327,8 @@ async def search_elements_endpoint(
     search_term: str,
     user_id: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    user_ids: Optional[List[str]] = Query(None)
 ):
     """
     Search elements by name using case-insensitive pattern matching.
@@ -246,6 +338,7 @@ async def search_elements_endpoint(
         user_id: Optional user ID to limit search to specific user's elements
         limit: Maximum number of elements to return (default: 100)
         offset: Number of elements to skip (default: 0)
+        user_ids: Optional repeated query parameter to search several users' elements at once
     """
     try:
         if not search_term or not search_term.strip():
@@ -257,7 +350,7 @@ async def search_elements_endpoint(
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = search_elements_by_name(search_term.strip(), user_id, limit, offset)
+        result = await search_elements_by_name(search_term.strip(), user_id, limit, offset, user_ids)
         
         if result["success"]:
             return {
@@ -265,6 +358,7 @@ async def search_elements_endpoint(
                 "count": result["count"],
                 "search_term": search_term,
                 "user_id": user_id,
+                "user_ids": user_ids,
                 "limit": limit,
                 "offset": offset
             }
@@ -292,7 +386,7 @@ async def get_all_elements_endpoint(limit: int = 100, offset: int = 0):
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_elements_with_regulation_counts(limit, offset)
+        result = await get_elements_with_regulation_counts(limit, offset)
         
         if result["success"]:
             return {
@@ -300,7 +394,7 @@ async def get_all_elements_endpoint(limit: int = 100, offset: int = 0):
                 "count": result["count"],
                 "limit": limit,
                 "offset": offset,
-                "total_elements": get_total_element_count()
+                "total_elements": result["total"]
             }
         else:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -326,7 +420,7 @@ async def get_elements_with_user_info_endpoint(limit: int = 100, offset: int = 0
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_elements_with_user_info(limit, offset)
+        result = await get_elements_with_user_info(limit, offset)
         
         if result["success"]:
             return {
@@ -347,30 +441,21 @@ async def get_elements_with_user_info_endpoint(limit: int = 100, offset: int = 0
 @router.put("/{element_id}")
 async def update_element_endpoint(
     element_id: str,
-    update_data: Dict[str, Any] = Body(...)
+    update_data: ElementUpdate
 ):
     """
     Update element information.
     
     Optional fields:
     - name: New element name (must not be empty if provided)
-    - description: New description (can be None to clear)
+    - description: New description (empty string clears it)
     - type: New element type (must not be empty if provided)
+    - category_id: New category ID (empty string clears it)
     """
     try:
-        name = update_data.get("name")
-        description = update_data.get("description")
-        element_type = update_data.get("type")
-        category_id = update_data.get("category_id")
-        
-        # Validate fields if provided
-        if name is not None and (not name or not name.strip()):
-            raise HTTPException(status_code=400, detail="Element name cannot be empty")
-        
-        if element_type is not None and (not element_type or not element_type.strip()):
-            raise HTTPException(status_code=400, detail="Element type cannot be empty")
-        
-        result = update_element(element_id, name, description, element_type, category_id)
+        result = await update_element(
+            element_id, update_data.name, update_data.description, update_data.type, update_data.category_id
+        )
         
         if result["success"]:
             return {
@@ -394,7 +479,7 @@ async def delete_element_endpoint(element_id: str):
     Note: This will cascade delete all related element_regulations records.
     """
     try:
-        result = delete_element(element_id)
+        result = await delete_element(element_id)
         
         if result["success"]:
             return {"message": result["message"]}
@@ -414,7 +499,7 @@ async def delete_elements_by_user_endpoint(user_id: str):
     Note: This will cascade delete all related element_regulations records.
     """
     try:
-        result = delete_elements_by_user_id(user_id)
+        result = await delete_elements_by_user_id(user_id)
         
         if result["success"]:
             return {
@@ -436,7 +521,7 @@ async def get_total_element_count_endpoint():
     Get the total number of elements in the database.
     """
     try:
-        count = get_total_element_count()
+        count = await get_total_element_count()
         return {"total_elements": count}
         
     except Exception as e:
@@ -448,7 +533,7 @@ async def get_element_count_by_user_endpoint(user_id: str):
     Get the total number of elements for a specific user.
     """
     try:
-        count = get_element_count_by_user(user_id)
+        count = await get_element_count_by_user(user_id)
         return {"user_id": user_id, "element_count": count}
         
     except Exception as e:
@@ -460,7 +545,7 @@ async def get_element_count_by_type_endpoint(element_type: str):
     Get the total number of elements of a specific type.
     """
     try:
-        count = get_element_count_by_type(element_type)
+        count = await get_element_count_by_type(element_type)
         return {"element_type": element_type, "element_count": count}
         
     except Exception as e:
@@ -472,7 +557,7 @@ async def get_unique_element_types_endpoint():
     Get all unique element types in the database.
     """
     try:
-        types = get_unique_element_types()
+        types = await get_unique_element_types()
         return {"element_types": types, "count": len(types)}
         
     except Exception as e:
@@ -484,7 +569,7 @@ async def check_element_exists_endpoint(element_id: str):
     Check if an element exists in the database.
     """
     try:
-        exists = check_element_exists(element_id)
+        exists = await check_element_exists(element_id)
         return {"element_id": element_id, "exists": exists}
         
     except Exception as e:
@@ -5,8 +5,13 @@ This module contains all API endpoints related to element-regulation relationshi
 Provides CRUD operations for the many-to-many relationship between elements and regulations.
 """
 
-from fastapi import APIRouter, HTTPException, Body
+import orjson
+from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from typing import Dict, Any, List
+from ..schemas import ElementCreate
 from ..services.element_regulations_service import (
     create_element_regulation_link,
     create_multiple_element_regulation_links,
@@ -16,6 +21,7 @@ from ..services.element_regulations_service import (
     get_element_regulation_links_by_user,
     check_element_regulation_link_exists,
     get_all_element_regulation_links,
+    iter_all_element_regulation_links,
     delete_element_regulation_link,
     delete_element_regulation_link_by_ids,
     delete_all_links_for_element,
@@ -24,6 +30,8 @@ from ..services.element_regulations_service import (
     get_element_regulation_link_count,
     get_regulation_count_for_element,
     get_element_count_for_regulation,
+    get_regulation_counts_for_elements,
+    get_element_counts_for_regulations,
     get_most_linked_regulations,
     get_most_linked_elements
 )
@@ -66,20 +74,17 @@ async def create_element_regulation_link_endpoint(
         if not regulation_id or not isinstance(regulation_id, int):
             raise HTTPException(status_code=400, detail="Regulation ID must be a valid integer")
         
-        # Check if link already exists
-        if check_element_regulation_link_exists(str(element_id), regulation_id):
-            raise HTTPException(
-                status_code=409,
-                detail="Link between element and regulation already exists"
-            )
-        
-        result = create_element_regulation_link(str(element_id), regulation_id)
+        # The insert is idempotent (ON CONFLICT DO NOTHING) and reports an existing link,
+        # so there is no separate existence check that could race with another request
+        result = await create_element_regulation_link(str(element_id), regulation_id)
         
         if result["success"]:
             return {
                 "message": "Element-regulation link created successfully",
                 "link": result["data"]
             }
+        elif result.get("duplicate"):
+            raise HTTPException(status_code=409, detail=result["error"])
         else:
             raise HTTPException(status_code=400, detail=result["error"])
             
@@ -122,7 +127,7 @@ async def create_multiple_element_regulation_links_endpoint(
         if not all(isinstance(reg_id, int) for reg_id in regulation_ids):
             raise HTTPException(status_code=400, detail="All regulation IDs must be valid integers")
         
-        result = create_multiple_element_regulation_links(str(element_id), regulation_ids)
+        result = await create_multiple_element_regulation_links(str(element_id), regulation_ids)
         
         if result["success"]:
             return {
@@ -163,13 +168,12 @@ async def create_element_with_multiple_regulations_endpoint(
         regulation_ids = request_data.get("regulation_ids", [])
         
         # Validate element data
-        required_element_fields = ["name", "type", "user_id"]
-        for field in required_element_fields:
-            if field not in element_data:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Missing required element field: {field}"
-                )
+        try:
+            element = ElementCreate.model_validate(element_data)
+        except ValidationError as e:
+            # Same 422 body FastAPI returns for a body that fails its declared model
+            errors = [{**error, "loc": ("body", "element", *error["loc"])} for error in e.errors(include_url=False)]
+            raise HTTPException(status_code=422, detail=jsonable_encoder(errors))
         
         # Validate regulation_ids if provided
         if regulation_ids and not isinstance(regulation_ids, list):
@@ -180,7 +184,7 @@ async def create_element_with_multiple_regulations_endpoint(
         
         from ..services.element_regulations_service import create_element_with_multiple_regulations
         
-        result = create_element_with_multiple_regulations(element_data, regulation_ids)
+        result = await create_element_with_multiple_regulations(element.model_dump(), regulation_ids)
         
         if result["success"]:
             response = {
@@ -195,9 +199,6 @@ async def create_element_with_multiple_regulations_endpoint(
                 response["created_links_count"] = result["created_links_count"]
                 response["requested_links_count"] = result["requested_links_count"]
             
-            if "warning" in result:
-                response["warning"] = result["warning"]
-            
             return response
         else:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -208,13 +209,27 @@ async def create_element_with_multiple_regulations_endpoint(
         raise HTTPException(status_code=500, detail=f"Error creating element with regulations: {str(e)}")
 
 # READ Operations
+@router.get("/export")
+async def export_element_regulation_links_endpoint():
+    """
+    Stream all element-regulation links as newline-delimited JSON, one link per line.
+    
+    Links are fetched page by page while the response is written, so large exports do not
+    have to fit in memory.
+    """
+    async def ndjson_lines():
+        async for link in iter_all_element_regulation_links():
+            yield orjson.dumps(link) + b"\n"
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 @router.get("/{link_id}")
 async def get_element_regulation_link_endpoint(link_id: str):
     """
     Retrieve a specific element-regulation link by its ID.
     """
     try:
-        result = get_element_regulation_link_by_id(link_id)
+        result = await get_element_regulation_link_by_id(link_id)
         
         if result["success"]:
             return result["data"]
@@ -232,7 +247,7 @@ async def get_regulations_by_element_endpoint(element_id: str):
     Retrieve all regulations linked to a specific element.
     """
     try:
-        result = get_regulations_by_element_id(element_id)
+        result = await get_regulations_by_element_id(element_id)
         
         if result["success"]:
             return {
@@ -254,7 +269,7 @@ async def get_elements_by_regulation_endpoint(regulation_id: int):
     Retrieve all elements linked to a specific regulation.
     """
     try:
-        result = get_elements_by_regulation_id(regulation_id)
+        result = await get_elements_by_regulation_id(regulation_id)
         
         if result["success"]:
             return {
@@ -291,7 +306,7 @@ async def get_element_regulation_links_by_user_endpoint(
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_element_regulation_links_by_user(user_id, limit, offset)
+        result = await get_element_regulation_links_by_user(user_id, limit, offset)
         
         if result["success"]:
             return {
@@ -325,7 +340,7 @@ async def get_all_element_regulation_links_endpoint(limit: int = 100, offset: in
         if offset < 0:
             raise HTTPException(status_code=400, detail="Offset must be non-negative")
         
-        result = get_all_element_regulation_links(limit, offset)
+        result = await get_all_element_regulation_links(limit, offset)
         
         if result["success"]:
             return {
@@ -333,7 +348,7 @@ async def get_all_element_regulation_links_endpoint(limit: int = 100, offset: in
                 "count": result["count"],
                 "limit": limit,
                 "offset": offset,
-                "total_links": get_element_regulation_link_count()
+                "total_links": await get_element_regulation_link_count()
             }
         else:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -349,7 +364,7 @@ async def check_element_regulation_link_exists_endpoint(element_id: str, regulat
     Check if a link between an element and regulation already exists.
     """
     try:
-        exists = check_element_regulation_link_exists(element_id, regulation_id)
+        exists = await check_element_regulation_link_exists(element_id, regulation_id)
         return {
             "element_id": element_id,
             "regulation_id": regulation_id,
@@ -366,7 +381,7 @@ async def delete_element_regulation_link_endpoint(link_id: str):
     Delete a specific element-regulation link by its ID.
     """
     try:
-        result = delete_element_regulation_link(link_id)
+        result = await delete_element_regulation_link(link_id)
         
         if result["success"]:
             return {"message": result["message"]}
@@ -384,7 +399,7 @@ async def delete_element_regulation_link_by_ids_endpoint(element_id: str, regula
     Delete a specific element-regulation link by element and regulation IDs.
     """
     try:
-        result = delete_element_regulation_link_by_ids(element_id, regulation_id)
+        result = await delete_element_regulation_link_by_ids(element_id, regulation_id)
         
         if result["success"]:
             return {"message": result["message"]}
@@ -402,7 +417,7 @@ async def delete_all_links_for_element_endpoint(element_id: str):
     Delete all regulation links for a specific element.
     """
     try:
-        result = delete_all_links_for_element(element_id)
+        result = await delete_all_links_for_element(element_id)
         
         if result["success"]:
             return {
@@ -423,7 +438,7 @@ async def delete_all_links_for_regulation_endpoint(regulation_id: int):
     Delete all element links for a specific regulation.
     """
     try:
-        result = delete_all_links_for_regulation(regulation_id)
+        result = await delete_all_links_for_regulation(regulation_id)
         
         if result["success"]:
             return {
@@ -455,7 +470,7 @@ async def delete_multiple_element_regulation_links_endpoint(
         if not all(isinstance(reg_id, int) for reg_id in regulation_ids):
             raise HTTPException(status_code=400, detail="All regulation IDs must be valid integers")
         
-        result = delete_multiple_element_regulation_links(element_id, regulation_ids)
+        result = await delete_multiple_element_regulation_links(element_id, regulation_ids)
         
         if result["success"]:
             response = {
@@ -480,7 +495,7 @@ async def get_element_regulation_link_count_endpoint():
     Get the total number of element-regulation links in the database.
     """
     try:
-        count = get_element_regulation_link_count()
+        count = await get_element_regulation_link_count()
         return {"total_links": count}
         
     except Exception as e:
@@ -492,7 +507,7 @@ async def get_regulation_count_for_element_endpoint(element_id: str):
     Get the number of regulations linked to a specific element.
     """
     try:
-        count = get_regulation_count_for_element(element_id)
+        count = await get_regulation_count_for_element(element_id)
         return {"element_id": element_id, "regulation_count": count}
         
     except Exception as e:
@@ -504,12 +519,40 @@ async def get_element_count_for_regulation_endpoint(regulation_id: int):
     Get the number of elements linked to a specific regulation.
     """
     try:
-        count = get_element_count_for_regulation(regulation_id)
+        count = await get_element_count_for_regulation(regulation_id)
         return {"regulation_id": regulation_id, "element_count": count}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting element count for regulation: {str(e)}")
 
+@router.get("/stats/elements/counts")
+async def get_regulation_counts_for_elements_endpoint(element_ids: List[str] = Query(...)):
+    """
+    Get the number of regulations linked to each of several elements in one request.
+    
+    Pass element_ids as a repeated query parameter.
+    """
+    try:
+        counts = await get_regulation_counts_for_elements(element_ids)
+        return {"regulation_counts": counts}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting regulation counts for elements: {str(e)}")
+
+@router.get("/stats/regulations/counts")
+async def get_element_counts_for_regulations_endpoint(regulation_ids: List[int] = Query(...)):
+    """
+    Get the number of elements linked to each of several regulations in one request.
+    
+    Pass regulation_ids as a repeated query parameter.
+    """
+    try:
+        counts = await get_element_counts_for_regulations(regulation_ids)
+        return {"element_counts": counts}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting element counts for regulations: {str(e)}")
+
 @router.get("/stats/most-linked-regulations")
 async def get_most_linked_regulations_endpoint(limit: int = 10):
     """
@@ -522,7 +565,7 @@ async def get_most_linked_regulations_endpoint(limit: int = 10):
         if limit < 1 or limit > 100:
             raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
         
-        result = get_most_linked_regulations(limit)
+        result = await get_most_linked_regulations(limit)
         
         if result["success"]:
             return {
@@ -549,7 +592,7 @@ async def get_most_linked_elements_endpoint(limit: int = 10):
         if limit < 1 or limit > 100:
             raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
         
-        result = get_most_linked_elements(limit)
+        result = await get_most_linked_elements(limit)
         
         if result["success"]:
             return {
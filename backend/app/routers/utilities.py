@@ -40,7 +40,7 @@ async def get_onlv_empty_json_endpoint(
         if not json_content:
             raise HTTPException(status_code=500, detail="Could not load onlv_empty.json content.")
         
-        # FastAPI will automatically serialize OrderedDict to JSON while preserving order
+        # FastAPI serializes the dict to JSON in its insertion (file) order
         return json_content
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving onlv_empty.json: {str(e)}")
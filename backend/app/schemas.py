@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, BeforeValidator, Field, constr
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
+from uuid import UUID
 
 # Category Schemas
 class CategoryBase(BaseModel):
@@ -25,6 +26,39 @@ class Category(CategoryBase):
     class Config:
         from_attributes = True
 
+# Element Schemas
+# Validated once at the API boundary; element_list_service receives trimmed, non-empty values
+NonEmptyStr = constr(strip_whitespace=True, min_length=1)
+StrippedStr = constr(strip_whitespace=True)
+
+def _uuid_or_empty(value: Any) -> Any:
+    """Blank means "no category"; anything else must parse as a UUID and is kept in canonical form."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, str):
+        value = value.strip()
+        return str(UUID(value)) if value else ""
+    return value
+
+UuidOrEmptyStr = Annotated[str, BeforeValidator(_uuid_or_empty)]
+
+class ElementCreate(BaseModel):
+    name: NonEmptyStr
+    type: NonEmptyStr
+    user_id: NonEmptyStr
+    description: Optional[StrippedStr] = None
+    category_id: Optional[UuidOrEmptyStr] = None
+
+class ElementBulkCreate(BaseModel):
+    elements: List[ElementCreate] = Field(..., min_length=1)
+
+class ElementUpdate(BaseModel):
+    """Fields left as None are not changed; an empty description or category_id clears it."""
+    name: Optional[NonEmptyStr] = None
+    type: Optional[NonEmptyStr] = None
+    description: Optional[StrippedStr] = None
+    category_id: Optional[UuidOrEmptyStr] = None
+
 # BOQ Schemas
 class BoqBase(BaseModel):
     name: str
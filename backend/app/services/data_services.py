@@ -1,15 +1,25 @@
 # services.py
 
 import os
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import google.generativeai as genai
+import httpx
 from supabase import create_client, Client
+from postgrest.types import ReturnMethod
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Optional
 import json
-from collections import OrderedDict 
+import orjson
 import re
+import sys
 from datetime import datetime
 from .entity import filter_json_entity
+from ..database import is_transient_error, retry_delay
 from typing import Any, Dict, List, Union
 
 # --- Section 1: Initialization and Configuration ---
@@ -20,6 +30,11 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+logger = logging.getLogger(__name__)
+
+# Regulation columns returned to API callers; the embedding vector is left out
+REGULATION_COLUMNS = "id, entity_type, lg_nr, ulg_nr, grundtext_nr, position_nr, full_nr, short_text, searchable_text, entity_json, created_at"
+
 ENTITY_TYPE_MAP = {
     "LG": "Hauptgruppe",
     "ULG": "Untergruppe",
@@ -28,27 +43,166 @@ ENTITY_TYPE_MAP = {
     "Folgeposition": "Folgeposition"
 }
 
+# "Dokumententyp: ..." prefix that starts every searchable_text, per entity type
+_DOC_TYPE_PREFIX = {entity_type: f"Dokumententyp: {description}. " for entity_type, description in ENTITY_TYPE_MAP.items()}
+
+# Embedding configuration. Embeddings are cached in-process (LRU) and persisted in the
+# `embedding_cache` table, keyed by a SHA-256 of model, task type and text.
+EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_CACHE_TABLE = "embedding_cache"
+EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_DECIMALS = 5
+EMBEDDING_LRU_MAXSIZE = 10000
+_embedding_lru: Dict[str, List[float]] = {}
+_embedding_lru_lock = threading.Lock()
+
 # --- Section 2: Helper Functions ---
 def _flatten_text_from_json(obj: Any) -> str:
-    if obj is None: return ""
-    if isinstance(obj, str): return obj.strip()
-    if isinstance(obj, list): return " ".join(_flatten_text_from_json(item) for item in obj)
-    if isinstance(obj, dict):
-        text_content = _flatten_text_from_json(obj.get("#text", ""))
-        if not text_content: return " ".join(_flatten_text_from_json(v) for v in obj.values())
-        return text_content
-    return ""
+    """
+    Collects the text of a JSON subtree depth-first into one list and joins it once.
+    A dict with a non-empty "#text" contributes only that text, otherwise all its values.
+    """
+    parts = []
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item.strip())
+        elif isinstance(item, list):
+            if item:
+                stack.extend(reversed(item))
+            else:
+                parts.append("")
+        elif isinstance(item, dict):
+            text = item.get("#text", "")
+            if isinstance(text, str):
+                text_content = text.strip()
+            elif isinstance(text, (list, dict)):
+                text_content = _flatten_text_from_json(text)
+            else:
+                text_content = ""
+            if text_content:
+                parts.append(text_content)
+            elif item:
+                stack.extend(reversed(list(item.values())))
+            else:
+                parts.append("")
+        else:
+            parts.append("")
+    return " ".join(parts)
+
+def _embedding_cache_key(text: str, task_type: str) -> str:
+    return hashlib.sha256(f"{EMBEDDING_MODEL}:{task_type}:{text}".encode("utf-8")).hexdigest()
+
+def _lru_get_embedding(key: str) -> Optional[List[float]]:
+    with _embedding_lru_lock:
+        embedding = _embedding_lru.pop(key, None)
+        if embedding is not None:
+            _embedding_lru[key] = embedding
+        return embedding
+
+def _lru_put_embedding(key: str, embedding: List[float]) -> None:
+    with _embedding_lru_lock:
+        _embedding_lru.pop(key, None)
+        _embedding_lru[key] = embedding
+        if len(_embedding_lru) > EMBEDDING_LRU_MAXSIZE:
+            del _embedding_lru[next(iter(_embedding_lru))]
+
+def _fetch_cached_embeddings(keys: List[str]) -> Dict[str, List[float]]:
+    """Look up persisted embeddings for the given cache keys, one `in` query per batch."""
+    found = {}
+    for i in range(0, len(keys), EMBEDDING_BATCH_SIZE):
+        chunk = keys[i:i + EMBEDDING_BATCH_SIZE]
+        try:
+            response = supabase.table(EMBEDDING_CACHE_TABLE).select("text_hash, embedding").in_("text_hash", chunk).execute()
+        except Exception as e:
+            logger.warning("Warning: Could not read embedding cache: %s", e)
+            return found
+        for row in response.data or []:
+            embedding = row.get("embedding")
+            # pgvector (halfvec) columns come back as their text representation, e.g. "[0.1,0.2]"
+            found[row["text_hash"]] = _loads(embedding)
+    return found
+
+def _store_cached_embeddings(embeddings: Dict[str, List[float]]) -> None:
+    rows = [{"text_hash": key, "embedding": embedding} for key, embedding in embeddings.items()]
+    for i in range(0, len(rows), EMBEDDING_BATCH_SIZE):
+        try:
+            supabase.table(EMBEDDING_CACHE_TABLE).upsert(
+                rows[i:i + EMBEDDING_BATCH_SIZE], on_conflict="text_hash", ignore_duplicates=True
+            ).execute()
+        except Exception as e:
+            logger.warning("Warning: Could not write embedding cache: %s", e)
+            return
+
+def _get_embeddings(texts: List[str], task_type: str = "RETRIEVAL_DOCUMENT") -> List[List[float]]:
+    """
+    Embed a list of texts, returning one embedding per input (an empty list for empty
+    texts or failures). Cached embeddings are served from the in-process LRU first, then
+    from the `embedding_cache` table; only the remaining misses are sent to Gemini.
+    Texts are whitespace-normalized first, so texts that only differ in whitespace
+    share one embedding and every unique text is hashed and embedded once.
+    """
+    normalized = [" ".join(text.split()) if text else "" for text in texts]
+    key_by_text: Dict[str, str] = {}
+    keys = []
+    for text in normalized:
+        if not text:
+            keys.append(None)
+            continue
+        key = key_by_text.get(text)
+        if key is None:
+            key = key_by_text[text] = _embedding_cache_key(text, task_type)
+        keys.append(key)
+
+    found: Dict[str, List[float]] = {}
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, normalized):
+        if key is None or key in found or key in missing:
+            continue
+        cached = _lru_get_embedding(key)
+        if cached is not None:
+            found[key] = cached
+        else:
+            missing[key] = text
+
+    if missing:
+        persisted = _fetch_cached_embeddings(list(missing))
+        found.update(persisted)
+        for key in persisted:
+            del missing[key]
+
+    if missing:
+        computed = {}
+        items = list(missing.items())
+        for i in range(0, len(items), EMBEDDING_BATCH_SIZE):
+            batch = items[i:i + EMBEDDING_BATCH_SIZE]
+            try:
+                result = genai.embed_content(model=EMBEDDING_MODEL, content=[text for _, text in batch], task_type=task_type)
+            except Exception as e:
+                logger.error("Error getting embeddings for a batch of %s texts (first: '%s...'): %s", len(batch), batch[0][1][:50], e)
+                continue
+            for (key, _), embedding in zip(batch, result['embedding']):
+                # Stored as halfvec (fp16); extra digits would only inflate the payloads
+                computed[key] = [round(value, EMBEDDING_DECIMALS) for value in embedding]
+        _store_cached_embeddings(computed)
+        found.update(computed)
+
+    for key, embedding in found.items():
+        _lru_put_embedding(key, embedding)
+
+    return [found.get(key, []) if key else [] for key in keys]
 
 def _get_embedding(text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
     if not text:
-        print("Warning: Attempted to embed empty text. Skipping.")
-        return []
-    try:
-        result = genai.embed_content(model="models/embedding-001", content=text, task_type=task_type)
-        return result['embedding']
-    except Exception as e:
-        print(f"Error getting embedding for text snippet '{text[:50]}...': {e}")
+        logger.warning("Warning: Attempted to embed empty text. Skipping.")
         return []
+    return _get_embeddings([text], task_type=task_type)[0]
+
+def _loads(value: Any) -> Any:
+    """Decode JSON text (str or bytes) with orjson; already-decoded values are returned as is."""
+    return orjson.loads(value) if isinstance(value, (bytes, str)) else value
+
 def _parse_entity_json(entity_json: Any) -> Any:
     """
     Parse entity_json from text to JSON object if it's stored as a string.
@@ -70,15 +224,20 @@ def _parse_entity_json(entity_json: Any) -> Any:
     # If it's a string, try to parse it as JSON
     if isinstance(entity_json, str):
         try:
-            return json.loads(entity_json)
-        except json.JSONDecodeError as e:
-            print(f"Warning: Could not parse entity_json as JSON: {e}")
-            print(f"Raw entity_json (first 100 chars): {entity_json[:100]}...")
+            return _loads(entity_json)
+        except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+            logger.warning("Warning: Could not parse entity_json as JSON: %s", e)
+            logger.warning("Raw entity_json (first 100 chars): %s...", entity_json[:100])
             return None
 
     # For any other type, return as is
     return entity_json
 
+# Row columns with only a handful of distinct values ("LG", "ULG", "Grundtext", ...);
+# interning them lets every row of a result set share one string object per value
+_INTERNED_COLUMNS = ("entity_type", "lg_nr", "ulg_nr")
+
+
 def _parse_entity_json_in_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Parse entity_json field in all results from database queries.
@@ -92,9 +251,18 @@ def _parse_entity_json_in_results(results: List[Dict[str, Any]]) -> List[Dict[st
     if not results:
         return results
 
+    # Only text values need decoding; rows that are already parsed (dict/list) or have
+    # no entity_json are left untouched
+    parse = _parse_entity_json
+    intern = sys.intern
     for result in results:
-        if "entity_json" in result:
-            result["entity_json"] = _parse_entity_json(result["entity_json"])
+        entity_json = result.get("entity_json")
+        if isinstance(entity_json, str):
+            result["entity_json"] = parse(entity_json)
+        for column in _INTERNED_COLUMNS:
+            value = result.get(column)
+            if type(value) is str:
+                result[column] = intern(value)
 
     return results
 
@@ -110,159 +278,149 @@ KEY_ORDER_MAP = {
     "POS": [ "pos-eigenschaften","@_ftnr","@_mfv"],
 }
 
-def _get_object_type(obj: Dict[str, Any]) -> str:
-    """Determines the object type based on its keys."""
-    if "@_nr" in obj and "lg-eigenschaften" in obj:
+# Bit flags for the keys that identify an object type. A dict's keys are OR-ed into a
+# mask once, and the type is looked up from a table precomputed over all 64 masks.
+_NR_KEY, _LG_KEY, _ULG_KEY, _GT_KEY, _POS_NR_KEY, _POS_KEY = 1, 2, 4, 8, 16, 32
+_OBJECT_TYPE_KEYS = {
+    "@_nr": _NR_KEY,
+    "lg-eigenschaften": _LG_KEY,
+    "ulg-eigenschaften": _ULG_KEY,
+    "grundtext": _GT_KEY,
+    "ungeteilteposition": _GT_KEY,
+    "folgeposition": _GT_KEY,
+    "@_ftnr": _POS_NR_KEY,
+    "@_mfv": _POS_NR_KEY,
+    "pos-eigenschaften": _POS_KEY,
+}
+
+def _object_type_for_mask(mask: int) -> str:
+    if mask & _NR_KEY and mask & _LG_KEY:
         return "LG"
-    if "@_nr" in obj and "ulg-eigenschaften" in obj:
+    if mask & _NR_KEY and mask & _ULG_KEY:
         return "ULG"
-    if "@_nr" in obj and ("grundtext" in obj or "ungeteilteposition" in obj or "folgeposition" in obj):
+    if mask & _NR_KEY and mask & _GT_KEY:
         return "GT"
-    if ("@_ftnr" in obj or "@_mfv" in obj) and "pos-eigenschaften" in obj:
+    if mask & _POS_NR_KEY and mask & _POS_KEY:
         return "POS"
     return "UNKNOWN"
 
-def _preserve_json_order(obj: Union[Dict, List, Any]) -> Union[OrderedDict, List, Any]:
+_OBJECT_TYPE_BY_MASK = tuple(_object_type_for_mask(mask) for mask in range(64))
+_KEY_ORDER_BY_MASK = tuple(KEY_ORDER_MAP.get(object_type) for object_type in _OBJECT_TYPE_BY_MASK)
+
+def _get_object_type(obj: Dict[str, Any]) -> str:
+    """Determines the object type based on its keys."""
+    mask = 0
+    for key in obj:
+        mask |= _OBJECT_TYPE_KEYS.get(key, 0)
+    return _OBJECT_TYPE_BY_MASK[mask]
+
+def _preserve_json_order(obj: Union[Dict, List, Any]) -> Union[Dict, List, Any]:
     """
-    Creates a clean copy of the object that preserves the original JSON key order,
-    while enforcing a specific order for known object types.
-    This function recursively processes dictionaries and lists to maintain structure.
+    Returns the object with a specific key order enforced for known object types.
+    Dicts already preserve insertion order, so subtrees that need no reordering are
+    returned as-is instead of being copied; only changed nodes (and their parents) are rebuilt.
     """
     if isinstance(obj, dict):
-        ordered_dict = OrderedDict()
-        
-        # Determine the type of object to see if a specific order should be enforced
-        obj_type = _get_object_type(obj)
-        
-        # Get the predefined key order for this object type, if any
-        predefined_order = KEY_ORDER_MAP.get(obj_type, [])
+        # Process children first; the dict is only copied once a child had to be rebuilt.
+        # Scalars are never rebuilt, so only containers are recursed into.
+        children = obj
+        mask = 0
+        for key, value in obj.items():
+            mask |= _OBJECT_TYPE_KEYS.get(key, 0)
+            if isinstance(value, (dict, list)):
+                new_value = _preserve_json_order(value)
+                if new_value is not value:
+                    if children is obj:
+                        children = dict(obj)
+                    children[key] = new_value
 
-        if predefined_order:
-            # First, add the keys that are in our predefined order list
-            for key in predefined_order:
-                if key in obj:
-                    ordered_dict[key] = _preserve_json_order(obj[key])
-            
-            # Second, add any remaining keys from the original object
-            for key, value in obj.items():
-                if key not in ordered_dict:
-                    ordered_dict[key] = _preserve_json_order(value)
-        else:
-            # For all other dictionaries, just preserve their natural order
-            for key, value in obj.items():
-                ordered_dict[key] = _preserve_json_order(value)
-        
-        # IMPORTANT: Return the OrderedDict itself, not a converted dict
+        # Get the predefined key order for this object type, if any
+        predefined_order = _KEY_ORDER_BY_MASK[mask]
+        if not predefined_order:
+            # Natural order is kept as-is
+            return children
+
+        # Nothing to do if the predefined keys already come first, in order
+        present = [key for key in predefined_order if key in children]
+        if present == list(islice(children, len(present))):
+            return children
+
+        # First, add the keys that are in our predefined order list,
+        # then any remaining keys from the original object
+        ordered_dict = {key: children[key] for key in present}
+        for key, value in children.items():
+            if key not in ordered_dict:
+                ordered_dict[key] = value
         return ordered_dict
-    
+
     elif isinstance(obj, list):
-        # If the object is a list, process each item recursively
-        return [_preserve_json_order(item) for item in obj]
-    
+        # If the object is a list, process each container item recursively
+        items = obj
+        for index, item in enumerate(obj):
+            if isinstance(item, (dict, list)):
+                new_item = _preserve_json_order(item)
+                if new_item is not item:
+                    if items is obj:
+                        items = list(obj)
+                    items[index] = new_item
+        return items
+
     else:
         # Return all other data types (strings, numbers, etc.) as is
         return obj
+
+# Bulk insert settings for process_and_store_data
+INSERT_CHUNK_SIZE = 500
+INSERT_MAX_WORKERS = 8
+INSERT_MAX_ATTEMPTS = 3
+
+def _is_retryable_insert_error(error: Exception) -> bool:
     """
-    Creates a clean copy of the object that preserves the original JSON key order.
-    This function recursively processes dictionaries and lists to maintain structure.
+    A plain insert is not idempotent, so it is only retried when the rows cannot have been
+    written: the connection was never established, or PostgREST answered with a transient
+    database error (its transaction was rolled back). A read timeout or connection reset
+    after the request was sent may follow a commit, and retrying would duplicate the chunk.
     """
-    if isinstance(obj, dict):
-        # Create an OrderedDict to preserve key order
-        ordered_dict = OrderedDict()
-        
-        # For ULG objects, ensure specific order: @_nr, ulg-eigenschaften, positionen
-        if "@_nr" in obj and "ulg-eigenschaften" in obj:
-            # This is likely a ULG object
-            if "@_nr" in obj:
-                ordered_dict["@_nr"] = _preserve_json_order(obj["@_nr"])
-            if "ulg-eigenschaften" in obj:
-                ordered_dict["ulg-eigenschaften"] = _preserve_json_order(obj["ulg-eigenschaften"])
-            if "positionen" in obj:
-                ordered_dict["positionen"] = _preserve_json_order(obj["positionen"])
-            # Add any remaining keys
-            for key, value in obj.items():
-                if key not in ordered_dict:
-                    ordered_dict[key] = _preserve_json_order(value)
-        
-        # For GT objects, ensure specific order: @_nr, grundtext, folgeposition, etc.
-        elif "@_nr" in obj and ("grundtext" in obj or "ungeteilteposition" in obj or "folgeposition" in obj):
-            # This is likely a grundtext object
-            if "@_nr" in obj:
-                ordered_dict["@_nr"] = _preserve_json_order(obj["@_nr"])
-            if "grundtext" in obj:
-                ordered_dict["grundtext"] = _preserve_json_order(obj["grundtext"])
-            if "ungeteilteposition" in obj:
-                ordered_dict["ungeteilteposition"] = _preserve_json_order(obj["ungeteilteposition"])
-            if "folgeposition" in obj:
-                ordered_dict["folgeposition"] = _preserve_json_order(obj["folgeposition"])
-            # Add any remaining keys
-            for key, value in obj.items():
-                if key not in ordered_dict:
-                    ordered_dict[key] = _preserve_json_order(value)
-        
-        # For LG objects, ensure specific order: @_nr, lg-eigenschaften, ulg-liste
-        elif "@_nr" in obj and "lg-eigenschaften" in obj:
-            # This is likely an LG object
-            if "@_nr" in obj:
-                ordered_dict["@_nr"] = _preserve_json_order(obj["@_nr"])
-            if "lg-eigenschaften" in obj:
-                ordered_dict["lg-eigenschaften"] = _preserve_json_order(obj["lg-eigenschaften"])
-            if "ulg-liste" in obj:
-                ordered_dict["ulg-liste"] = _preserve_json_order(obj["ulg-liste"])
-            # Add any remaining keys
-            for key, value in obj.items():
-                if key not in ordered_dict:
-                    ordered_dict[key] = _preserve_json_order(value)
-        
-        # For position objects, ensure specific order: @_ftnr/@_mfv, pos-eigenschaften
-        elif ("@_ftnr" in obj or "@_mfv" in obj) and "pos-eigenschaften" in obj:
-            # This is likely a position object
-            if "@_ftnr" in obj:
-                ordered_dict["@_ftnr"] = _preserve_json_order(obj["@_ftnr"])
-            if "@_mfv" in obj:
-                ordered_dict["@_mfv"] = _preserve_json_order(obj["@_mfv"])
-            if "pos-eigenschaften" in obj:
-                ordered_dict["pos-eigenschaften"] = _preserve_json_order(obj["pos-eigenschaften"])
-            # Add any remaining keys
-            for key, value in obj.items():
-                if key not in ordered_dict:
-                    ordered_dict[key] = _preserve_json_order(value)
-        
-        else:
-            # For other objects, preserve the natural order
-            for key, value in obj.items():
-                ordered_dict[key] = _preserve_json_order(value)
-        
-        return dict(ordered_dict)  # Convert back to regular dict
-    
-    elif isinstance(obj, list):
-        return [_preserve_json_order(item) for item in obj]
-    
-    else:
-        return obj
+    if isinstance(error, httpx.TransportError):
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+    return is_transient_error(error)
+
+def _insert_regulations_chunk(chunk: List[Dict[str, Any]]) -> None:
+    for attempt in range(1, INSERT_MAX_ATTEMPTS + 1):
+        try:
+            supabase.table("regulations").insert(chunk, returning=ReturnMethod.minimal).execute()
+            return
+        except Exception as e:
+            if attempt == INSERT_MAX_ATTEMPTS or not _is_retryable_insert_error(e):
+                raise
+            delay = retry_delay(attempt)
+            logger.warning("Transient error inserting a chunk of %s rows (attempt %s): %s. Retrying in %.2fs...", len(chunk), attempt, e, delay)
+            time.sleep(delay)
 
 def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
     documents_to_store = []
     
     # Process data in the exact order it appears in the JSON
     for lg in full_json_payload:
+        # Clean copy of the whole LG with preserved order. Every ULG, GT and position
+        # below is taken from this copy, so no subtree is reordered more than once.
+        lg = _preserve_json_order(lg)
         lg_nr = lg.get("@_nr")
         lg_eigenschaften = lg.get("lg-eigenschaften", {})
         
         # --- Process LG ---
-        lg_ueberschrift = lg_eigenschaften.get("ueberschrift", "")
+        lg_ueberschrift = str(lg_eigenschaften.get("ueberschrift", ""))
         lg_vorbemerkung = _flatten_text_from_json(lg_eigenschaften.get("vorbemerkung", {}))
         lg_kommentar = _flatten_text_from_json(lg_eigenschaften.get("kommentar", {}))
         
-        doc_type_description = ENTITY_TYPE_MAP.get("LG")
-        lg_text = f"Dokumententyp: {doc_type_description}. Titel: {lg_ueberschrift}. Vorbemerkung: {lg_vorbemerkung}. Kommentar: {lg_kommentar}"
+        lg_text = "".join((
+            _DOC_TYPE_PREFIX["LG"], "Titel: ", lg_ueberschrift,
+            ". Vorbemerkung: ", lg_vorbemerkung, ". Kommentar: ", lg_kommentar
+        ))
         
         # Generate full_nr for LG (just the LG number)
         lg_full_nr = lg_nr if lg_nr else ""
         
-        # Create a clean copy of LG with preserved order
-        lg_clean = _preserve_json_order(lg)
-        
         documents_to_store.append({
             "entity_type": "LG", 
             "lg_nr": lg_nr, 
@@ -270,8 +428,7 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
             "grundtext_nr": None, 
             "position_nr": None,
             "searchable_text": lg_text, 
-            "entity_json": lg_clean, 
-            "embedding": _get_embedding(lg_text),
+            "entity_json": lg, 
             "full_nr": lg_full_nr,
             "short_text": None
         })
@@ -287,19 +444,17 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
             ulg_eigenschaften = ulg.get("ulg-eigenschaften", {})
             
             # --- Process ULG ---
-            ulg_ueberschrift = ulg_eigenschaften.get("ueberschrift", "")
+            ulg_ueberschrift = str(ulg_eigenschaften.get("ueberschrift", ""))
             ulg_vorbemerkung = _flatten_text_from_json(ulg_eigenschaften.get("vorbemerkung", {}))
-            ulg_context = f"Hauptgruppe: {lg_ueberschrift}. Untergruppe: {ulg_ueberschrift}"
-            
-            doc_type_description = ENTITY_TYPE_MAP.get("ULG")
-            ulg_text = f"Dokumententyp: {doc_type_description}. {ulg_context}. Vorbemerkung: {ulg_vorbemerkung}"
+            ulg_context = "".join(("Hauptgruppe: ", lg_ueberschrift, ". Untergruppe: ", ulg_ueberschrift))
+            ulg_text = "".join((_DOC_TYPE_PREFIX["ULG"], ulg_context, ". Vorbemerkung: ", ulg_vorbemerkung))
+
+            # Prefix shared by every UngeteiltePosition of this ULG, built once per ULG
+            ungeteilte_text_prefix = "".join((_DOC_TYPE_PREFIX["UngeteiltePosition"], ulg_context, ". Position: "))
 
             # Generate full_nr for ULG (lg_nr + ulg_nr)
             ulg_full_nr = f"{lg_nr}{ulg_nr}" if lg_nr and ulg_nr else ""
 
-            # Create a clean copy of ULG with preserved order
-            ulg_clean = _preserve_json_order(ulg)
-
             documents_to_store.append({
                 "entity_type": "ULG", 
                 "lg_nr": lg_nr, 
@@ -307,8 +462,7 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                 "grundtext_nr": None, 
                 "position_nr": None,
                 "searchable_text": ulg_text, 
-                "entity_json": ulg_clean, 
-                "embedding": _get_embedding(ulg_text),
+                "entity_json": ulg, 
                 "full_nr": ulg_full_nr,
                 "short_text": None
             })
@@ -332,16 +486,11 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                     pos_eigenschaften = pos.get("pos-eigenschaften", {})
                     pos_text = _flatten_text_from_json(pos_eigenschaften)
                     pos_stichwort = pos_eigenschaften.get("stichwort", "")
-                    
-                    doc_type_description = ENTITY_TYPE_MAP.get("UngeteiltePosition")
-                    searchable_text = f"Dokumententyp: {doc_type_description}. {ulg_context}. Position: {pos_text}"
+                    searchable_text = ungeteilte_text_prefix + pos_text
                     
                     # Generate full_nr for UngeteiltePosition (lg_nr + ulg_nr + gt_nr)
                     ungeteilte_full_nr = f"{lg_nr}{ulg_nr}{gt_nr}" if lg_nr and ulg_nr and gt_nr else ""
                     
-                    # Create a clean copy of GT with preserved order
-                    gt_clean = _preserve_json_order(gt)
-                    
                     documents_to_store.append({
                         "entity_type": "UngeteiltePosition",
                         "lg_nr": lg_nr, 
@@ -349,8 +498,7 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                         "grundtext_nr": gt_nr, 
                         "position_nr": pos_nr,
                         "searchable_text": searchable_text,
-                        "entity_json": gt_clean,  # Store the entire parent 'gt' object
-                        "embedding": _get_embedding(searchable_text),
+                        "entity_json": gt,  # Store the entire parent 'gt' object
                         "full_nr": ungeteilte_full_nr,
                         "short_text": pos_stichwort
                     })
@@ -358,17 +506,15 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                 # --- Process 'Grundtext' (if it exists) ---
                 if "grundtext" in gt:
                     gt_text = _flatten_text_from_json(gt.get("grundtext", {}))
-                    grundtext_context = f"{ulg_context}. Grundtext: {gt_text}"
-                    
-                    doc_type_description_gt = ENTITY_TYPE_MAP.get("Grundtext")
-                    searchable_text_gt = f"Dokumententyp: {doc_type_description_gt}. {grundtext_context}"
+                    grundtext_context = "".join((ulg_context, ". Grundtext: ", gt_text))
+                    searchable_text_gt = _DOC_TYPE_PREFIX["Grundtext"] + grundtext_context
+
+                    # Prefix shared by every Folgeposition of this Grundtext, built once per GT
+                    folgeposition_text_prefix = "".join((_DOC_TYPE_PREFIX["Folgeposition"], grundtext_context, ". "))
 
                     # Generate full_nr for Grundtext (lg_nr + ulg_nr + gt_nr)
                     grundtext_full_nr = f"{lg_nr}{ulg_nr}{gt_nr}" if lg_nr and ulg_nr and gt_nr else ""
 
-                    # Create a clean copy of GT with preserved order
-                    gt_clean = _preserve_json_order(gt)
-
                     documents_to_store.append({
                         "entity_type": "Grundtext", 
                         "lg_nr": lg_nr, 
@@ -376,8 +522,7 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                         "grundtext_nr": gt_nr, 
                         "position_nr": None,
                         "searchable_text": searchable_text_gt, 
-                        "entity_json": gt_clean,
-                        "embedding": _get_embedding(searchable_text_gt),
+                        "entity_json": gt,
                         "full_nr": grundtext_full_nr,
                         "short_text": None
                     })
@@ -392,16 +537,11 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                         pos_eigenschaften = pos.get("pos-eigenschaften", {})
                         pos_text = _flatten_text_from_json(pos_eigenschaften)
                         pos_stichwort = pos_eigenschaften.get("stichwort", "")
-                        
-                        doc_type_description_fp = ENTITY_TYPE_MAP.get("Folgeposition")
-                        searchable_text = f"Dokumententyp: {doc_type_description_fp}. {grundtext_context}. {pos_text}"
+                        searchable_text = folgeposition_text_prefix + pos_text
                         
                         # Generate full_nr for Folgeposition (lg_nr + ulg_nr + gt_nr + pos_nr)
                         folgeposition_full_nr = f"{lg_nr}{ulg_nr}{gt_nr}{pos_nr}" if lg_nr and ulg_nr and gt_nr and pos_nr else ""
                         
-                        # Create a clean copy of position with preserved order
-                        pos_clean = _preserve_json_order(pos)
-                        
                         documents_to_store.append({
                             "entity_type": "Folgeposition", 
                             "lg_nr": lg_nr, 
@@ -409,41 +549,36 @@ def process_and_store_data(full_json_payload: List[Dict[str, Any]]):
                             "grundtext_nr": gt_nr, 
                             "position_nr": pos_nr,
                             "searchable_text": searchable_text, 
-                            "entity_json": pos_clean,
-                            "embedding": _get_embedding(searchable_text),
+                            "entity_json": pos,
                             "full_nr": folgeposition_full_nr,
                             "short_text": pos_stichwort
                         })
 
+    # --- Embed all documents in batches (cache hits skip the Gemini call) ---
+    embeddings = _get_embeddings([doc["searchable_text"] for doc in documents_to_store])
+    for doc, embedding in zip(documents_to_store, embeddings):
+        doc["embedding"] = embedding
+
     # --- Section 4: Final Database Insertion ---
     valid_documents = [doc for doc in documents_to_store if doc.get("embedding")]
-    print(f"Total valid documents to store: {len(valid_documents)}")
+    logger.info("Total valid documents to store: %s", len(valid_documents))
 
     if valid_documents:
         try:
-            CHUNK_SIZE = 100
-            for i in range(0, len(valid_documents), CHUNK_SIZE):
-                chunk = valid_documents[i:i + CHUNK_SIZE]
-                print(f"Storing chunk {i // CHUNK_SIZE + 1} of {len(valid_documents) // CHUNK_SIZE + 1}...")
-                supabase.table("regulations").insert(chunk).execute()
-            print(f"Successfully stored a total of {len(valid_documents)} documents.")
+            chunks = [valid_documents[i:i + INSERT_CHUNK_SIZE] for i in range(0, len(valid_documents), INSERT_CHUNK_SIZE)]
+            logger.info("Storing %s chunks with up to %s parallel inserts...", len(chunks), INSERT_MAX_WORKERS)
+            with ThreadPoolExecutor(max_workers=INSERT_MAX_WORKERS) as executor:
+                # list() re-raises the first failed chunk insert here
+                list(executor.map(_insert_regulations_chunk, chunks))
+            logger.info("Successfully stored a total of %s documents.", len(valid_documents))
         except Exception as e:
-            print(f"An error occurred during the Supabase insert operation: {e}")
+            logger.error("An error occurred during the Supabase insert operation: %s", e)
             raise
+
 # --- Section 5: AI-Powered Query Analysis Function ---
-def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
-    """
-    Analyze natural language query using Gemini Flash 2.5 and convert it to Supabase query.
-    
-    Args:
-        query_text: Natural language query from user (e.g., "i want to build lg 00")
-    
-    Returns:
-        List of matching regulations from the database
-    """
-    
-    # Create a prompt for Gemini to analyze the query
-    analysis_prompt = f"""
+# Static part of the query analysis prompt. It is sent as the system instruction of a
+# single module-level model, so only the user query is built per request.
+QUERY_ANALYSIS_INSTRUCTION = """
     You are an expert at analyzing German construction regulation queries and converting them to structured database queries.
     
     Database Schema:
@@ -451,160 +586,133 @@ def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
     - Columns: id, entity_type, lg_nr, ulg_nr, grundtext_nr, position_nr, searchable_text, entity_json, embedding, created_at
     - Entity Types: 'LG' (Hauptgruppe), 'ULG' (Untergruppe), 'Grundtext', 'UngeteiltePosition', 'Folgeposition'
     
-    User Query: "{query_text}"
-    
-    Analyze this query and extract the following information in JSON format:
-    {{
-        "entity_type": "LG|ULG|Grundtext|UngeteiltePosition|Folgeposition|null",
-        "lg_nr": "extracted number or null",
-        "ulg_nr": "extracted number or null",
-        "grundtext_nr": "extracted number or null",
-        "position_nr": "extracted number or null",
-        "search_terms": ["relevant", "search", "terms"],
-        "query_intent": "brief description of what user wants"
-    }}
-    
     Rules:
     - If query mentions "lg" or "hauptgruppe", set entity_type to "LG"
     - If query mentions "ulg" or "untergruppe", set entity_type to "ULG"
-    - Extract numbers that follow entity type indicators (e.g., "lg 00" -> lg_nr: "00")
+    - Extract numbers that follow entity type indicators (e.g., "lg 00" -> lg_nr: "00", "ulg 01.02" -> lg_nr: "01", ulg_nr: "02")
     - Numbers should be formatted as strings with leading zeros if present
     - If no specific entity type is mentioned, set entity_type to null
     - Extract relevant search terms for text-based searching
-    - Return only valid JSON, no additional text
+    """
+
+# Output schema for the analysis; Gemini's constrained decoding guarantees parseable JSON
+QUERY_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "entity_type": {
+            "type": "STRING",
+            "format": "enum",
+            "enum": ["LG", "ULG", "Grundtext", "UngeteiltePosition", "Folgeposition"],
+            "nullable": True
+        },
+        "lg_nr": {"type": "STRING", "nullable": True},
+        "ulg_nr": {"type": "STRING", "nullable": True},
+        "grundtext_nr": {"type": "STRING", "nullable": True},
+        "position_nr": {"type": "STRING", "nullable": True},
+        "search_terms": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "query_intent": {"type": "STRING", "description": "brief description of what user wants"}
+    },
+    "required": ["entity_type", "lg_nr", "ulg_nr", "grundtext_nr", "position_nr", "search_terms", "query_intent"]
+}
+
+_QUERY_ANALYSIS_MODEL = genai.GenerativeModel(
+    'gemini-2.5-flash',
+    system_instruction=QUERY_ANALYSIS_INSTRUCTION,
+    generation_config={
+        "response_mime_type": "application/json",
+        "response_schema": QUERY_ANALYSIS_SCHEMA
+    }
+)
+
+# Semantic cache for query analyses (see migrations/0003_query_analysis_cache.sql)
+QUERY_ANALYSIS_CACHE_TABLE = "query_analysis_cache"
+QUERY_ANALYSIS_CACHE_THRESHOLD = 0.95
+_DIGITS_RE = re.compile(r"\d+")
+
+def _lookup_cached_analysis(query_text: str, query_embedding: List[float]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached analysis of the most similar earlier query, if any. Queries that
+    only differ in their numbers ("lg 00" vs "lg 01") embed almost identically, so a hit
+    additionally requires the same digit sequences as the cached query.
+    """
+    try:
+        response = supabase.rpc("match_query_cache", {
+            "query_embedding": query_embedding,
+            "match_threshold": QUERY_ANALYSIS_CACHE_THRESHOLD,
+            "match_count": 1
+        }).execute()
+    except Exception as e:
+        logger.warning("Could not read query analysis cache: %s", e)
+        return None
+
+    for row in response.data or []:
+        if _DIGITS_RE.findall(row.get("query_text", "")) == _DIGITS_RE.findall(query_text):
+            logger.debug("♻️ Reusing cached analysis of '%s' (similarity %.3f)", row.get("query_text"), row.get("similarity", 0))
+            return row.get("analysis_json")
+    return None
+
+def _store_cached_analysis(query_text: str, query_embedding: List[float], analysis_result: Dict[str, Any]) -> None:
+    try:
+        supabase.table(QUERY_ANALYSIS_CACHE_TABLE).insert({
+            "query_text": query_text,
+            "query_embedding": query_embedding,
+            "analysis_json": analysis_result
+        }, returning=ReturnMethod.minimal).execute()
+    except Exception as e:
+        logger.warning("Could not write query analysis cache: %s", e)
+
+def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
+    """
+    Analyze natural language query using Gemini Flash 2.5 and convert it to Supabase query.
+    
+    Args:
+        query_text: Natural language query from user (e.g., "i want to build lg 00")
     
-    Examples:
-    - "i want to build lg 00" -> {{"entity_type": "LG", "lg_nr": "00", "ulg_nr": null, "grundtext_nr": null, "position_nr": null, "search_terms": ["build"], "query_intent": "Find LG 00 regulations"}}
-    - "show me ulg 01.02" -> {{"entity_type": "ULG", "lg_nr": "01", "ulg_nr": "02", "grundtext_nr": null, "position_nr": null, "search_terms": ["show"], "query_intent": "Find ULG 01.02 regulations"}}
+    Returns:
+        List of matching regulations from the database
     """
     
+    # Only the user query changes per call; the instructions live on the shared model
+    analysis_prompt = f'User Query: "{query_text}"'
+    
     try:
-        # Use Gemini Flash 2.5 model for analysis
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(analysis_prompt)
-        
-        # Clean the response text - remove markdown code blocks if present
-        response_text = response.text.strip()
-        print(f"🤖 Raw Gemini response: {response_text}")
-        
-        # Remove markdown code blocks if present
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Remove ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]   # Remove ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove trailing ```
-        
-        response_text = response_text.strip()
-        print(f"🧹 Cleaned response: {response_text}")
-        
-        # Parse the JSON response
-        analysis_result = json.loads(response_text)
-        print(f"🤖 Gemini analysis result: {analysis_result}")
-        
-        # First, let's check what data exists in the database for debugging
-        print(f"🔍 Checking database content...")
-        
-        # Check if we have any LG records at all
-        lg_check = supabase.table("regulations").select("lg_nr, entity_type").eq("entity_type", "LG").limit(5).execute()
-        print(f"📋 Sample LG records in database: {[{'lg_nr': r.get('lg_nr'), 'entity_type': r.get('entity_type')} for r in lg_check.data]}")
-        
-        # Build Supabase query based on analysis
-        query_builder = supabase.table("regulations").select("*")
-        applied_filters = []
-        
-        print(f"🔍 Building Supabase query...")
-        
-        # Apply filters based on extracted information
-        if analysis_result.get("entity_type"):
-            query_builder = query_builder.eq("entity_type", analysis_result["entity_type"])
-            applied_filters.append(f"entity_type = '{analysis_result['entity_type']}'")
-        
-        if analysis_result.get("lg_nr"):
-            # Try both exact match and flexible matching
-            lg_nr = analysis_result["lg_nr"]
-            
-            # First try exact match
-            query_builder_exact = query_builder.eq("lg_nr", lg_nr)
-            applied_filters.append(f"lg_nr = '{lg_nr}'")
-            
-            # Also try without leading zeros if it's a number
-            if lg_nr.isdigit():
-                lg_nr_no_zeros = str(int(lg_nr))
-                print(f"🔄 Also trying lg_nr without leading zeros: '{lg_nr_no_zeros}'")
-            
-        if analysis_result.get("ulg_nr"):
-            query_builder = query_builder.eq("ulg_nr", analysis_result["ulg_nr"])
-            applied_filters.append(f"ulg_nr = '{analysis_result['ulg_nr']}'")
-            
-        if analysis_result.get("grundtext_nr"):
-            query_builder = query_builder.eq("grundtext_nr", analysis_result["grundtext_nr"])
-            applied_filters.append(f"grundtext_nr = '{analysis_result['grundtext_nr']}'")
-            
-        if analysis_result.get("position_nr"):
-            query_builder = query_builder.eq("position_nr", analysis_result["position_nr"])
-            applied_filters.append(f"position_nr = '{analysis_result['position_nr']}'")
-        
-        # Log the constructed query
-        if applied_filters:
-            print(f"📊 Constructed SQL-like query:")
-            print(f"   SELECT * FROM regulations WHERE {' AND '.join(applied_filters)}")
-        else:
-            print(f"📊 Constructed SQL-like query:")
-            print(f"   SELECT * FROM regulations (no filters applied)")
-        
-        # Execute the query
-        print(f"⚡ Executing query...")
-        print(query_builder)
-        response = query_builder.execute()
-        results = response.data
-        
-        # If no results found with exact match, try alternative approaches
-        if not results and analysis_result.get("lg_nr"):
-            print(f"🔄 No exact match found, trying alternative searches...")
-            
-            lg_nr = analysis_result["lg_nr"]
-            
-            # Try without leading zeros
-            if lg_nr.isdigit():
-                lg_nr_no_zeros = str(int(lg_nr))
-                print(f"🔍 Trying lg_nr = '{lg_nr_no_zeros}'...")
-                alt_query = supabase.table("regulations").select("*").eq("entity_type", "LG").eq("lg_nr", lg_nr_no_zeros)
-                alt_response = alt_query.execute()
-                if alt_response.data:
-                    print(f"✅ Found {len(alt_response.data)} results with lg_nr = '{lg_nr_no_zeros}'")
-                    results = alt_response.data
+        # Reuse the analysis of a semantically identical earlier query if there is one
+        query_embedding = _get_embedding(query_text, task_type="RETRIEVAL_QUERY")
+        analysis_result = _lookup_cached_analysis(query_text, query_embedding) if query_embedding else None
+
+        if analysis_result is None:
+            # Use the shared Gemini Flash 2.5 model for analysis
+            response = _QUERY_ANALYSIS_MODEL.generate_content(analysis_prompt)
             
-            # If still no results, try ILIKE search
-            if not results:
-                print(f"🔍 Trying ILIKE search for lg_nr containing '{lg_nr}'...")
-                ilike_query = supabase.table("regulations").select("*").eq("entity_type", "LG").ilike("lg_nr", f"%{lg_nr}%")
-                ilike_response = ilike_query.execute()
-                if ilike_response.data:
-                    print(f"✅ Found {len(ilike_response.data)} results with ILIKE search")
-                    results = ilike_response.data
+            logger.debug("🤖 Raw Gemini response: %s", response.text)
+
+            # The response schema guarantees raw JSON matching QUERY_ANALYSIS_SCHEMA
+            analysis_result = orjson.loads(response.text)
+            logger.debug("🤖 Gemini analysis result: %s", analysis_result)
+
+            if query_embedding:
+                _store_cached_analysis(query_text, query_embedding, analysis_result)
         
-        # Add text search if search terms are provided and we still have no results
-        if not results:
-            search_terms = analysis_result.get("search_terms", [])
-            if search_terms:
-                print(f"🔍 No results from structured search, trying text search...")
-                # Combine search terms for text search
-                search_text = " ".join(search_terms)
-                text_query = supabase.table("regulations").select("*")
-                if analysis_result.get("entity_type"):
-                    text_query = text_query.eq("entity_type", analysis_result["entity_type"])
-                text_query = text_query.ilike("searchable_text", f"%{search_text}%")
-                text_response = text_query.execute()
-                if text_response.data:
-                    print(f"✅ Found {len(text_response.data)} results with text search")
-                    results = text_response.data
-        print(f"📈 Final results: Found {len(results)} regulations matching query: '{query_text}'")
-        print(f"🎯 Query intent: {analysis_result.get('query_intent', 'Unknown')}")
+        # Run the structured lookup and all its fallbacks in a single RPC round trip.
+        # The RPC returns row metadata only; entity_json is fetched for the final LG row below.
+        search_terms = analysis_result.get("search_terms") or []
+        rpc_params = {
+            "p_entity_type": analysis_result.get("entity_type") or None,
+            "p_lg_nr": analysis_result.get("lg_nr") or None,
+            "p_ulg_nr": analysis_result.get("ulg_nr") or None,
+            "p_grundtext_nr": analysis_result.get("grundtext_nr") or None,
+            "p_position_nr": analysis_result.get("position_nr") or None,
+            "p_search_text": " ".join(search_terms) or None,
+        }
+        logger.debug("⚡ Executing find_regulations with: %s", rpc_params)
+        rpc_response = supabase.rpc("find_regulations", rpc_params).execute()
+        results = rpc_response.data or []
+        logger.debug("📈 Final results: Found %d regulations matching query: '%s'", len(results), query_text)
+        logger.debug("🎯 Query intent: %s", analysis_result.get('query_intent', 'Unknown'))
         
         # NEW LOGIC: If entity_type is not "LG", get LG by lg_nr and use filter_json_entity
         if results and analysis_result.get("entity_type") and analysis_result["entity_type"] != "LG":
-            print(f"🔄 Entity type is '{analysis_result['entity_type']}', fetching LG data for filtering...")
+            logger.debug("🔄 Entity type is '%s', fetching LG data for filtering...", analysis_result['entity_type'])
             
             # Get lg_nr from the analysis result or from the first result
             lg_nr = analysis_result.get("lg_nr")
@@ -612,10 +720,10 @@ def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
                 lg_nr = results[0].get("lg_nr")
             
             if lg_nr:
-                print(f"🔍 Fetching LG with lg_nr: {lg_nr}")
+                logger.debug("🔍 Fetching LG with lg_nr: %s", lg_nr)
                 
-                # Fetch the LG entity from database
-                lg_query = supabase.table("regulations").select("*").eq("entity_type", "LG").eq("lg_nr", lg_nr)
+                # Fetch only the entity_json of the LG entity from database
+                lg_query = supabase.table("regulations").select("entity_json").eq("entity_type", "LG").eq("lg_nr", lg_nr).limit(1)
                 lg_response = lg_query.execute()
                 
                 if lg_response.data:
@@ -623,7 +731,7 @@ def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
                     lg_json = _parse_entity_json(lg_entity.get("entity_json"))
 
                     if lg_json:
-                        print(f"✅ Found LG entity, applying filter_json_entity...")
+                        logger.debug("✅ Found LG entity, applying filter_json_entity...")
                         
                         # Prepare parameters for filter_json_entity
                         target_entity_type = analysis_result["entity_type"]
@@ -646,7 +754,10 @@ def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
                             target_grundtext_nr = analysis_result.get("grundtext_nr")
                         
                         if target_value:
-                            print(f"🎯 Filtering with: entity_type='{target_entity_type}', target_value='{target_value}', ulg_nr='{target_ulg_nr}', grundtext_nr='{target_grundtext_nr}'")
+                            logger.debug(
+                                "🎯 Filtering with: entity_type='%s', target_value='%s', ulg_nr='%s', grundtext_nr='%s'",
+                                target_entity_type, target_value, target_ulg_nr, target_grundtext_nr
+                            )
                             
                             # Apply the filter
                             filtered_json = filter_json_entity(
@@ -657,7 +768,7 @@ def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
                                 target_grundtext_nr=target_grundtext_nr
                             )
                             
-                            print(f"✅ Successfully filtered LG JSON to {target_entity_type}")
+                            logger.debug("✅ Successfully filtered LG JSON to %s", target_entity_type)
                             
                             # Return both original query results and the filtered JSON as separate objects
                             return {
@@ -665,30 +776,32 @@ def analyze_query_with_gemini(query_text: str) -> List[Dict[str, Any]]:
                                 "json_response": filtered_json
                             }
                         else:
-                            print(f"⚠️ Could not determine target_value for entity_type '{target_entity_type}'")
+                            logger.warning("⚠️ Could not determine target_value for entity_type '%s'", target_entity_type)
                     else:
-                        print(f"⚠️ LG entity found but no entity_json available")
+                        logger.warning("⚠️ LG entity found but no entity_json available")
                 else:
-                    print(f"⚠️ No LG found with lg_nr: {lg_nr}")
+                    logger.warning("⚠️ No LG found with lg_nr: %s", lg_nr)
             else:
-                print(f"⚠️ Could not determine lg_nr for filtering")
+                logger.warning("⚠️ Could not determine lg_nr for filtering")
         
         final_json_response = None
         if analysis_result.get("entity_type") == "LG" and results:
-            final_json_response = _parse_entity_json(results[0].get("entity_json"))
-            print(f"✅ Returning LG entity_json as json_response.")
+            lg_response = supabase.table("regulations").select("entity_json").eq("id", results[0]["id"]).limit(1).execute()
+            if lg_response.data:
+                final_json_response = _parse_entity_json(lg_response.data[0].get("entity_json"))
+            logger.debug("✅ Returning LG entity_json as json_response.")
         
         return {
             "results": results,
             "json_response": final_json_response
         }
         
-    except json.JSONDecodeError as e:
-        print(f"Error parsing Gemini response as JSON: {e}")
-        print(f"Raw response: {response.text if 'response' in locals() else 'No response'}")
+    except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+        logger.error("Error parsing Gemini response as JSON: %s", e)
+        logger.error("Raw response: %s", response.text if 'response' in locals() else 'No response')
         return []
     except Exception as e:
-        print(f"Error analyzing query with Gemini: {e}")
+        logger.error("Error analyzing query with Gemini: %s", e)
         return []
 
 # --- Section 6: Search Function ---
@@ -696,13 +809,15 @@ def find_similar_regulations(query: str, threshold: float, count: int) -> List[D
     """
     Find similar regulations using vector similarity search.
     
-    Returns all columns from the regulations table:
-    - id, entity_type, lg_nr, ulg_nr, grundtext_nr, position_nr
-    - searchable_text, entity_json, embedding, created_at, similarity
+    Returns the regulation columns except the embedding vector:
+    - id, entity_type, lg_nr, ulg_nr, grundtext_nr, position_nr, full_nr, short_text
+    - searchable_text, entity_json, created_at, similarity
     """
-    query_embedding = _get_embedding(query, task_type="RETRIEVAL_QUERY")
+    # Case and whitespace variants of a query share one cached embedding (LRU / embedding_cache)
+    normalized_query = " ".join(query.split()).lower()
+    query_embedding = _get_embedding(normalized_query, task_type="RETRIEVAL_QUERY")
     if not query_embedding:
-        print("Warning: Could not generate embedding for query")
+        logger.warning("Warning: Could not generate embedding for query")
         return []
     
     try:
@@ -712,20 +827,63 @@ def find_similar_regulations(query: str, threshold: float, count: int) -> List[D
             'match_count': count
         }).execute()
         
-        # The RPC function now returns all columns from the regulations table
+        # The RPC function returns every column except the embedding vector
         results = response.data
-        print(f"Found {len(results)} similar regulations")
+        logger.debug("Found %s similar regulations", len(results))
 
         # Parse entity_json in all results before returning
         return _parse_entity_json_in_results(results)
     except Exception as e:
-        print(f"Error calling RPC function: {e}")
+        logger.error("Error calling RPC function: %s", e)
         return []
 # --- Section 7: ONLV Empty JSON Utility ---
+ONLV_EMPTY_JSON_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "onlv_empty.json")
+
+def _load_onlv_template() -> Optional[bytes]:
+    """Parses the template once and returns it re-serialized as compact orjson bytes."""
+    try:
+        with open(ONLV_EMPTY_JSON_PATH, 'rb') as f:
+            return orjson.dumps(_loads(f.read()))
+    except FileNotFoundError:
+        logger.error("Error: onlv_empty.json not found at %s", ONLV_EMPTY_JSON_PATH)
+    except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+        logger.error("Error decoding JSON from %s: %s", ONLV_EMPTY_JSON_PATH, e)
+    return None
+
+# Loaded once; get_onlv_empty_json decodes a fresh copy per call, which is much
+# cheaper than copy.deepcopy of the nested dicts
+_ONLV_TEMPLATE_BYTES = _load_onlv_template()
+
+def _fetch_onlv_project(project_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        logger.debug("🔍 Fetching project data for project_id: %s", project_id)
+        response = supabase.table("projects").select("*").eq("id", project_id).maybe_single().execute()
+        if response and response.data:
+            logger.debug("✅ Found project: %s", response.data.get('name', 'Unknown'))
+            return response.data
+        logger.warning("⚠️ No project found with id: %s", project_id)
+    except Exception as e:
+        logger.error("❌ Error fetching project data: %s", e)
+    return None
+
+def _fetch_onlv_boq(boq_id: str, with_project: bool) -> Optional[Dict[str, Any]]:
+    """Fetches a BoQ; with_project embeds its project under the "project" key."""
+    try:
+        logger.debug("🔍 Fetching BoQ data for boq_id: %s", boq_id)
+        columns = "*, project:projects(*)" if with_project else "*"
+        response = supabase.table("boqs").select(columns).eq("id", boq_id).maybe_single().execute()
+        if response and response.data:
+            logger.debug("✅ Found BoQ: %s", response.data.get('name', 'Unknown'))
+            return response.data
+        logger.warning("⚠️ No BoQ found with id: %s", boq_id)
+    except Exception as e:
+        logger.error("❌ Error fetching BoQ data: %s", e)
+    return None
+
 def get_onlv_empty_json(project_id: Optional[str] = None, boq_id: Optional[str] = None) -> Dict[str, Any]:
     """
-    Reads the content of 'backend/onlv_empty.json' and returns it as a dictionary.
-    Uses object_pairs_hook to preserve the original key order from the JSON file.
+    Returns a copy of the 'backend/onlv_empty.json' template as a dictionary.
+    The template is parsed once at import time; plain dicts keep the file's key order.
     
     Args:
         project_id: Optional UUID of the project to fetch project information from database
@@ -734,132 +892,114 @@ def get_onlv_empty_json(project_id: Optional[str] = None, boq_id: Optional[str]
     Returns:
         Dictionary containing the ONLV JSON structure with project and BoQ data populated if IDs are provided
     """
-    file_path = os.path.join(os.path.dirname(__file__), "..", "..", "onlv_empty.json")
-    
-    # Fetch project data if project_id is provided
     project_data = None
-    if project_id:
-        try:
-            print(f"🔍 Fetching project data for project_id: {project_id}")
-            response = supabase.table("projects").select("*").eq("id", project_id).execute()
-            if response.data and len(response.data) > 0:
-                project_data = response.data[0]
-                print(f"✅ Found project: {project_data.get('name', 'Unknown')}")
-            else:
-                print(f"⚠️ No project found with id: {project_id}")
-        except Exception as e:
-            print(f"❌ Error fetching project data: {e}")
-    
-    # Fetch BoQ data if boq_id is provided
     boq_data = None
-    if boq_id:
-        try:
-            print(f"🔍 Fetching BoQ data for boq_id: {boq_id}")
-            response = supabase.table("boqs").select("*").eq("id", boq_id).execute()
-            if response.data and len(response.data) > 0:
-                boq_data = response.data[0]
-                print(f"✅ Found BoQ: {boq_data.get('name', 'Unknown')}")
-                
-                # If no project_id was provided but BoQ has project_id, fetch project data
-                if not project_id and boq_data.get("project_id"):
-                    try:
-                        print(f"🔍 Fetching project data from BoQ's project_id: {boq_data['project_id']}")
-                        project_response = supabase.table("projects").select("*").eq("id", boq_data["project_id"]).execute()
-                        if project_response.data and len(project_response.data) > 0:
-                            project_data = project_response.data[0]
-                            print(f"✅ Found project from BoQ: {project_data.get('name', 'Unknown')}")
-                            print(f"🔍 Project data from BoQ: nr={project_data.get('nr')}, name={project_data.get('name')}, lv_bezeichnung={project_data.get('lv_bezeichnung')}, auftraggeber={project_data.get('auftraggeber')}")
-                    except Exception as e:
-                        print(f"❌ Error fetching project data from BoQ: {e}")
-            else:
-                print(f"⚠️ No BoQ found with id: {boq_id}")
-        except Exception as e:
-            print(f"❌ Error fetching BoQ data: {e}")
+    if project_id and boq_id:
+        # The two lookups are independent, so run them concurrently to save a round trip
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            project_future = executor.submit(_fetch_onlv_project, project_id)
+            boq_future = executor.submit(_fetch_onlv_boq, boq_id, False)
+            project_data = project_future.result()
+            boq_data = boq_future.result()
+    elif project_id:
+        project_data = _fetch_onlv_project(project_id)
+    elif boq_id:
+        # Without a project_id the BoQ's project is embedded through the boqs.project_id
+        # foreign key, so both come back in one request
+        boq_data = _fetch_onlv_boq(boq_id, True)
+        project_data = boq_data.pop("project", None) if boq_data else None
+        if project_data:
+            logger.debug("✅ Found project from BoQ: %s", project_data.get('name', 'Unknown'))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "🔍 Project data from BoQ: nr=%s, name=%s, lv_bezeichnung=%s, auftraggeber=%s",
+                    project_data.get('nr'), project_data.get('name'), project_data.get('lv_bezeichnung'), project_data.get('auftraggeber')
+                )
     
+    if _ONLV_TEMPLATE_BYTES is None:
+        logger.error("Error: onlv_empty.json template is not available at %s", ONLV_EMPTY_JSON_PATH)
+        return {}
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            # Use object_pairs_hook to preserve key order
-            from collections import OrderedDict
-            onlv_json = json.load(f, object_pairs_hook=OrderedDict)
-
-            # Update 'erstelltam' with current datetime in ISO 8601 format
-            current_datetime_iso = datetime.now().isoformat(timespec='seconds') + 'Z'
-            if "onlv" in onlv_json and "metadaten" in onlv_json["onlv"]:
-                onlv_json["onlv"]["metadaten"]["erstelltam"] = current_datetime_iso
-                
-                # Use BoQ original_filename if available, otherwise project dateiname, otherwise default
-                if boq_data and boq_data.get("original_filename"):
-                    onlv_json["onlv"]["metadaten"]["dateiname"] = boq_data["original_filename"]
-                elif project_data and project_data.get("dateiname"):
-                    onlv_json["onlv"]["metadaten"]["dateiname"] = project_data["dateiname"]
-                else:
-                    onlv_json["onlv"]["metadaten"]["dateiname"] = "Generated Onlv"
+        # Decode a fresh copy so the cached template is never modified
+        onlv_json = orjson.loads(_ONLV_TEMPLATE_BYTES)
 
-            # Update 'preisbasis' and 'bearbeitungsstand' with current date in YYYY-MM-DD format
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            if "onlv" in onlv_json and "ausschreibungs-lv" in onlv_json["onlv"] and "kenndaten" in onlv_json["onlv"]["ausschreibungs-lv"]:
-                kenndaten = onlv_json["onlv"]["ausschreibungs-lv"]["kenndaten"]
-                
-                # Update with BoQ and project data if available
-                # Priority: BoQ data > Project data > Default values
-                
-                # LV-Code: Use BoQ lv_code if available, otherwise project nr
-                if boq_data and boq_data.get("lv_code"):
-                    kenndaten["lvcode"] = str(boq_data["lv_code"])
-                    print(f"✅ Set lvcode from BoQ: {boq_data['lv_code']}")
-                elif project_data and project_data.get("nr"):
-                    kenndaten["lvcode"] = str(project_data["nr"])
-                    print(f"✅ Set lvcode from project: {project_data['nr']}")
-                
-                # Vorhaben (Project name): Always use project name
-                if project_data and project_data.get("name"):
-                    kenndaten["vorhaben"] = str(project_data["name"])
-                    print(f"✅ Set vorhaben from project: {project_data['name']}")
-                
-                # LV-Bezeichnung: Use BoQ lv_bezeichnung if available, otherwise project lv_bezeichnung
-                if boq_data and boq_data.get("lv_bezeichnung"):
-                    kenndaten["lvbezeichnung"] = str(boq_data["lv_bezeichnung"])
-                    print(f"✅ Set lvbezeichnung from BoQ: {boq_data['lv_bezeichnung']}")
-                elif project_data and project_data.get("lv_bezeichnung"):
-                    kenndaten["lvbezeichnung"] = str(project_data["lv_bezeichnung"])
-                    print(f"✅ Set lvbezeichnung from project: {project_data['lv_bezeichnung']}")
-                
-                # Auftraggeber: Use project auftraggeber if available
-                if project_data and project_data.get("auftraggeber") and "auftraggeber" in kenndaten and "firma" in kenndaten["auftraggeber"]:
-                    kenndaten["auftraggeber"]["firma"]["name"] = str(project_data["auftraggeber"])
-                    print(f"✅ Set auftraggeber from project: {project_data['auftraggeber']}")
-                
-                # Set default values for dates and other fields
-                if "bearbeitungsstand" in kenndaten:
-                    kenndaten["bearbeitungsstand"] = current_date
-                if "preisbasis" in kenndaten:
-                    kenndaten["preisbasis"] = current_date
-                
-                # Set default lvbezeichnung if not set from BoQ or project data
-                if "lvbezeichnung" in kenndaten and not kenndaten.get("lvbezeichnung"):
-                    kenndaten["lvbezeichnung"] = "Trockenbauarbeiten"
-                    print(f"✅ Set default lvbezeichnung: Trockenbauarbeiten")
-                
-                # Debug: Show final kenndaten values
-                print(f"🎯 Final kenndaten values:")
-                print(f"   lvcode: {kenndaten.get('lvcode')}")
-                print(f"   vorhaben: {kenndaten.get('vorhaben')}")
-                print(f"   lvbezeichnung: {kenndaten.get('lvbezeichnung')}")
-                if "auftraggeber" in kenndaten and "firma" in kenndaten["auftraggeber"]:
-                    print(f"   auftraggeber: {kenndaten['auftraggeber']['firma'].get('name')}")
+        # Update 'erstelltam' with current datetime in ISO 8601 format
+        current_datetime_iso = datetime.now().isoformat(timespec='seconds') + 'Z'
+        if "onlv" in onlv_json and "metadaten" in onlv_json["onlv"]:
+            onlv_json["onlv"]["metadaten"]["erstelltam"] = current_datetime_iso
             
-            return onlv_json
-    except FileNotFoundError:
-        print(f"Error: onlv_empty.json not found at {file_path}")
-        return {}
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON from {file_path}: {e}")
-        return {}
+            # Use BoQ original_filename if available, otherwise project dateiname, otherwise default
+            if boq_data and boq_data.get("original_filename"):
+                onlv_json["onlv"]["metadaten"]["dateiname"] = boq_data["original_filename"]
+            elif project_data and project_data.get("dateiname"):
+                onlv_json["onlv"]["metadaten"]["dateiname"] = project_data["dateiname"]
+            else:
+                onlv_json["onlv"]["metadaten"]["dateiname"] = "Generated Onlv"
+
+        # Update 'preisbasis' and 'bearbeitungsstand' with current date in YYYY-MM-DD format
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        if "onlv" in onlv_json and "ausschreibungs-lv" in onlv_json["onlv"] and "kenndaten" in onlv_json["onlv"]["ausschreibungs-lv"]:
+            kenndaten = onlv_json["onlv"]["ausschreibungs-lv"]["kenndaten"]
+            
+            # Update with BoQ and project data if available
+            # Priority: BoQ data > Project data > Default values
+            
+            # LV-Code: Use BoQ lv_code if available, otherwise project nr
+            if boq_data and boq_data.get("lv_code"):
+                kenndaten["lvcode"] = str(boq_data["lv_code"])
+                logger.debug("✅ Set lvcode from BoQ: %s", boq_data['lv_code'])
+            elif project_data and project_data.get("nr"):
+                kenndaten["lvcode"] = str(project_data["nr"])
+                logger.debug("✅ Set lvcode from project: %s", project_data['nr'])
+            
+            # Vorhaben (Project name): Always use project name
+            if project_data and project_data.get("name"):
+                kenndaten["vorhaben"] = str(project_data["name"])
+                logger.debug("✅ Set vorhaben from project: %s", project_data['name'])
+            
+            # LV-Bezeichnung: Use BoQ lv_bezeichnung if available, otherwise project lv_bezeichnung
+            if boq_data and boq_data.get("lv_bezeichnung"):
+                kenndaten["lvbezeichnung"] = str(boq_data["lv_bezeichnung"])
+                logger.debug("✅ Set lvbezeichnung from BoQ: %s", boq_data['lv_bezeichnung'])
+            elif project_data and project_data.get("lv_bezeichnung"):
+                kenndaten["lvbezeichnung"] = str(project_data["lv_bezeichnung"])
+                logger.debug("✅ Set lvbezeichnung from project: %s", project_data['lv_bezeichnung'])
+            
+            # Auftraggeber: Use project auftraggeber if available
+            if project_data and project_data.get("auftraggeber") and "auftraggeber" in kenndaten and "firma" in kenndaten["auftraggeber"]:
+                kenndaten["auftraggeber"]["firma"]["name"] = str(project_data["auftraggeber"])
+                logger.debug("✅ Set auftraggeber from project: %s", project_data['auftraggeber'])
+            
+            # Set default values for dates and other fields
+            if "bearbeitungsstand" in kenndaten:
+                kenndaten["bearbeitungsstand"] = current_date
+            if "preisbasis" in kenndaten:
+                kenndaten["preisbasis"] = current_date
+            
+            # Set default lvbezeichnung if not set from BoQ or project data
+            if "lvbezeichnung" in kenndaten and not kenndaten.get("lvbezeichnung"):
+                kenndaten["lvbezeichnung"] = "Trockenbauarbeiten"
+                logger.debug("✅ Set default lvbezeichnung: Trockenbauarbeiten")
+            
+            # Debug: Show final kenndaten values
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🎯 Final kenndaten values:")
+                logger.debug("   lvcode: %s", kenndaten.get('lvcode'))
+                logger.debug("   vorhaben: %s", kenndaten.get('vorhaben'))
+                logger.debug("   lvbezeichnung: %s", kenndaten.get('lvbezeichnung'))
+                if "auftraggeber" in kenndaten and "firma" in kenndaten["auftraggeber"]:
+                    logger.debug("   auftraggeber: %s", kenndaten['auftraggeber']['firma'].get('name'))
+        
+        return onlv_json
     except Exception as e:
-        print(f"An unexpected error occurred while reading {file_path}: {e}")
+        logger.error("An unexpected error occurred while filling the onlv_empty.json template: %s", e)
         return {}
 
 # --- Section 8: BoQ Helper Functions ---
+# BoQ fields used for ONLV generation
+BOQ_ONLV_COLUMNS = "id, project_id, name, lv_code, lv_bezeichnung, original_filename, created_at"
+
 def get_onlv_empty_json_for_boq(boq_id: str) -> Dict[str, Any]:
     """
     Convenience function to get ONLV empty JSON populated with BoQ data.
@@ -884,17 +1024,17 @@ def get_boq_by_id(boq_id: str) -> Optional[Dict[str, Any]]:
         BoQ record dictionary or None if not found
     """
     try:
-        print(f"🔍 Fetching BoQ with id: {boq_id}")
-        response = supabase.table("boqs").select("*").eq("id", boq_id).execute()
-        if response.data and len(response.data) > 0:
-            boq_data = response.data[0]
-            print(f"✅ Found BoQ: {boq_data.get('name', 'Unknown')} (LV-Code: {boq_data.get('lv_code', 'N/A')})")
+        logger.debug("🔍 Fetching BoQ with id: %s", boq_id)
+        response = supabase.table("boqs").select(BOQ_ONLV_COLUMNS).eq("id", boq_id).maybe_single().execute()
+        if response and response.data:
+            boq_data = response.data
+            logger.debug("✅ Found BoQ: %s (LV-Code: %s)", boq_data.get('name', 'Unknown'), boq_data.get('lv_code', 'N/A'))
             return boq_data
         else:
-            print(f"⚠️ No BoQ found with id: {boq_id}")
+            logger.warning("⚠️ No BoQ found with id: %s", boq_id)
             return None
     except Exception as e:
-        print(f"❌ Error fetching BoQ data: {e}")
+        logger.error("❌ Error fetching BoQ data: %s", e)
         return None
 
 def get_boqs_by_project_id(project_id: str) -> List[Dict[str, Any]]:
@@ -908,16 +1048,19 @@ def get_boqs_by_project_id(project_id: str) -> List[Dict[str, Any]]:
         List of BoQ records for the project
     """
     try:
-        print(f"🔍 Fetching BoQs for project_id: {project_id}")
-        response = supabase.table("boqs").select("*").eq("project_id", project_id).order("created_at").execute()
+        logger.debug("🔍 Fetching BoQs for project_id: %s", project_id)
+        response = supabase.table("boqs").select(BOQ_ONLV_COLUMNS).eq("project_id", project_id).order("created_at").execute()
         boqs = response.data
-        print(f"✅ Found {len(boqs)} BoQs for project")
+        logger.debug("✅ Found %s BoQs for project", len(boqs))
         return boqs
     except Exception as e:
-        print(f"❌ Error fetching BoQs for project: {e}")
+        logger.error("❌ Error fetching BoQs for project: %s", e)
         return []
 
 # --- Section 9: Regulation Number Parser ---
+# Regulation number: 6 digits (LG, ULG, Grundtext) plus an optional position letter
+_REG_NR_RE = re.compile(r'^\d{6}[A-Za-z]?$')
+
 def parse_regulation_number(regulation_nr: str) -> Dict[str, Optional[str]]:
     """
     Parse regulation number format like '003901C' or '003502' by querying the full_nr column.
@@ -938,31 +1081,32 @@ def parse_regulation_number(regulation_nr: str) -> Dict[str, Optional[str]]:
     regulation_nr = regulation_nr.strip()
 
     # Check if the format is valid (6 digits + optional letter)
-    if not re.match(r'^\d{6}[A-Za-z]?$', regulation_nr):
-        print(f"Invalid regulation number format: {regulation_nr}")
+    if not _REG_NR_RE.match(regulation_nr):
+        logger.warning("Invalid regulation number format: %s", regulation_nr)
         return {"lg_nr": None, "ulg_nr": None, "grundtext_nr": None, "position_nr": None}
 
     try:
         # Query database using full_nr column
-        response = supabase.table("regulations").select("lg_nr, ulg_nr, grundtext_nr, position_nr").eq("full_nr", regulation_nr).execute()
+        # full_nr is shared by a Grundtext and its UngeteiltePositionen, so take the first row
+        response = supabase.table("regulations").select("lg_nr, ulg_nr, grundtext_nr, position_nr").eq("full_nr", regulation_nr).limit(1).maybe_single().execute()
 
-        if response.data and len(response.data) > 0:
+        if response and response.data:
             # Return the components from the first matching record
-            record = response.data[0]
+            record = response.data
             result = {
                 "lg_nr": record.get("lg_nr"),
                 "ulg_nr": record.get("ulg_nr"),
                 "grundtext_nr": record.get("grundtext_nr"),
                 "position_nr": record.get("position_nr")
             }
-            print(f"Found regulation components for '{regulation_nr}': {result}")
+            logger.debug("Found regulation components for '%s': %s", regulation_nr, result)
             return result
         else:
-            print(f"No regulation found with full_nr: {regulation_nr}")
+            logger.debug("No regulation found with full_nr: %s", regulation_nr)
             return {"lg_nr": None, "ulg_nr": None, "grundtext_nr": None, "position_nr": None}
 
     except Exception as e:
-        print(f"Error querying regulation by full_nr '{regulation_nr}': {e}")
+        logger.error("Error querying regulation by full_nr '%s': %s", regulation_nr, e)
         return {"lg_nr": None, "ulg_nr": None, "grundtext_nr": None, "position_nr": None}
 
 def find_regulation_by_number(regulation_nr: str) -> List[Dict[str, Any]]:
@@ -982,50 +1126,24 @@ def find_regulation_by_number(regulation_nr: str) -> List[Dict[str, Any]]:
     regulation_nr = regulation_nr.strip()
 
     # Check if the format is valid (6 digits + optional letter)
-    if not re.match(r'^\d{6}[A-Za-z]?$', regulation_nr):
-        print(f"Invalid regulation number format: {regulation_nr}")
+    if not _REG_NR_RE.match(regulation_nr):
+        logger.warning("Invalid regulation number format: %s", regulation_nr)
         return []
 
     try:
-        # Query database directly using full_nr column
-        print(f"🔍 Searching regulations with full_nr = '{regulation_nr}'")
-
-        response = supabase.table("regulations").select("*").eq("full_nr", regulation_nr).execute()
-        results = response.data
+        # Exact match first; if that finds nothing the RPC retries with the leading zeros
+        # of each 2-digit component stripped ('003901C' -> '0391C') - one round trip
+        logger.debug("🔍 Searching regulations with full_nr = '%s'", regulation_nr)
+        response = supabase.rpc("find_regulation_by_full_nr", {"p_full_nr": regulation_nr}).execute()
+        results = response.data or []
 
-        print(f"📈 Found {len(results)} regulations matching full_nr: '{regulation_nr}'")
-
-        # If no exact match found, try alternative searches
-        if not results:
-            print(f"🔄 No exact match found, trying alternative searches...")
-
-            # Try searching without leading zeros for numeric components
-            # Extract components for alternative search
-            lg_nr = regulation_nr[0:2]
-            ulg_nr = regulation_nr[2:4]
-            grundtext_nr = regulation_nr[4:6]
-            position_nr = regulation_nr[6:].upper() if len(regulation_nr) > 6 else None
-
-            alt_lg_nr = str(int(lg_nr)) if lg_nr.isdigit() else lg_nr
-            alt_ulg_nr = str(int(ulg_nr)) if ulg_nr.isdigit() else ulg_nr
-            alt_grundtext_nr = str(int(grundtext_nr)) if grundtext_nr.isdigit() else grundtext_nr
-
-            # Create alternative full_nr without leading zeros
-            alt_regulation_nr = f"{alt_lg_nr}{alt_ulg_nr}{alt_grundtext_nr}{position_nr if position_nr else ''}"
-
-            if alt_regulation_nr != regulation_nr:
-                print(f"🔍 Trying alternative search with full_nr = '{alt_regulation_nr}'")
-
-                alt_response = supabase.table("regulations").select("*").eq("full_nr", alt_regulation_nr).execute()
-                if alt_response.data:
-                    print(f"✅ Found {len(alt_response.data)} results with alternative search")
-                    results = alt_response.data
+        logger.debug("📈 Found %s regulations matching full_nr: '%s'", len(results), regulation_nr)
 
         # Parse entity_json in all results before returning
         return _parse_entity_json_in_results(results)
 
     except Exception as e:
-        print(f"Error querying regulations by number '{regulation_nr}': {e}")
+        logger.error("Error querying regulations by number '%s': %s", regulation_nr, e)
         return []
 
 def unified_regulation_search(query: str) -> Dict[str, Any]:
@@ -1053,39 +1171,39 @@ def unified_regulation_search(query: str) -> Dict[str, Any]:
     query = query.strip()
     
     # Check if query matches regulation number format (6 digits + optional letter)
-    if re.match(r'^\d{6}[A-Za-z]?$', query):
-        print(f"🔢 Detected regulation number format: '{query}'")
+    if _REG_NR_RE.match(query):
+        logger.debug("🔢 Detected regulation number format: '%s'", query)
         
-        # Use number-based search
+        # Use number-based search (entity_json is already parsed by find_regulation_by_number)
         results = find_regulation_by_number(query)
         
         return {
             "search_type": "number",
             "query": query,
-            "results": _parse_entity_json_in_results(results),
-            "json_response": _parse_entity_json(results[0].get("entity_json")) if results else None,
+            "results": results,
+            "json_response": results[0].get("entity_json") if results else None,
             "total_results": len(results),
             "parsed_components": parse_regulation_number(query)
         }
     
     else:
-        print(f"📝 Detected text query format: '{query}'")
+        logger.debug("📝 Detected text query format: '%s'", query)
         
-        # First try direct searchable_text search
+        # First try direct searchable_text search (entity_json is already parsed)
         direct_results = search_in_searchable_text(query)
         
         if direct_results:
-            print(f"✅ Found {len(direct_results)} results with direct searchable_text search")
+            logger.debug("✅ Found %s results with direct searchable_text search", len(direct_results))
             return {
                 "search_type": "direct_text",
                 "query": query,
-                "results": _parse_entity_json_in_results(direct_results),
-                "json_response": _parse_entity_json(direct_results[0].get("entity_json")) if direct_results else None,
+                "results": direct_results,
+                "json_response": direct_results[0].get("entity_json"),
                 "total_results": len(direct_results)
             }
         
         # If no direct results, fall back to AI-powered search
-        print(f"🤖 No direct text matches found, trying AI-powered search...")
+        logger.debug("🤖 No direct text matches found, trying AI-powered search...")
         result = analyze_query_with_gemini(query)
         
         # Handle different result formats from analyze_query_with_gemini
@@ -1132,7 +1250,9 @@ def unified_regulation_search(query: str) -> Dict[str, Any]:
 
 def search_in_searchable_text(query: str, limit: int = 50) -> List[Dict[str, Any]]:
     """
-    Search directly in the searchable_text field using ILIKE (case-insensitive).
+    Search the searchable_text field with PostgreSQL full-text search (German stemming,
+    GIN index, ranked by ts_rank_cd). Falls back to ILIKE substring matching when the
+    full-text search finds nothing, e.g. for partial words or numbers.
     
     Args:
         query: Text to search for in searchable_text field
@@ -1149,17 +1269,21 @@ def search_in_searchable_text(query: str, limit: int = 50) -> List[Dict[str, Any
         return []
     
     try:
-        print(f"🔍 Searching in searchable_text for: '{query}'")
-        
-        # Use ILIKE for case-insensitive search with wildcards
-        response = supabase.table("regulations").select("*").ilike("searchable_text", f"%{query}%").limit(limit).execute()
+        logger.debug("🔍 Searching in searchable_text for: '%s'", query)
         
-        results = response.data
-        print(f"📈 Direct searchable_text search found {len(results)} results")
+        response = supabase.rpc("match_regulations_text", {"query": query, "match_count": limit}).execute()
+        results = response.data or []
+        logger.debug("📈 Full-text searchable_text search found %s results", len(results))
+
+        if not results:
+            # Use ILIKE for case-insensitive substring search with wildcards
+            response = supabase.table("regulations").select(REGULATION_COLUMNS).ilike("searchable_text", f"%{query}%").limit(limit).execute()
+            results = response.data
+            logger.debug("📈 Direct searchable_text search found %s results", len(results))
 
         # Parse entity_json in all results before returning
         return _parse_entity_json_in_results(results)
         
     except Exception as e:
-        print(f"Error searching in searchable_text for '{query}': {e}")
+        logger.error("Error searching in searchable_text for '%s': %s", query, e)
         return []
\ No newline at end of file
@@ -21,25 +21,52 @@ Constraints:
 - category_id must reference an existing category (optional)
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+from postgrest.types import ReturnMethod
+from ..database import get_async_supabase_client
+from ..cache import TTLCache
+from .element_regulations_service import invalidate_link_count_cache
 
-# Initialize Supabase client
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+logger = logging.getLogger(__name__)
+
+# Columns needed by list views; detail endpoints keep select("*") for the full row
+ELEMENT_SUMMARY_COLUMNS = "id, name, type, category_id, updated_at"
+
+# Rows per INSERT request in create_elements_bulk; keeps each PostgREST body well
+# below its request size limit while still sending one multi-row INSERT per chunk
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Paginated list queries return the total number of matches alongside the page
+# (PostgREST Content-Range), so callers do not need a second count round trip
+PAGE_COUNT_MODE = "exact"
+
+# Upper bound for any page size requested from this module, whatever the caller passes
+MAX_PAGE_SIZE = 1000
+
+# Table-wide stats (total count, unique types) change rarely but scan the whole table,
+# so they are cached briefly and dropped whenever this module writes to element_list
+STATS_CACHE_TTL = 60.0
+_stats_cache = TTLCache(STATS_CACHE_TTL)
+
+def invalidate_element_stats_cache() -> None:
+    """Drop cached table-wide element stats after element_list has been modified."""
+    _stats_cache.clear()
+
+def _clamp_page(limit: int, offset: int) -> Tuple[int, int]:
+    """Bound limit to 1..MAX_PAGE_SIZE and offset to >= 0."""
+    return min(max(limit, 1), MAX_PAGE_SIZE), max(offset, 0)
 
 # CREATE Operations
-def create_element(name: str, type: str, user_id: str, description: Optional[str] = None, category_id: Optional[str] = None) -> Dict[str, Any]:
+async def create_element(name: str, type: str, user_id: str, description: Optional[str] = None, category_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Create a new element in the element_list table.
 
+    Input is expected to be validated and trimmed at the API boundary (schemas.ElementCreate).
+
     Args:
-        name: Element name (must not be empty after trimming)
-        type: Element type (must not be empty after trimming)
+        name: Element name (non-empty)
+        type: Element type (non-empty)
         user_id: UUID of the user who owns this element
         description: Optional description of the element
         category_id: Optional UUID of the category this element belongs to
@@ -51,39 +78,76 @@ def create_element(name: str, type: str, user_id: str, description: Optional[str
         Exception: If database operation fails
     """
     try:
-        # Validate required fields
-        name = name.strip() if name else ""
-        type = type.strip() if type else ""
-
-        if not name:
-            return {"success": False, "error": "Element name cannot be empty"}
-
-        if not type:
-            return {"success": False, "error": "Element type cannot be empty"}
-
         element_data = {
             "name": name,
             "type": type,
             "user_id": user_id,
-            "description": description.strip() if description else None,
-            "category_id": category_id if category_id else None
+            "description": description or None,
+            "category_id": category_id or None
         }
         
-        response = supabase.table("element_list").insert(element_data).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").insert(element_data).execute()
         
         if response.data:
-            print(f"✅ Successfully created element: {name} (type: {type})")
+            invalidate_element_stats_cache()
+            logger.debug("✅ Successfully created element: %s (type: %s)", name, type)
             return {"success": True, "data": response.data[0]}
         else:
-            print(f"❌ Failed to create element: {name}")
+            logger.warning("❌ Failed to create element: %s", name)
             return {"success": False, "error": "Failed to create element"}
             
     except Exception as e:
-        print(f"❌ Error creating element {name}: {e}")
+        logger.exception("❌ Error creating element %s: %s", name, e)
         return {"success": False, "error": str(e)}
 
+async def create_elements_bulk(elements: List[Dict[str, Any]], chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Create many elements with one multi-row INSERT per chunk instead of one request per element.
+
+    Args:
+        elements: Element dictionaries with name, type, user_id and optional description/category_id
+        chunk_size: Maximum number of rows sent per INSERT (default: BULK_INSERT_CHUNK_SIZE)
+
+    Elements are expected to be validated and trimmed at the API boundary (schemas.ElementCreate).
+
+    Returns:
+        Dictionary containing the created elements or error information. If a chunk fails,
+        the rows of earlier chunks remain.
+    """
+    rows = [
+        {
+            "name": element["name"],
+            "type": element["type"],
+            "user_id": element["user_id"],
+            "description": element.get("description") or None,
+            "category_id": element.get("category_id") or None
+        }
+        for element in elements
+    ]
+
+    if not rows:
+        return {"success": True, "data": [], "created_count": 0}
+
+    created = []
+    try:
+        client = await get_async_supabase_client()
+        for i in range(0, len(rows), chunk_size):
+            response = await client.table("element_list").insert(rows[i:i + chunk_size]).execute()
+            created.extend(response.data or [])
+
+        logger.debug("✅ Successfully created %s elements", len(created))
+        return {"success": True, "data": created, "created_count": len(created)}
+
+    except Exception as e:
+        logger.exception("❌ Error creating elements in bulk after %s rows: %s", len(created), e)
+        return {"success": False, "error": str(e), "data": created, "created_count": len(created)}
+    finally:
+        if created:
+            invalidate_element_stats_cache()
+
 # READ Operations
-def get_element_by_id(element_id: str) -> Dict[str, Any]:
+async def get_element_by_id(element_id: str) -> Dict[str, Any]:
     """
     Retrieve an element by its ID.
     
@@ -94,20 +158,21 @@ def get_element_by_id(element_id: str) -> Dict[str, Any]:
         Dictionary containing element data or error information
     """
     try:
-        response = supabase.table("element_list").select("*").eq("id", element_id).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("*").eq("id", element_id).execute()
         
         if response.data:
-            print(f"✅ Successfully retrieved element: {element_id}")
+            logger.debug("✅ Successfully retrieved element: %s", element_id)
             return {"success": True, "data": response.data[0]}
         else:
-            print(f"❌ Element not found: {element_id}")
+            logger.debug("❌ Element not found: %s", element_id)
             return {"success": False, "error": "Element not found"}
             
     except Exception as e:
-        print(f"❌ Error retrieving element {element_id}: {e}")
+        logger.exception("❌ Error retrieving element %s: %s", element_id, e)
         return {"success": False, "error": str(e)}
 
-def get_elements_by_user_id(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_elements_by_user_id(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve all elements belonging to a specific user.
     
@@ -119,17 +184,43 @@ def get_elements_by_user_id(user_id: str, limit: int = 100, offset: int = 0) ->
     Returns:
         Dictionary containing list of elements or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        response = supabase.table("element_list").select("*").eq("user_id", user_id).range(offset, offset + limit - 1).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("*", count=PAGE_COUNT_MODE).eq("user_id", user_id).range(offset, offset + limit - 1).execute()
         
-        print(f"✅ Successfully retrieved {len(response.data)} elements for user: {user_id}")
-        return {"success": True, "data": response.data, "count": len(response.data)}
+        logger.debug("✅ Successfully retrieved %s elements for user: %s", len(response.data), user_id)
+        return {"success": True, "data": response.data, "count": len(response.data), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements for user {user_id}: {e}")
+        logger.exception("❌ Error retrieving elements for user %s: %s", user_id, e)
         return {"success": False, "error": str(e)}
 
-def get_elements_by_type(element_type: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def list_element_summaries(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+    """
+    Retrieve a compact summary (id, name, type, category, last update) of a user's elements.
+
+    Args:
+        user_id: UUID of the user whose elements to retrieve
+        limit: Maximum number of elements to return (default: 100)
+        offset: Number of elements to skip (default: 0)
+
+    Returns:
+        Dictionary containing list of element summaries or error information
+    """
+    limit, offset = _clamp_page(limit, offset)
+    try:
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select(ELEMENT_SUMMARY_COLUMNS, count=PAGE_COUNT_MODE).eq("user_id", user_id).range(offset, offset + limit - 1).execute()
+
+        logger.debug("✅ Successfully retrieved %s element summaries for user: %s", len(response.data), user_id)
+        return {"success": True, "data": response.data, "count": len(response.data), "total": response.count}
+
+    except Exception as e:
+        logger.exception("❌ Error retrieving element summaries for user %s: %s", user_id, e)
+        return {"success": False, "error": str(e)}
+
+async def get_elements_by_type(element_type: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve all elements of a specific type.
     
@@ -141,17 +232,19 @@ def get_elements_by_type(element_type: str, limit: int = 100, offset: int = 0) -
     Returns:
         Dictionary containing list of elements or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        response = supabase.table("element_list").select("*").eq("type", element_type).range(offset, offset + limit - 1).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("*", count=PAGE_COUNT_MODE).eq("type", element_type).range(offset, offset + limit - 1).execute()
         
-        print(f"✅ Successfully retrieved {len(response.data)} elements of type: {element_type}")
-        return {"success": True, "data": response.data, "count": len(response.data)}
+        logger.debug("✅ Successfully retrieved %s elements of type: %s", len(response.data), element_type)
+        return {"success": True, "data": response.data, "count": len(response.data), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements of type {element_type}: {e}")
+        logger.exception("❌ Error retrieving elements of type %s: %s", element_type, e)
         return {"success": False, "error": str(e)}
 
-def get_elements_by_user_and_type(user_id: str, element_type: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_elements_by_user_and_type(user_id: str, element_type: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve elements belonging to a specific user and of a specific type.
     
@@ -164,17 +257,20 @@ def get_elements_by_user_and_type(user_id: str, element_type: str, limit: int =
     Returns:
         Dictionary containing list of elements or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        response = supabase.table("element_list").select("*").eq("user_id", user_id).eq("type", element_type).range(offset, offset + limit - 1).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("*", count=PAGE_COUNT_MODE).eq("user_id", user_id).eq("type", element_type).range(offset, offset + limit - 1).execute()
         
-        print(f"✅ Successfully retrieved {len(response.data)} elements of type '{element_type}' for user: {user_id}")
-        return {"success": True, "data": response.data, "count": len(response.data)}
+        logger.debug("✅ Successfully retrieved %s elements of type '%s' for user: %s", len(response.data), element_type, user_id)
+        return {"success": True, "data": response.data, "count": len(response.data), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements of type {element_type} for user {user_id}: {e}")
+        logger.exception("❌ Error retrieving elements of type %s for user %s: %s", element_type, user_id, e)
         return {"success": False, "error": str(e)}
 
-def search_elements_by_name(search_term: str, user_id: Optional[str] = None, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def search_elements_by_name(search_term: str, user_id: Optional[str] = None, limit: int = 100, offset: int = 0,
+                                  user_ids: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Search elements by name using case-insensitive pattern matching.
     
@@ -183,27 +279,33 @@ def search_elements_by_name(search_term: str, user_id: Optional[str] = None, lim
         user_id: Optional user ID to limit search to specific user's elements
         limit: Maximum number of elements to return (default: 100)
         offset: Number of elements to skip (default: 0)
+        user_ids: Optional list of user IDs to search across in one query (combined with user_id)
         
     Returns:
         Dictionary containing list of matching elements or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        query = supabase.table("element_list").select("*")
+        client = await get_async_supabase_client()
+        query = client.table("element_list").select("*", count=PAGE_COUNT_MODE)
         
-        if user_id:
-            query = query.eq("user_id", user_id)
+        owner_ids = list(dict.fromkeys(([user_id] if user_id else []) + (user_ids or [])))
+        if len(owner_ids) == 1:
+            query = query.eq("user_id", owner_ids[0])
+        elif owner_ids:
+            query = query.in_("user_id", owner_ids)
         
         query = query.ilike("name", f"%{search_term}%").range(offset, offset + limit - 1)
-        response = query.execute()
+        response = await query.execute()
         
-        print(f"✅ Successfully found {len(response.data)} elements matching '{search_term}'")
-        return {"success": True, "data": response.data, "count": len(response.data)}
+        logger.debug("✅ Successfully found %s elements matching '%s'", len(response.data), search_term)
+        return {"success": True, "data": response.data, "count": len(response.data), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error searching elements with term '{search_term}': {e}")
+        logger.exception("❌ Error searching elements with term '%s': %s", search_term, e)
         return {"success": False, "error": str(e)}
 
-def get_all_elements(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_all_elements(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve all elements with pagination.
     
@@ -214,74 +316,121 @@ def get_all_elements(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     Returns:
         Dictionary containing list of elements or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        response = supabase.table("element_list").select("*").range(offset, offset + limit - 1).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("*", count=PAGE_COUNT_MODE).range(offset, offset + limit - 1).execute()
         
-        print(f"✅ Successfully retrieved {len(response.data)} elements")
-        return {"success": True, "data": response.data, "count": len(response.data)}
+        logger.debug("✅ Successfully retrieved %s elements", len(response.data))
+        return {"success": True, "data": response.data, "count": len(response.data), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error retrieving all elements: {e}")
+        logger.exception("❌ Error retrieving all elements: %s", e)
+        return {"success": False, "error": str(e)}
+
+async def get_elements_after(cursor_updated_at: Optional[str] = None, cursor_id: Optional[str] = None,
+                             limit: int = 100) -> Dict[str, Any]:
+    """
+    Retrieve elements newest-first using keyset pagination on (updated_at, id).
+
+    Unlike offset pagination, each page costs the same regardless of how deep it is.
+    Pass the next_cursor of the previous page to continue; omit the cursor for the first page.
+
+    Args:
+        cursor_updated_at: updated_at of the last element of the previous page
+        cursor_id: id of the last element of the previous page
+        limit: Maximum number of elements to return (default: 100)
+
+    Returns:
+        Dictionary containing list of elements, and the cursor of the next page
+        (None when there are no more elements), or error information
+    """
+    limit, _ = _clamp_page(limit, 0)
+    try:
+        client = await get_async_supabase_client()
+        query = client.table("element_list").select("*").order("updated_at", desc=True).order("id", desc=True)
+
+        if cursor_updated_at and cursor_id:
+            query = query.or_(
+                f'updated_at.lt."{cursor_updated_at}",'
+                f'and(updated_at.eq."{cursor_updated_at}",id.lt."{cursor_id}")'
+            )
+
+        response = await query.limit(limit).execute()
+
+        next_cursor = None
+        if len(response.data) == limit:
+            last = response.data[-1]
+            next_cursor = {"updated_at": last["updated_at"], "id": last["id"]}
+
+        logger.debug("✅ Successfully retrieved %s elements after cursor %s/%s", len(response.data), cursor_updated_at, cursor_id)
+        return {"success": True, "data": response.data, "count": len(response.data), "next_cursor": next_cursor}
+
+    except Exception as e:
+        logger.exception("❌ Error retrieving elements after cursor %s/%s: %s", cursor_updated_at, cursor_id, e)
         return {"success": False, "error": str(e)}
 
 # UPDATE Operations
-def update_element(element_id: str, name: Optional[str] = None, description: Optional[str] = None,
+async def update_element(element_id: str, name: Optional[str] = None, description: Optional[str] = None,
                    type: Optional[str] = None, category_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Update element information.
 
+    Input is expected to be validated and trimmed at the API boundary (schemas.ElementUpdate).
+
     Args:
         element_id: UUID of the element to update
-        name: New element name (optional, must not be empty if provided)
-        description: New description (optional, can be None to clear)
-        type: New element type (optional, must not be empty if provided)
-        category_id: New category ID (optional, can be None to clear)
+        name: New element name (optional, non-empty)
+        description: New description (optional, empty string clears it)
+        type: New element type (optional, non-empty)
+        category_id: New category ID (optional, empty string clears it)
 
     Returns:
-        Dictionary containing updated element data or error information
+        Dictionary containing the element after the update, whether anything changed,
+        or error information
     """
     try:
         update_data = {}
 
         if name is not None:
-            name = name.strip()
-            if not name:
-                return {"success": False, "error": "Element name cannot be empty"}
             update_data["name"] = name
 
         if description is not None:
-            update_data["description"] = description.strip() if description else None
+            update_data["description"] = description or None
 
         if type is not None:
-            type = type.strip()
-            if not type:
-                return {"success": False, "error": "Element type cannot be empty"}
             update_data["type"] = type
 
         if category_id is not None:
-            update_data["category_id"] = category_id if category_id else None
+            update_data["category_id"] = category_id or None
 
         if not update_data:
             return {"success": False, "error": "No update data provided"}
 
-        # Add updated_at timestamp
-        update_data["updated_at"] = "NOW()"
-
-        response = supabase.table("element_list").update(update_data).eq("id", element_id).execute()
+        # The RPC compares against the stored row and skips the UPDATE when nothing
+        # differs; updated_at is set by the element_list_updated_at trigger
+        client = await get_async_supabase_client()
+        response = await client.rpc(
+            "update_element_if_changed", {"p_id": element_id, "p_changes": update_data}
+        ).execute()
 
         if response.data:
-            print(f"✅ Successfully updated element: {element_id}")
-            return {"success": True, "data": response.data[0]}
+            if response.data["changed"]:
+                invalidate_element_stats_cache()
+                logger.debug("✅ Successfully updated element: %s", element_id)
+            else:
+                logger.debug("Element unchanged, skipped update: %s", element_id)
+            return {"success": True, "data": response.data["element"], "changed": response.data["changed"]}
         else:
-            print(f"❌ Failed to update element: {element_id}")
+            logger.warning("❌ Failed to update element: %s", element_id)
             return {"success": False, "error": "Element not found or update failed"}
 
     except Exception as e:
-        print(f"❌ Error updating element {element_id}: {e}")
+        logger.exception("❌ Error updating element %s: %s", element_id, e)
         return {"success": False, "error": str(e)}
 
 # DELETE Operations
-def delete_element(element_id: str) -> Dict[str, Any]:
+async def delete_element(element_id: str) -> Dict[str, Any]:
     """
     Delete an element from the database.
     
@@ -294,20 +443,24 @@ def delete_element(element_id: str) -> Dict[str, Any]:
         Dictionary containing success status or error information
     """
     try:
-        response = supabase.table("element_list").delete().eq("id", element_id).execute()
-        
-        if response.data:
-            print(f"✅ Successfully deleted element: {element_id}")
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").delete(count="exact", returning=ReturnMethod.minimal).eq("id", element_id).execute()
+        
+        if response.count:
+            invalidate_element_stats_cache()
+            # The delete cascades to the element's regulation links
+            invalidate_link_count_cache()
+            logger.debug("✅ Successfully deleted element: %s", element_id)
             return {"success": True, "message": "Element deleted successfully"}
         else:
-            print(f"❌ Failed to delete element: {element_id}")
+            logger.warning("❌ Failed to delete element: %s", element_id)
             return {"success": False, "error": "Element not found or delete failed"}
             
     except Exception as e:
-        print(f"❌ Error deleting element {element_id}: {e}")
+        logger.exception("❌ Error deleting element %s: %s", element_id, e)
         return {"success": False, "error": str(e)}
 
-def delete_elements_by_user_id(user_id: str) -> Dict[str, Any]:
+async def delete_elements_by_user_id(user_id: str) -> Dict[str, Any]:
     """
     Delete all elements belonging to a specific user.
     
@@ -320,18 +473,22 @@ def delete_elements_by_user_id(user_id: str) -> Dict[str, Any]:
         Dictionary containing success status and count of deleted elements or error information
     """
     try:
-        response = supabase.table("element_list").delete().eq("user_id", user_id).execute()
-        
-        deleted_count = len(response.data) if response.data else 0
-        print(f"✅ Successfully deleted {deleted_count} elements for user: {user_id}")
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").delete(count="exact", returning=ReturnMethod.minimal).eq("user_id", user_id).execute()
+        
+        deleted_count = response.count or 0
+        if deleted_count:
+            invalidate_element_stats_cache()
+            invalidate_link_count_cache()
+        logger.debug("✅ Successfully deleted %s elements for user: %s", deleted_count, user_id)
         return {"success": True, "message": f"Deleted {deleted_count} elements", "deleted_count": deleted_count}
         
     except Exception as e:
-        print(f"❌ Error deleting elements for user {user_id}: {e}")
+        logger.exception("❌ Error deleting elements for user %s: %s", user_id, e)
         return {"success": False, "error": str(e)}
 
 # UTILITY Functions
-def get_element_count_by_user(user_id: str) -> int:
+async def get_element_count_by_user(user_id: str) -> int:
     """
     Get the total number of elements for a specific user.
     
@@ -342,13 +499,14 @@ def get_element_count_by_user(user_id: str) -> int:
         Total count of elements for the user
     """
     try:
-        response = supabase.table("element_list").select("id", count="exact").eq("user_id", user_id).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("id", count="exact", head=True).eq("user_id", user_id).execute()
         return response.count if response.count is not None else 0
     except Exception as e:
-        print(f"❌ Error getting element count for user {user_id}: {e}")
+        logger.exception("❌ Error getting element count for user %s: %s", user_id, e)
         return 0
 
-def get_element_count_by_type(element_type: str) -> int:
+async def get_element_count_by_type(element_type: str) -> int:
     """
     Get the total number of elements of a specific type.
     
@@ -359,48 +517,59 @@ def get_element_count_by_type(element_type: str) -> int:
         Total count of elements of the specified type
     """
     try:
-        response = supabase.table("element_list").select("id", count="exact").eq("type", element_type).execute()
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("id", count="exact", head=True).eq("type", element_type).execute()
         return response.count if response.count is not None else 0
     except Exception as e:
-        print(f"❌ Error getting element count for type {element_type}: {e}")
+        logger.exception("❌ Error getting element count for type %s: %s", element_type, e)
         return 0
 
-def get_total_element_count() -> int:
+async def get_total_element_count() -> int:
     """
     Get the total number of elements in the database.
     
     Returns:
         Total count of elements
     """
+    cached = _stats_cache.get("total_count")
+    if cached is not None:
+        return cached
+
     try:
-        response = supabase.table("element_list").select("id", count="exact").execute()
-        return response.count if response.count is not None else 0
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("id", count="exact", head=True).execute()
+        total = response.count if response.count is not None else 0
+        _stats_cache.set("total_count", total)
+        return total
     except Exception as e:
-        print(f"❌ Error getting total element count: {e}")
+        logger.exception("❌ Error getting total element count: %s", e)
         return 0
 
-def get_unique_element_types() -> List[str]:
+async def get_unique_element_types() -> List[str]:
     """
     Get all unique element types in the database.
     
     Returns:
         List of unique element types
     """
+    cached = _stats_cache.get("unique_types")
+    if cached is not None:
+        return list(cached)
+
     try:
-        response = supabase.table("element_list").select("type").execute()
-        
-        if response.data:
-            unique_types = list(set(item["type"] for item in response.data))
-            print(f"✅ Found {len(unique_types)} unique element types")
-            return unique_types
-        else:
-            return []
+        client = await get_async_supabase_client()
+        response = await client.rpc("unique_element_types").execute()
+
+        unique_types = [item["type"] for item in response.data or []]
+        logger.debug("✅ Found %s unique element types", len(unique_types))
+        _stats_cache.set("unique_types", unique_types)
+        return list(unique_types)
             
     except Exception as e:
-        print(f"❌ Error getting unique element types: {e}")
+        logger.exception("❌ Error getting unique element types: %s", e)
         return []
 
-def check_element_exists(element_id: str) -> bool:
+async def check_element_exists(element_id: str) -> bool:
     """
     Check if an element exists in the database.
     
@@ -411,13 +580,14 @@ def check_element_exists(element_id: str) -> bool:
         True if element exists, False otherwise
     """
     try:
-        response = supabase.table("element_list").select("id").eq("id", element_id).execute()
-        return len(response.data) > 0
+        client = await get_async_supabase_client()
+        response = await client.table("element_list").select("id", count="exact", head=True).eq("id", element_id).execute()
+        return (response.count or 0) > 0
     except Exception as e:
-        print(f"❌ Error checking element existence {element_id}: {e}")
+        logger.exception("❌ Error checking element existence %s: %s", element_id, e)
         return False
 
-def get_elements_with_user_info(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_elements_with_user_info(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve elements with their associated user information and regulation counts.
     
@@ -428,32 +598,23 @@ def get_elements_with_user_info(limit: int = 100, offset: int = 0) -> Dict[str,
     Returns:
         Dictionary containing list of elements with user info and regulation counts or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        response = supabase.table("element_list").select("""
-            *,
-            users:user_id (
-                id,
-                email,
-                name
-            ),
-            element_regulations!inner(count)
-        """).range(offset, offset + limit - 1).execute()
-        
-        # Add regulation count to each element
-        for element in response.data:
-            element['regulation_count'] = len(element.get('element_regulations', []))
-            # Remove the element_regulations array as we only need the count
-            if 'element_regulations' in element:
-                del element['element_regulations']
-        
-        print(f"✅ Successfully retrieved {len(response.data)} elements with user info and regulation counts")
+        # regulation_count is computed by the element_list_with_counts view; its security_invoker
+        # setting keeps the caller's RLS on both the elements and the embedded users
+        client = await get_async_supabase_client()
+        response = await client.table("element_list_with_counts").select(
+            "*, users:user_id(id, email, name)"
+        ).range(offset, offset + limit - 1).execute()
+        
+        logger.debug("✅ Successfully retrieved %s elements with user info and regulation counts", len(response.data))
         return {"success": True, "data": response.data, "count": len(response.data)}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements with user info: {e}")
+        logger.exception("❌ Error retrieving elements with user info: %s", e)
         return {"success": False, "error": str(e)}
 
-def get_elements_with_regulation_counts(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_elements_with_regulation_counts(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve elements with their regulation counts.
     
@@ -464,32 +625,22 @@ def get_elements_with_regulation_counts(limit: int = 100, offset: int = 0) -> Di
     Returns:
         Dictionary containing list of elements with regulation counts or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        # First get elements
-        response = supabase.table("element_list").select("*").range(offset, offset + limit - 1).execute()
-        
-        if not response.data:
-            return {"success": True, "data": [], "count": 0}
-        
-        # Get regulation counts for each element
-        elements_with_counts = []
-        for element in response.data:
-            # Get regulation count for this element
-            reg_response = supabase.table("element_regulations").select("id", count="exact").eq("element_id", element["id"]).execute()
-            regulation_count = reg_response.count if reg_response.count is not None else 0
-            
-            # Add regulation count to element
-            element["regulation_count"] = regulation_count
-            elements_with_counts.append(element)
+        # regulation_count is computed by the element_list_with_counts view
+        client = await get_async_supabase_client()
+        response = await client.table("element_list_with_counts").select("*", count=PAGE_COUNT_MODE).range(offset, offset + limit - 1).execute()
+        
+        elements_with_counts = response.data
         
-        print(f"✅ Successfully retrieved {len(elements_with_counts)} elements with regulation counts")
-        return {"success": True, "data": elements_with_counts, "count": len(elements_with_counts)}
+        logger.debug("✅ Successfully retrieved %s elements with regulation counts", len(elements_with_counts))
+        return {"success": True, "data": elements_with_counts, "count": len(elements_with_counts), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements with regulation counts: {e}")
+        logger.exception("❌ Error retrieving elements with regulation counts: %s", e)
         return {"success": False, "error": str(e)}
 
-def get_elements_by_user_with_regulation_counts(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_elements_by_user_with_regulation_counts(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve elements by user with their regulation counts.
     
@@ -501,27 +652,17 @@ def get_elements_by_user_with_regulation_counts(user_id: str, limit: int = 100,
     Returns:
         Dictionary containing list of elements with regulation counts or error information
     """
+    limit, offset = _clamp_page(limit, offset)
     try:
-        # First get elements for the user
-        response = supabase.table("element_list").select("*").eq("user_id", user_id).range(offset, offset + limit - 1).execute()
-        
-        if not response.data:
-            return {"success": True, "data": [], "count": 0}
-        
-        # Get regulation counts for each element
-        elements_with_counts = []
-        for element in response.data:
-            # Get regulation count for this element
-            reg_response = supabase.table("element_regulations").select("id", count="exact").eq("element_id", element["id"]).execute()
-            regulation_count = reg_response.count if reg_response.count is not None else 0
-            
-            # Add regulation count to element
-            element["regulation_count"] = regulation_count
-            elements_with_counts.append(element)
+        # regulation_count is computed by the element_list_with_counts view
+        client = await get_async_supabase_client()
+        response = await client.table("element_list_with_counts").select("*", count=PAGE_COUNT_MODE).eq("user_id", user_id).range(offset, offset + limit - 1).execute()
+        
+        elements_with_counts = response.data
         
-        print(f"✅ Successfully retrieved {len(elements_with_counts)} elements with regulation counts for user: {user_id}")
-        return {"success": True, "data": elements_with_counts, "count": len(elements_with_counts)}
+        logger.debug("✅ Successfully retrieved %s elements with regulation counts for user: %s", len(elements_with_counts), user_id)
+        return {"success": True, "data": elements_with_counts, "count": len(elements_with_counts), "total": response.count}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements with regulation counts for user {user_id}: {e}")
+        logger.exception("❌ Error retrieving elements with regulation counts for user %s: %s", user_id, e)
         return {"success": False, "error": str(e)}
\ No newline at end of file
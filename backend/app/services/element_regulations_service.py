@@ -20,19 +20,59 @@ This is a junction table that creates a many-to-many relationship between:
 - regulations table (regulation documents from the system)
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, AsyncIterator
+from ..database import get_async_supabase_client, is_transient_error, retry_delay
+from ..cache import TTLCache
 
-# Initialize Supabase client
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+logger = logging.getLogger(__name__)
+
+# Link counts are cached briefly (UI refreshes ask for the same counts repeatedly) and
+# dropped whenever this module creates or deletes links
+COUNT_CACHE_TTL = 15.0
+COUNT_CACHE_MAXSIZE = 1024
+_count_cache = TTLCache(COUNT_CACHE_TTL, COUNT_CACHE_MAXSIZE)
+
+def invalidate_link_count_cache() -> None:
+    """Drop cached link counts after element_regulations has been modified."""
+    _count_cache.clear()
+
+# Columns of an element_regulations row, selected explicitly instead of "*" so reads
+# ship only what callers use even if the table grows
+LINK_COLUMNS = "id, element_id, regulation_id, created_at"
+
+# Columns of the unique_element_regulation constraint, used for ON CONFLICT DO NOTHING
+LINK_CONFLICT_COLUMNS = "element_id,regulation_id"
+
+# Rows per upsert request in create_multiple_element_regulation_links; keeps each
+# PostgREST body well below its request size limit for very long id lists
+INSERT_CHUNK_SIZE = 500
+
+# Rows per page fetched by iter_all_element_regulation_links
+EXPORT_PAGE_SIZE = 1000
+
+# Regulation IDs per DELETE request in delete_multiple_element_regulation_links
+DELETE_CHUNK_SIZE = 100
+
+# Idempotent requests (reads, deletes, ON CONFLICT DO NOTHING upserts) are retried on
+# transient failures with exponential backoff plus jitter before the error is reported
+RETRY_MAX_ATTEMPTS = 3
+
+async def _execute(query):
+    """Execute a PostgREST query, retrying transient errors. Only use for idempotent requests."""
+    for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+        try:
+            return await query.execute()
+        except Exception as e:
+            if attempt == RETRY_MAX_ATTEMPTS or not is_transient_error(e):
+                raise
+            delay = retry_delay(attempt)
+            logger.warning("Transient Supabase error (attempt %s): %s. Retrying in %.2fs...", attempt, e, delay)
+            await asyncio.sleep(delay)
 
 # CREATE Operations
-def create_element_regulation_link(element_id: str, regulation_id: int) -> Dict[str, Any]:
+async def create_element_regulation_link(element_id: str, regulation_id: int) -> Dict[str, Any]:
     """
     Create a new link between an element and a regulation.
     
@@ -42,9 +82,7 @@ def create_element_regulation_link(element_id: str, regulation_id: int) -> Dict[
         
     Returns:
         Dictionary containing the created link data or error information
-        
-    Raises:
-        Exception: If database operation fails or duplicate link exists
+        (including when the link already exists)
     """
     try:
         link_data = {
@@ -52,25 +90,26 @@ def create_element_regulation_link(element_id: str, regulation_id: int) -> Dict[
             "regulation_id": regulation_id
         }
         
-        response = supabase.table("element_regulations").insert(link_data).execute()
+        # ON CONFLICT DO NOTHING: an existing link comes back as an empty result
+        # instead of a unique-violation error
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").upsert(
+            link_data, on_conflict=LINK_CONFLICT_COLUMNS, ignore_duplicates=True
+        ))
         
         if response.data:
-            print(f"✅ Successfully created element-regulation link: element {element_id} -> regulation {regulation_id}")
+            invalidate_link_count_cache()
+            logger.debug("✅ Successfully created element-regulation link: element %s -> regulation %s", element_id, regulation_id)
             return {"success": True, "data": response.data[0]}
         else:
-            print(f"❌ Failed to create element-regulation link: element {element_id} -> regulation {regulation_id}")
-            return {"success": False, "error": "Failed to create element-regulation link"}
+            logger.debug("❌ Duplicate link already exists: element %s -> regulation %s", element_id, regulation_id)
+            return {"success": False, "error": "Link between element and regulation already exists", "duplicate": True}
             
     except Exception as e:
-        error_msg = str(e)
-        if "unique_element_regulation" in error_msg.lower() or "duplicate" in error_msg.lower():
-            print(f"❌ Duplicate link already exists: element {element_id} -> regulation {regulation_id}")
-            return {"success": False, "error": "Link between element and regulation already exists"}
-        else:
-            print(f"❌ Error creating element-regulation link: {e}")
-            return {"success": False, "error": str(e)}
+        logger.exception("❌ Error creating element-regulation link: %s", e)
+        return {"success": False, "error": str(e)}
 
-def create_multiple_element_regulation_links(element_id: str, regulation_ids: List[int]) -> Dict[str, Any]:
+async def create_multiple_element_regulation_links(element_id: str, regulation_ids: List[int]) -> Dict[str, Any]:
     """
     Create multiple links between one element and multiple regulations.
     
@@ -78,34 +117,50 @@ def create_multiple_element_regulation_links(element_id: str, regulation_ids: Li
         element_id: UUID of the element to link
         regulation_ids: List of regulation IDs to link to the element
         
+    Links that already exist are skipped rather than failing the whole batch, so
+    created_count can be lower than requested_count. Links are sent in chunks of
+    INSERT_CHUNK_SIZE; if a chunk fails, the links of earlier chunks remain.
+    
     Returns:
         Dictionary containing success status, created links, and any errors
     """
+    created: List[Dict[str, Any]] = []
     try:
         links_data = [
             {"element_id": element_id, "regulation_id": reg_id}
-            for reg_id in regulation_ids
+            for reg_id in dict.fromkeys(regulation_ids)
         ]
         
-        response = supabase.table("element_regulations").insert(links_data).execute()
+        client = await get_async_supabase_client()
+        for i in range(0, len(links_data), INSERT_CHUNK_SIZE):
+            response = await _execute(client.table("element_regulations").upsert(
+                links_data[i:i + INSERT_CHUNK_SIZE], on_conflict=LINK_CONFLICT_COLUMNS, ignore_duplicates=True
+            ))
+            created.extend(response.data or [])
         
-        created_count = len(response.data) if response.data else 0
-        print(f"✅ Successfully created {created_count} element-regulation links for element {element_id}")
+        created_count = len(created)
+        logger.debug("✅ Successfully created %s element-regulation links for element %s", created_count, element_id)
         
         return {
             "success": True, 
-            "data": response.data, 
+            "data": created, 
             "created_count": created_count,
             "requested_count": len(regulation_ids)
         }
         
     except Exception as e:
-        print(f"❌ Error creating multiple element-regulation links: {e}")
+        logger.exception("❌ Error creating multiple element-regulation links: %s", e)
         return {"success": False, "error": str(e)}
+    finally:
+        if created:
+            invalidate_link_count_cache()
 
-def create_element_with_multiple_regulations(element_data: Dict[str, Any], regulation_ids: List[int]) -> Dict[str, Any]:
+async def create_element_with_multiple_regulations(element_data: Dict[str, Any], regulation_ids: List[int]) -> Dict[str, Any]:
     """
-    Create an element and link it to multiple regulations in a single transaction-like operation.
+    Create an element and link it to multiple regulations in a single transaction.
+    
+    Both inserts run inside the create_element_with_regulations RPC, so if any link
+    fails (e.g. an unknown regulation id) the element is not created either.
     
     Args:
         element_data: Dictionary containing element data (name, type, description, user_id)
@@ -115,57 +170,55 @@ def create_element_with_multiple_regulations(element_data: Dict[str, Any], regul
         Dictionary containing success status, element data, and regulation links
     """
     try:
-        from .element_list_service import create_element
+        from .element_list_service import invalidate_element_stats_cache
+        
+        element = {
+            "name": element_data.get("name"),
+            "type": element_data.get("type"),
+            "user_id": element_data.get("user_id"),
+            "description": element_data.get("description") or None,
+            "category_id": element_data.get("category_id") or None
+        }
         
-        # First create the element
-        element_result = create_element(element_data)
+        client = await get_async_supabase_client()
+        response = await client.rpc("create_element_with_regulations", {
+            "p_element": element,
+            "p_regulation_ids": list(regulation_ids or [])
+        }).execute()
         
-        if not element_result.get("success"):
-            return {
-                "success": False,
-                "error": f"Failed to create element: {element_result.get('error', 'Unknown error')}"
-            }
+        if not response.data:
+            logger.warning("❌ Failed to create element with regulations: %s", element["name"])
+            return {"success": False, "error": "Failed to create element"}
         
-        element_id = element_result["data"]["id"]
+        links = response.data["regulation_links"]
+        invalidate_element_stats_cache()
+        if links:
+            invalidate_link_count_cache()
+        logger.debug("✅ Successfully created element %s with %s regulation links", response.data["element"]["id"], len(links))
         
-        # If no regulations to link, return success with element data
         if not regulation_ids:
             return {
                 "success": True,
-                "element": element_result["data"],
+                "element": response.data["element"],
                 "regulation_links": [],
                 "message": "Element created successfully with no regulations"
             }
         
-        # Create multiple regulation links
-        links_result = create_multiple_element_regulation_links(element_id, regulation_ids)
-        
-        if links_result.get("success"):
-            return {
-                "success": True,
-                "element": element_result["data"],
-                "regulation_links": links_result["data"],
-                "created_links_count": links_result["created_count"],
-                "requested_links_count": links_result["requested_count"],
-                "message": f"Element created successfully with {links_result['created_count']} regulation links"
-            }
-        else:
-            # Element was created but regulation linking failed
-            # We could optionally delete the element here, but for now we'll keep it
-            return {
-                "success": True,  # Element creation succeeded
-                "element": element_result["data"],
-                "regulation_links": [],
-                "warning": f"Element created but regulation linking failed: {links_result.get('error')}",
-                "message": "Element created successfully but some regulation links failed"
-            }
+        return {
+            "success": True,
+            "element": response.data["element"],
+            "regulation_links": links,
+            "created_links_count": len(links),
+            "requested_links_count": len(regulation_ids),
+            "message": f"Element created successfully with {len(links)} regulation links"
+        }
             
     except Exception as e:
-        print(f"❌ Error in create_element_with_multiple_regulations: {e}")
+        logger.exception("❌ Error in create_element_with_multiple_regulations: %s", e)
         return {"success": False, "error": str(e)}
 
 # READ Operations
-def get_element_regulation_link_by_id(link_id: str) -> Dict[str, Any]:
+async def get_element_regulation_link_by_id(link_id: str) -> Dict[str, Any]:
     """
     Retrieve a specific element-regulation link by its ID.
     
@@ -176,20 +229,21 @@ def get_element_regulation_link_by_id(link_id: str) -> Dict[str, Any]:
         Dictionary containing link data or error information
     """
     try:
-        response = supabase.table("element_regulations").select("*").eq("id", link_id).execute()
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").select(LINK_COLUMNS).eq("id", link_id))
         
         if response.data:
-            print(f"✅ Successfully retrieved element-regulation link: {link_id}")
+            logger.debug("✅ Successfully retrieved element-regulation link: %s", link_id)
             return {"success": True, "data": response.data[0]}
         else:
-            print(f"❌ Element-regulation link not found: {link_id}")
+            logger.debug("❌ Element-regulation link not found: %s", link_id)
             return {"success": False, "error": "Link not found"}
             
     except Exception as e:
-        print(f"❌ Error retrieving element-regulation link {link_id}: {e}")
+        logger.exception("❌ Error retrieving element-regulation link %s: %s", link_id, e)
         return {"success": False, "error": str(e)}
 
-def get_regulations_by_element_id(element_id: str) -> Dict[str, Any]:
+async def get_regulations_by_element_id(element_id: str) -> Dict[str, Any]:
     """
     Retrieve all regulations linked to a specific element.
     
@@ -200,44 +254,32 @@ def get_regulations_by_element_id(element_id: str) -> Dict[str, Any]:
         Dictionary containing list of linked regulations or error information
     """
     try:
-        # First get the element_regulations links
-        links_response = supabase.table("element_regulations").select("*").eq("element_id", element_id).execute()
-
-        if not links_response.data:
-            print(f"✅ No regulations found for element: {element_id}")
-            return {"success": True, "data": [], "count": 0}
-
-        # Then get the regulation details for each regulation_id
-        regulation_ids = [link["regulation_id"] for link in links_response.data]
-
-        regulations_response = supabase.table("regulations").select(
-            "id, entity_type, lg_nr, ulg_nr, grundtext_nr, position_nr, searchable_text, full_nr, short_text, created_at"
-        ).in_("id", regulation_ids).execute()
-
-        # Create a map of regulation_id to regulation data for easy lookup
-        regulations_map = {reg["id"]: reg for reg in regulations_response.data or []}
-
-        # Combine the data
-        combined_data = []
-        for link in links_response.data:
-            regulation_data = regulations_map.get(link["regulation_id"])
-            if regulation_data:
-                combined_data.append({
-                    **link,
-                    "regulations": regulation_data
-                })
+        # Links and their regulation details in one embedded select
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").select(f"""
+            {LINK_COLUMNS},
+            regulations:regulation_id (
+                id,
+                entity_type,
+                lg_nr,
+                ulg_nr,
+                grundtext_nr,
+                position_nr,
+                searchable_text,
+                full_nr,
+                short_text,
+                created_at
+            )
+        """).eq("element_id", element_id))
 
-        print(f"✅ Successfully retrieved {len(combined_data)} regulations with details for element: {element_id}")
-        return {"success": True, "data": combined_data, "count": len(combined_data)}
-        
-        print(f"✅ Successfully retrieved {len(response.data)} regulations for element: {element_id}")
+        logger.debug("✅ Successfully retrieved %s regulations with details for element: %s", len(response.data), element_id)
         return {"success": True, "data": response.data, "count": len(response.data)}
         
     except Exception as e:
-        print(f"❌ Error retrieving regulations for element {element_id}: {e}")
+        logger.exception("❌ Error retrieving regulations for element %s: %s", element_id, e)
         return {"success": False, "error": str(e)}
 
-def get_elements_by_regulation_id(regulation_id: int) -> Dict[str, Any]:
+async def get_elements_by_regulation_id(regulation_id: int) -> Dict[str, Any]:
     """
     Retrieve all elements linked to a specific regulation.
     
@@ -248,8 +290,9 @@ def get_elements_by_regulation_id(regulation_id: int) -> Dict[str, Any]:
         Dictionary containing list of linked elements or error information
     """
     try:
-        response = supabase.table("element_regulations").select("""
-            *,
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").select(f"""
+            {LINK_COLUMNS},
             element_list:element_id (
                 id,
                 name,
@@ -259,18 +302,18 @@ def get_elements_by_regulation_id(regulation_id: int) -> Dict[str, Any]:
                 created_at,
                 updated_at
             )
-        """).eq("regulation_id", regulation_id).execute()
+        """).eq("regulation_id", regulation_id))
         
-        print(f"✅ Successfully retrieved {len(response.data)} elements for regulation: {regulation_id}")
+        logger.debug("✅ Successfully retrieved %s elements for regulation: %s", len(response.data), regulation_id)
         return {"success": True, "data": response.data, "count": len(response.data)}
         
     except Exception as e:
-        print(f"❌ Error retrieving elements for regulation {regulation_id}: {e}")
+        logger.exception("❌ Error retrieving elements for regulation %s: %s", regulation_id, e)
         return {"success": False, "error": str(e)}
 
-def get_element_regulation_links_by_user(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_element_regulation_links_by_user(user_id: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
-    Retrieve all element-regulation links for elements owned by a specific user.
+    Retrieve all element-regulation links for elements owned by a specific user, newest first.
     
     Args:
         user_id: UUID of the user
@@ -281,36 +324,30 @@ def get_element_regulation_links_by_user(user_id: str, limit: int = 100, offset:
         Dictionary containing list of links or error information
     """
     try:
-        response = supabase.table("element_regulations").select("""
-            *,
-            element_list:element_id (
-                id,
-                name,
-                description,
-                type,
-                user_id
-            ),
-            regulations:regulation_id (
-                id,
-                entity_type,
-                lg_nr,
-                ulg_nr,
-                full_nr,
-                short_text,
-                searchable_text
-            )
-        """).eq("element_list.user_id", user_id).range(offset, offset + limit - 1).execute()
-        
-        print(f"✅ Successfully retrieved {len(response.data)} element-regulation links for user: {user_id}")
+        # Filtered and ordered in the database starting from the user's elements;
+        # an embedded element_list filter would scan the whole junction table
+        client = await get_async_supabase_client()
+        response = await _execute(client.rpc("links_by_user", {
+            "p_user_id": user_id,
+            "p_limit": limit,
+            "p_offset": offset
+        }))
+        
+        logger.debug("✅ Successfully retrieved %s element-regulation links for user: %s", len(response.data), user_id)
         return {"success": True, "data": response.data, "count": len(response.data)}
         
     except Exception as e:
-        print(f"❌ Error retrieving element-regulation links for user {user_id}: {e}")
+        logger.exception("❌ Error retrieving element-regulation links for user %s: %s", user_id, e)
         return {"success": False, "error": str(e)}
 
-def check_element_regulation_link_exists(element_id: str, regulation_id: int) -> bool:
+async def check_element_regulation_link_exists(element_id: str, regulation_id: int) -> bool:
     """
     Check if a link between an element and regulation already exists.
+
+    Deprecated for write paths: checking and then inserting races with concurrent
+    requests (both see "not exists", the second insert then fails). Call
+    create_element_regulation_link directly; it is idempotent and reports duplicates.
+    Use this only to display whether a link exists.
     
     Args:
         element_id: UUID of the element
@@ -320,13 +357,14 @@ def check_element_regulation_link_exists(element_id: str, regulation_id: int) ->
         True if link exists, False otherwise
     """
     try:
-        response = supabase.table("element_regulations").select("id").eq("element_id", element_id).eq("regulation_id", regulation_id).execute()
-        return len(response.data) > 0
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").select("id", count="exact", head=True).eq("element_id", element_id).eq("regulation_id", regulation_id))
+        return (response.count or 0) > 0
     except Exception as e:
-        print(f"❌ Error checking element-regulation link existence: {e}")
+        logger.exception("❌ Error checking element-regulation link existence: %s", e)
         return False
 
-def get_all_element_regulation_links(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+async def get_all_element_regulation_links(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
     """
     Retrieve all element-regulation links with pagination.
     
@@ -338,17 +376,46 @@ def get_all_element_regulation_links(limit: int = 100, offset: int = 0) -> Dict[
         Dictionary containing list of links or error information
     """
     try:
-        response = supabase.table("element_regulations").select("*").range(offset, offset + limit - 1).execute()
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").select(LINK_COLUMNS).range(offset, offset + limit - 1))
         
-        print(f"✅ Successfully retrieved {len(response.data)} element-regulation links")
+        logger.debug("✅ Successfully retrieved %s element-regulation links", len(response.data))
         return {"success": True, "data": response.data, "count": len(response.data)}
         
     except Exception as e:
-        print(f"❌ Error retrieving all element-regulation links: {e}")
+        logger.exception("❌ Error retrieving all element-regulation links: %s", e)
         return {"success": False, "error": str(e)}
 
+async def iter_all_element_regulation_links(page_size: int = EXPORT_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield every element-regulation link, fetching one page of page_size rows at a time.
+    
+    Pages are read in id order with keyset pagination (id > last seen id), so memory stays
+    bounded by one page and later pages cost the same as the first. Errors are raised to
+    the consumer instead of being returned as a result dict.
+    
+    Args:
+        page_size: Number of links fetched per request (default: EXPORT_PAGE_SIZE)
+        
+    Yields:
+        One link row per iteration
+    """
+    client = await get_async_supabase_client()
+    last_id = None
+    while True:
+        query = client.table("element_regulations").select(LINK_COLUMNS).order("id").limit(page_size)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        response = await _execute(query)
+        rows = response.data or []
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
 # DELETE Operations
-def delete_element_regulation_link(link_id: str) -> Dict[str, Any]:
+async def delete_element_regulation_link(link_id: str) -> Dict[str, Any]:
     """
     Delete a specific element-regulation link by its ID.
     
@@ -359,20 +426,22 @@ def delete_element_regulation_link(link_id: str) -> Dict[str, Any]:
         Dictionary containing success status or error information
     """
     try:
-        response = supabase.table("element_regulations").delete().eq("id", link_id).execute()
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").delete().eq("id", link_id))
         
         if response.data:
-            print(f"✅ Successfully deleted element-regulation link: {link_id}")
+            invalidate_link_count_cache()
+            logger.debug("✅ Successfully deleted element-regulation link: %s", link_id)
             return {"success": True, "message": "Link deleted successfully"}
         else:
-            print(f"❌ Failed to delete element-regulation link: {link_id}")
+            logger.warning("❌ Failed to delete element-regulation link: %s", link_id)
             return {"success": False, "error": "Link not found or delete failed"}
             
     except Exception as e:
-        print(f"❌ Error deleting element-regulation link {link_id}: {e}")
+        logger.exception("❌ Error deleting element-regulation link %s: %s", link_id, e)
         return {"success": False, "error": str(e)}
 
-def delete_element_regulation_link_by_ids(element_id: str, regulation_id: int) -> Dict[str, Any]:
+async def delete_element_regulation_link_by_ids(element_id: str, regulation_id: int) -> Dict[str, Any]:
     """
     Delete a specific element-regulation link by element and regulation IDs.
     
@@ -384,20 +453,22 @@ def delete_element_regulation_link_by_ids(element_id: str, regulation_id: int) -
         Dictionary containing success status or error information
     """
     try:
-        response = supabase.table("element_regulations").delete().eq("element_id", element_id).eq("regulation_id", regulation_id).execute()
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").delete().eq("element_id", element_id).eq("regulation_id", regulation_id))
         
         if response.data:
-            print(f"✅ Successfully deleted element-regulation link: element {element_id} -> regulation {regulation_id}")
+            invalidate_link_count_cache()
+            logger.debug("✅ Successfully deleted element-regulation link: element %s -> regulation %s", element_id, regulation_id)
             return {"success": True, "message": "Link deleted successfully"}
         else:
-            print(f"❌ Failed to delete element-regulation link: element {element_id} -> regulation {regulation_id}")
+            logger.warning("❌ Failed to delete element-regulation link: element %s -> regulation %s", element_id, regulation_id)
             return {"success": False, "error": "Link not found or delete failed"}
             
     except Exception as e:
-        print(f"❌ Error deleting element-regulation link: {e}")
+        logger.exception("❌ Error deleting element-regulation link: %s", e)
         return {"success": False, "error": str(e)}
 
-def delete_all_links_for_element(element_id: str) -> Dict[str, Any]:
+async def delete_all_links_for_element(element_id: str) -> Dict[str, Any]:
     """
     Delete all regulation links for a specific element.
     
@@ -408,17 +479,20 @@ def delete_all_links_for_element(element_id: str) -> Dict[str, Any]:
         Dictionary containing success status and count of deleted links or error information
     """
     try:
-        response = supabase.table("element_regulations").delete().eq("element_id", element_id).execute()
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").delete().eq("element_id", element_id))
         
         deleted_count = len(response.data) if response.data else 0
-        print(f"✅ Successfully deleted {deleted_count} regulation links for element: {element_id}")
+        if deleted_count:
+            invalidate_link_count_cache()
+        logger.debug("✅ Successfully deleted %s regulation links for element: %s", deleted_count, element_id)
         return {"success": True, "message": f"Deleted {deleted_count} links", "deleted_count": deleted_count}
         
     except Exception as e:
-        print(f"❌ Error deleting links for element {element_id}: {e}")
+        logger.exception("❌ Error deleting links for element %s: %s", element_id, e)
         return {"success": False, "error": str(e)}
 
-def delete_all_links_for_regulation(regulation_id: int) -> Dict[str, Any]:
+async def delete_all_links_for_regulation(regulation_id: int) -> Dict[str, Any]:
     """
     Delete all element links for a specific regulation.
     
@@ -429,17 +503,20 @@ def delete_all_links_for_regulation(regulation_id: int) -> Dict[str, Any]:
         Dictionary containing success status and count of deleted links or error information
     """
     try:
-        response = supabase.table("element_regulations").delete().eq("regulation_id", regulation_id).execute()
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").delete().eq("regulation_id", regulation_id))
         
         deleted_count = len(response.data) if response.data else 0
-        print(f"✅ Successfully deleted {deleted_count} element links for regulation: {regulation_id}")
+        if deleted_count:
+            invalidate_link_count_cache()
+        logger.debug("✅ Successfully deleted %s element links for regulation: %s", deleted_count, regulation_id)
         return {"success": True, "message": f"Deleted {deleted_count} links", "deleted_count": deleted_count}
         
     except Exception as e:
-        print(f"❌ Error deleting links for regulation {regulation_id}: {e}")
+        logger.exception("❌ Error deleting links for regulation %s: %s", regulation_id, e)
         return {"success": False, "error": str(e)}
 
-def delete_multiple_element_regulation_links(element_id: str, regulation_ids: List[int]) -> Dict[str, Any]:
+async def delete_multiple_element_regulation_links(element_id: str, regulation_ids: List[int]) -> Dict[str, Any]:
     """
     Delete multiple links between one element and multiple regulations.
     
@@ -451,18 +528,26 @@ def delete_multiple_element_regulation_links(element_id: str, regulation_ids: Li
         Dictionary containing success status and count of deleted links or error information
     """
     try:
-        deleted_count = 0
-        errors = []
-        
-        for regulation_id in regulation_ids:
-            result = delete_element_regulation_link_by_ids(element_id, regulation_id)
-            if result["success"]:
-                deleted_count += 1
-            else:
-                errors.append(f"Failed to delete link to regulation {regulation_id}: {result['error']}")
+        # One DELETE ... regulation_id IN (...) per chunk instead of one request per link;
+        # chunked so the filter stays well within URL length limits
+        deleted_ids = set()
+        client = await get_async_supabase_client()
+        for i in range(0, len(regulation_ids), DELETE_CHUNK_SIZE):
+            chunk = regulation_ids[i:i + DELETE_CHUNK_SIZE]
+            response = await _execute(client.table("element_regulations").delete().eq("element_id", element_id).in_("regulation_id", chunk))
+            deleted_ids.update(link["regulation_id"] for link in response.data or [])
+        
+        deleted_count = len(deleted_ids)
+        if deleted_count:
+            invalidate_link_count_cache()
+        errors = [
+            f"Failed to delete link to regulation {regulation_id}: Link not found or delete failed"
+            for regulation_id in dict.fromkeys(regulation_ids)
+            if regulation_id not in deleted_ids
+        ]
         
         if errors:
-            print(f"⚠️ Deleted {deleted_count} links with {len(errors)} errors for element: {element_id}")
+            logger.warning("⚠️ Deleted %s links with %s errors for element: %s", deleted_count, len(errors), element_id)
             return {
                 "success": True, 
                 "message": f"Deleted {deleted_count} links with {len(errors)} errors",
@@ -470,7 +555,7 @@ def delete_multiple_element_regulation_links(element_id: str, regulation_ids: Li
                 "errors": errors
             }
         else:
-            print(f"✅ Successfully deleted {deleted_count} regulation links for element: {element_id}")
+            logger.debug("✅ Successfully deleted %s regulation links for element: %s", deleted_count, element_id)
             return {
                 "success": True, 
                 "message": f"Deleted {deleted_count} links",
@@ -478,25 +563,76 @@ def delete_multiple_element_regulation_links(element_id: str, regulation_ids: Li
             }
         
     except Exception as e:
-        print(f"❌ Error deleting multiple links for element {element_id}: {e}")
+        logger.exception("❌ Error deleting multiple links for element %s: %s", element_id, e)
         return {"success": False, "error": str(e)}
 
 # UTILITY Functions
-def get_element_regulation_link_count() -> int:
+async def get_element_regulation_link_count() -> int:
     """
     Get the total number of element-regulation links in the database.
     
     Returns:
         Total count of links
     """
+    cached = _count_cache.get(("total", None))
+    if cached is not None:
+        return cached
+
     try:
-        response = supabase.table("element_regulations").select("id", count="exact").execute()
-        return response.count if response.count is not None else 0
+        client = await get_async_supabase_client()
+        response = await _execute(client.table("element_regulations").select("id", count="exact", head=True))
+        count = response.count if response.count is not None else 0
+        _count_cache.set(("total", None), count)
+        return count
     except Exception as e:
-        print(f"❌ Error getting element-regulation link count: {e}")
+        logger.exception("❌ Error getting element-regulation link count: %s", e)
         return 0
 
-def get_regulation_count_for_element(element_id: str) -> int:
+async def _fetch_regulation_counts(element_ids: List[str]) -> Dict[str, int]:
+    client = await get_async_supabase_client()
+    response = await _execute(client.rpc("get_regulation_counts", {"element_ids": element_ids}))
+    return {row["element_id"]: row["cnt"] for row in response.data or []}
+
+async def _fetch_element_counts(regulation_ids: List[int]) -> Dict[int, int]:
+    client = await get_async_supabase_client()
+    response = await _execute(client.rpc("get_element_counts", {"regulation_ids": regulation_ids}))
+    return {row["regulation_id"]: row["cnt"] for row in response.data or []}
+
+async def get_regulation_counts_for_elements(element_ids: List[str]) -> Dict[str, int]:
+    """
+    Get the number of linked regulations for several elements in one query.
+    
+    Args:
+        element_ids: UUIDs of the elements
+        
+    Returns:
+        Dictionary mapping each element ID to its count of linked regulations
+    """
+    try:
+        counts = await _fetch_regulation_counts(list(dict.fromkeys(element_ids))) if element_ids else {}
+        return {element_id: counts.get(element_id, 0) for element_id in element_ids}
+    except Exception as e:
+        logger.exception("❌ Error getting regulation counts for elements: %s", e)
+        return {}
+
+async def get_element_counts_for_regulations(regulation_ids: List[int]) -> Dict[int, int]:
+    """
+    Get the number of linked elements for several regulations in one query.
+    
+    Args:
+        regulation_ids: IDs of the regulations
+        
+    Returns:
+        Dictionary mapping each regulation ID to its count of linked elements
+    """
+    try:
+        counts = await _fetch_element_counts(list(dict.fromkeys(regulation_ids))) if regulation_ids else {}
+        return {regulation_id: counts.get(regulation_id, 0) for regulation_id in regulation_ids}
+    except Exception as e:
+        logger.exception("❌ Error getting element counts for regulations: %s", e)
+        return {}
+
+async def get_regulation_count_for_element(element_id: str) -> int:
     """
     Get the number of regulations linked to a specific element.
     
@@ -506,14 +642,19 @@ def get_regulation_count_for_element(element_id: str) -> int:
     Returns:
         Count of linked regulations
     """
+    cached = _count_cache.get(("element", element_id))
+    if cached is not None:
+        return cached
+
     try:
-        response = supabase.table("element_regulations").select("id", count="exact").eq("element_id", element_id).execute()
-        return response.count if response.count is not None else 0
+        count = (await _fetch_regulation_counts([element_id])).get(element_id, 0)
+        _count_cache.set(("element", element_id), count)
+        return count
     except Exception as e:
-        print(f"❌ Error getting regulation count for element {element_id}: {e}")
+        logger.exception("❌ Error getting regulation count for element %s: %s", element_id, e)
         return 0
 
-def get_element_count_for_regulation(regulation_id: int) -> int:
+async def get_element_count_for_regulation(regulation_id: int) -> int:
     """
     Get the number of elements linked to a specific regulation.
     
@@ -523,14 +664,19 @@ def get_element_count_for_regulation(regulation_id: int) -> int:
     Returns:
         Count of linked elements
     """
+    cached = _count_cache.get(("regulation", regulation_id))
+    if cached is not None:
+        return cached
+
     try:
-        response = supabase.table("element_regulations").select("id", count="exact").eq("regulation_id", regulation_id).execute()
-        return response.count if response.count is not None else 0
+        count = (await _fetch_element_counts([regulation_id])).get(regulation_id, 0)
+        _count_cache.set(("regulation", regulation_id), count)
+        return count
     except Exception as e:
-        print(f"❌ Error getting element count for regulation {regulation_id}: {e}")
+        logger.exception("❌ Error getting element count for regulation %s: %s", regulation_id, e)
         return 0
 
-def get_most_linked_regulations(limit: int = 10) -> Dict[str, Any]:
+async def get_most_linked_regulations(limit: int = 10) -> Dict[str, Any]:
     """
     Get the regulations that are linked to the most elements.
     
@@ -541,32 +687,19 @@ def get_most_linked_regulations(limit: int = 10) -> Dict[str, Any]:
         Dictionary containing list of regulations with their link counts
     """
     try:
-        # This requires a more complex query - using RPC function would be ideal
-        # For now, we'll get all links and count them in Python
-        response = supabase.table("element_regulations").select("regulation_id").execute()
+        # Counted and ranked by the most_linked_regulations RPC; only the top rows are returned
+        client = await get_async_supabase_client()
+        response = await _execute(client.rpc("most_linked_regulations", {"p_limit": limit}))
+        result = response.data or []
         
-        if response.data:
-            # Count occurrences of each regulation_id
-            regulation_counts = {}
-            for link in response.data:
-                reg_id = link["regulation_id"]
-                regulation_counts[reg_id] = regulation_counts.get(reg_id, 0) + 1
-            
-            # Sort by count and take top N
-            sorted_regulations = sorted(regulation_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
-            
-            result = [{"regulation_id": reg_id, "link_count": count} for reg_id, count in sorted_regulations]
-            
-            print(f"✅ Successfully retrieved top {len(result)} most linked regulations")
-            return {"success": True, "data": result}
-        else:
-            return {"success": True, "data": []}
+        logger.debug("✅ Successfully retrieved top %s most linked regulations", len(result))
+        return {"success": True, "data": result}
             
     except Exception as e:
-        print(f"❌ Error getting most linked regulations: {e}")
+        logger.exception("❌ Error getting most linked regulations: %s", e)
         return {"success": False, "error": str(e)}
 
-def get_most_linked_elements(limit: int = 10) -> Dict[str, Any]:
+async def get_most_linked_elements(limit: int = 10) -> Dict[str, Any]:
     """
     Get the elements that are linked to the most regulations.
     
@@ -577,25 +710,14 @@ def get_most_linked_elements(limit: int = 10) -> Dict[str, Any]:
         Dictionary containing list of elements with their link counts
     """
     try:
-        response = supabase.table("element_regulations").select("element_id").execute()
+        # Counted and ranked by the most_linked_elements RPC; only the top rows are returned
+        client = await get_async_supabase_client()
+        response = await _execute(client.rpc("most_linked_elements", {"p_limit": limit}))
+        result = response.data or []
         
-        if response.data:
-            # Count occurrences of each element_id
-            element_counts = {}
-            for link in response.data:
-                elem_id = link["element_id"]
-                element_counts[elem_id] = element_counts.get(elem_id, 0) + 1
-            
-            # Sort by count and take top N
-            sorted_elements = sorted(element_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
-            
-            result = [{"element_id": elem_id, "link_count": count} for elem_id, count in sorted_elements]
-            
-            print(f"✅ Successfully retrieved top {len(result)} most linked elements")
-            return {"success": True, "data": result}
-        else:
-            return {"success": True, "data": []}
+        logger.debug("✅ Successfully retrieved top %s most linked elements", len(result))
+        return {"success": True, "data": result}
             
     except Exception as e:
-        print(f"❌ Error getting most linked elements: {e}")
+        logger.exception("❌ Error getting most linked elements: %s", e)
         return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -1,12 +1,73 @@
 import json
 import copy
+import operator
 import re
+import sys
+import orjson
 from collections import defaultdict
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from ..database import get_supabase_client
 
-load_dotenv()
+# Full position number LLGGTT[F]: LG, ULG and Grundtext number plus optional Folgeposition letter
+_POS_RE = re.compile(r"^(\d{2})(\d{2})(\d{2})([A-Z]?)$")
+
+
+def _index_by_nr(entities: list) -> dict:
+    """Maps str('@_nr') to the first entity with that number, matching a first-hit linear search."""
+    index = {}
+    for entity in entities:
+        nr = entity.get("@_nr")
+        index.setdefault(sys.intern(nr if type(nr) is str else str(nr)), entity)
+    return index
+
+
+# Up to this many requested ULG/Grundtext keys, the v2 fetch filters on the exact keys;
+# beyond it the or=(...) filter would make the URL too long, so whole LGs are fetched
+PUSHDOWN_MAX_KEYS = 100
+
+
+def _scope_to_keys(query, columns: tuple, keys: set):
+    """Restricts a regulations query to rows whose `columns` match one of `keys` (tuples of numbers)."""
+    if len(keys) > PUSHDOWN_MAX_KEYS:
+        return query.in_('lg_nr', sorted({key[0] for key in keys}))
+    return query.or_(','.join(
+        'and(' + ','.join(f'{column}.eq.{value}' for column, value in zip(columns, key)) + ')'
+        for key in sorted(keys)
+    ))
+
+
+def _entity_json(value) -> dict:
+    """Parses the entity_json text column with orjson; empty values become {}."""
+    return orjson.loads(value) if value else {}
+
+
+def _find_single(entity_list: list, key_name: str, value_to_find: str) -> dict | None:
+    """Returns the first entity whose str(key_name) equals value_to_find, or None if there is none."""
+    # Numbers parsed from JSON are almost always strings already; only convert the rest
+    return next(
+        (entity for entity in entity_list
+         if (value := entity.get(key_name)) == value_to_find
+         or (type(value) is not str and str(value) == value_to_find)),
+        None
+    )
+
+
+def _copy_lg_without_ulgs(lg: dict) -> dict:
+    """Copy of an LG with an empty ULG list (if it has one); everything else is shared with the original."""
+    result = dict(lg)
+    if "ulg-liste" in result and "ulg" in result["ulg-liste"]:
+        result["ulg-liste"] = {**result["ulg-liste"], "ulg": []}
+    return result
+
+
+def _copy_ulg_shell(ulg: dict) -> dict:
+    """Copy of a ULG with an empty Grundtext list; everything else is shared with the original."""
+    return {**ulg, "positionen": {**ulg.get("positionen", {}), "grundtextnr": []}}
+
+
+def _copy_gt_shell(gt: dict) -> dict:
+    """Copy of a Grundtext with an empty Folgeposition list; everything else is shared with the original."""
+    return {**gt, "folgeposition": []}
 
 
 def filter_json_entity(
@@ -24,7 +85,8 @@ def filter_json_entity(
     to narrow down the search for 'Folgeposition' within a specific ULG and/or Grundtext.
 
     The function operates as follows:
-    1. It creates a deep copy of the input JSON to ensure the original data remains unchanged.
+    1. It copies only the dictionaries along the path it changes (copy-on-write), so the
+       original data remains unchanged and untouched subtrees are shared, not cloned.
     2. It determines the type of the input JSON (LG, ULG, or Grundtext).
     3. It searches for the *first* occurrence of the target entity (based on `target_entity_type`
        and `target_value`, and optional `target_ulg_nr`/`target_grundtext_nr` for Folgeposition)
@@ -60,8 +122,9 @@ def filter_json_entity(
               Returns the original input if the input JSON structure is not recognized
               or the `target_entity_type` is invalid for the given input level.
     """
-    # Create a deep copy of the input JSON to avoid modifying the original
-    updated_json = copy.deepcopy(json_input)
+    # Shallow copy of the top level; nested dicts are copied below only where they change,
+    # so the original is never modified and unchanged subtrees are shared with the input
+    updated_json = dict(json_input)
 
     # Convert target_value and optional NRs to string for consistent comparison
     target_value = str(target_value)
@@ -70,17 +133,6 @@ def filter_json_entity(
     if target_grundtext_nr is not None:
         target_grundtext_nr = str(target_grundtext_nr)
 
-    # Helper function to find and filter a list of entities to keep only the first match
-    def _find_and_filter_single(entity_list, key_name, value_to_find):
-        """
-        Searches for the first entity with a matching value in a list and returns a list
-        containing only that found entity, or an empty list if no match is found.
-        """
-        for entity in entity_list:
-            if str(entity.get(key_name)) == value_to_find:
-                return [entity]
-        return []
-
     # Determine the level of the input JSON (LG, ULG, or Grundtext) based on its top-level keys
     is_lg = "lg-eigenschaften" in updated_json and "ulg-liste" in updated_json
     is_ulg = "ulg-eigenschaften" in updated_json and "positionen" in updated_json
@@ -93,15 +145,13 @@ def filter_json_entity(
         if target_entity_type == 'ULG':
             # Target is an ULG: Filter the 'ulg' list directly under 'ulg-liste'
             if 'ulg-liste' in updated_json and 'ulg' in updated_json['ulg-liste']:
-                updated_json['ulg-liste']['ulg'] = _find_and_filter_single(
-                    updated_json['ulg-liste']['ulg'], '@_nr', target_value
-                )
+                found_ulg = _find_single(updated_json['ulg-liste']['ulg'], '@_nr', target_value)
+                updated_json['ulg-liste'] = {
+                    **updated_json['ulg-liste'], 'ulg': [found_ulg] if found_ulg is not None else []
+                }
             else:
                 # If expected keys are missing, ensure 'ulg' list is empty
-                if 'ulg-liste' in updated_json:
-                    updated_json['ulg-liste']['ulg'] = []
-                else:
-                    updated_json['ulg-liste'] = {'ulg': []}
+                updated_json['ulg-liste'] = {**updated_json.get('ulg-liste', {}), 'ulg': []}
                 print("Warning: 'ulg-liste' or 'ulg' not found in LG JSON for ULG filtering. Resulting 'ulg' list will be empty.")
             return updated_json
 
@@ -117,16 +167,15 @@ def filter_json_entity(
 
                     if 'positionen' in ulg and 'grundtextnr' in ulg['positionen']:
                         # Attempt to filter Grundtexts within the current ULG
-                        filtered_grundtexts_for_current_ulg = _find_and_filter_single(
-                            ulg['positionen']['grundtextnr'], '@_nr', target_value
-                        )
-                        if filtered_grundtexts_for_current_ulg:
+                        found_gt = _find_single(ulg['positionen']['grundtextnr'], '@_nr', target_value)
+                        if found_gt is not None:
                             # If the target Grundtext is found, keep this ULG and only this Grundtext.
-                            ulg['positionen']['grundtextnr'] = filtered_grundtexts_for_current_ulg
-                            filtered_ulgs_to_keep.append(ulg)
+                            filtered_ulgs_to_keep.append({**ulg, 'positionen': {
+                                **ulg['positionen'], 'grundtextnr': [found_gt]
+                            }})
                             # Once the target Grundtext is found (and potentially ULG matched), we stop.
                             break
-            updated_json['ulg-liste']['ulg'] = filtered_ulgs_to_keep
+            updated_json['ulg-liste'] = {**updated_json['ulg-liste'], 'ulg': filtered_ulgs_to_keep}
             return updated_json
 
         elif target_entity_type == 'Folgeposition':
@@ -148,22 +197,20 @@ def filter_json_entity(
 
                             if 'folgeposition' in gt:
                                 # Attempt to filter Folgepositions within the current Grundtext
-                                filtered_fps_for_current_gt = _find_and_filter_single(
-                                    gt['folgeposition'], '@_ftnr', target_value
-                                )
-                                if filtered_fps_for_current_gt:
+                                found_fp = _find_single(gt['folgeposition'], '@_ftnr', target_value)
+                                if found_fp is not None:
                                     # If the target Folgeposition is found, keep this Grundtext and only this Folgeposition.
-                                    gt['folgeposition'] = filtered_fps_for_current_gt
-                                    filtered_grundtexts_to_keep.append(gt)
+                                    filtered_grundtexts_to_keep.append({**gt, 'folgeposition': [found_fp]})
                                     # Stop searching in other Grundtexts within this ULG.
                                     break # Found the specific FP, break from inner loop
                     if filtered_grundtexts_to_keep:
                         # If a Grundtext containing the target Folgeposition was found, keep this ULG.
-                        ulg['positionen']['grundtextnr'] = filtered_grundtexts_to_keep
-                        filtered_ulgs_to_keep.append(ulg)
+                        filtered_ulgs_to_keep.append({**ulg, 'positionen': {
+                            **ulg['positionen'], 'grundtextnr': filtered_grundtexts_to_keep
+                        }})
                         # Stop searching in other ULGs.
                         break # Found the specific FP, break from outer loop
-            updated_json['ulg-liste']['ulg'] = filtered_ulgs_to_keep
+            updated_json['ulg-liste'] = {**updated_json['ulg-liste'], 'ulg': filtered_ulgs_to_keep}
             return updated_json
 
         else:
@@ -176,14 +223,12 @@ def filter_json_entity(
             # Target is a Grundtext: Filter the 'grundtextnr' list directly under 'positionen'
             # Optional target_ulg_nr is irrelevant here as input is already a specific ULG.
             if 'positionen' in updated_json and 'grundtextnr' in updated_json['positionen']:
-                updated_json['positionen']['grundtextnr'] = _find_and_filter_single(
-                    updated_json['positionen']['grundtextnr'], '@_nr', target_value
-                )
+                found_gt = _find_single(updated_json['positionen']['grundtextnr'], '@_nr', target_value)
+                updated_json['positionen'] = {
+                    **updated_json['positionen'], 'grundtextnr': [found_gt] if found_gt is not None else []
+                }
             else:
-                if 'positionen' in updated_json:
-                    updated_json['positionen']['grundtextnr'] = []
-                else:
-                    updated_json['positionen'] = {'grundtextnr': []}
+                updated_json['positionen'] = {**updated_json.get('positionen', {}), 'grundtextnr': []}
                 print("Warning: 'positionen' or 'grundtextnr' not found in ULG JSON. Resulting 'grundtextnr' list will be empty.")
             return updated_json
 
@@ -199,16 +244,13 @@ def filter_json_entity(
 
                     if 'folgeposition' in gt:
                         # Attempt to filter Folgepositions within the current Grundtext
-                        filtered_fps_for_current_gt = _find_and_filter_single(
-                            gt['folgeposition'], '@_ftnr', target_value
-                        )
-                        if filtered_fps_for_current_gt:
+                        found_fp = _find_single(gt['folgeposition'], '@_ftnr', target_value)
+                        if found_fp is not None:
                             # If the target Folgeposition is found, keep this Grundtext and only this Folgeposition.
-                            gt['folgeposition'] = filtered_fps_for_current_gt
-                            filtered_grundtexts_to_keep.append(gt)
+                            filtered_grundtexts_to_keep.append({**gt, 'folgeposition': [found_fp]})
                             # Stop searching in other Grundtexts within this ULG.
                             break # Found the specific FP, break from inner loop
-            updated_json['positionen']['grundtextnr'] = filtered_grundtexts_to_keep
+            updated_json['positionen'] = {**updated_json['positionen'], 'grundtextnr': filtered_grundtexts_to_keep}
             return updated_json
         else:
             print(f"Error: Invalid target_entity_type '{target_entity_type}' for ULG level JSON. Must be 'Grundtext' or 'Folgeposition'. Returning original input.")
@@ -220,9 +262,8 @@ def filter_json_entity(
             # Target is a Folgeposition: Filter the 'folgeposition' list directly
             # Optional target_ulg_nr and target_grundtext_nr are irrelevant here.
             if 'folgeposition' in updated_json:
-                updated_json['folgeposition'] = _find_and_filter_single(
-                    updated_json['folgeposition'], '@_ftnr', target_value
-                )
+                found_fp = _find_single(updated_json['folgeposition'], '@_ftnr', target_value)
+                updated_json['folgeposition'] = [found_fp] if found_fp is not None else []
             else:
                 updated_json['folgeposition'] = []
                 print("Warning: 'folgeposition' not found in Grundtext JSON. Resulting 'folgeposition' list will be empty.")
@@ -261,35 +302,34 @@ def filter_json_by_full_nr(json_input: dict, full_nrs_to_keep: list[str]) -> dic
     """
     if not full_nrs_to_keep:
         # Return empty structure if no positions specified
-        result = copy.deepcopy(json_input)
-        if "ulg-liste" in result and "ulg" in result["ulg-liste"]:
-            result["ulg-liste"]["ulg"] = []
-        return result
+        return _copy_lg_without_ulgs(json_input)
 
     # Start with empty result structure
-    result = copy.deepcopy(json_input)
-    if "ulg-liste" in result and "ulg" in result["ulg-liste"]:
-        result["ulg-liste"]["ulg"] = []
+    result = _copy_lg_without_ulgs(json_input)
 
-    # Keep track of ULGs we've already added to avoid duplicates
+    # Keep track of ULGs and Grundtexts we've already added to avoid duplicates
     added_ulgs = {}
+    added_gts = {}
+
+    # Index the input once instead of scanning the ULG and Grundtext lists for every number;
+    # a ULG's Grundtext index is built the first time one of its positions is requested
+    ulg_index = _index_by_nr(json_input.get("ulg-liste", {}).get("ulg", []))
+    gt_indexes = {}
 
     for nr in full_nrs_to_keep:
         # Parse the position number
-        match = re.match(r"^(\d{2})(\d{2})(\d{2})([A-Z]?)$", nr)
+        match = _POS_RE.match(nr)
         if not match:
             print(f"Warning: Skipping invalid full number format: {nr}")
             continue
 
-        lg_nr, ulg_nr, gt_nr, fp_letter = match.groups()
+        # Interned so lookups in the indexes below (whose keys are interned too) hit by identity
+        lg_nr, ulg_nr, gt_nr = map(sys.intern, match.groups()[:3])
+        fp_letter = match.group(4)
         print(f"Processing {nr}: LG={lg_nr}, ULG={ulg_nr}, GT={gt_nr}, FP={fp_letter}")
 
         # Find the target ULG in the original JSON
-        target_ulg = None
-        for ulg in json_input.get("ulg-liste", {}).get("ulg", []):
-            if str(ulg.get("@_nr")) == ulg_nr:
-                target_ulg = ulg
-                break
+        target_ulg = ulg_index.get(ulg_nr)
 
         if not target_ulg:
             print(f"Warning: ULG {ulg_nr} not found in JSON")
@@ -300,28 +340,22 @@ def filter_json_by_full_nr(json_input: dict, full_nrs_to_keep: list[str]) -> dic
             result_ulg = added_ulgs[ulg_nr]
         else:
             # Create a new ULG entry in the result
-            result_ulg = copy.deepcopy(target_ulg)
-            result_ulg["positionen"]["grundtextnr"] = []
+            result_ulg = _copy_ulg_shell(target_ulg)
             result["ulg-liste"]["ulg"].append(result_ulg)
             added_ulgs[ulg_nr] = result_ulg
 
         # Find the target Grundtext
-        target_gt = None
-        for gt in target_ulg.get("positionen", {}).get("grundtextnr", []):
-            if str(gt.get("@_nr")) == gt_nr:
-                target_gt = gt
-                break
+        gt_index = gt_indexes.get(ulg_nr)
+        if gt_index is None:
+            gt_index = gt_indexes[ulg_nr] = _index_by_nr(target_ulg.get("positionen", {}).get("grundtextnr", []))
+        target_gt = gt_index.get(gt_nr)
 
         if not target_gt:
             print(f"Warning: Grundtext {gt_nr} not found in ULG {ulg_nr}")
             continue
 
         # Check if we already have this Grundtext in our result ULG
-        existing_gt = None
-        for gt in result_ulg["positionen"]["grundtextnr"]:
-            if str(gt.get("@_nr")) == gt_nr:
-                existing_gt = gt
-                break
+        existing_gt = added_gts.get((ulg_nr, gt_nr))
 
         if fp_letter:
             # We want a specific Folgeposition
@@ -332,22 +366,25 @@ def filter_json_by_full_nr(json_input: dict, full_nrs_to_keep: list[str]) -> dic
                     # Find the target Folgeposition
                     for fp in target_gt.get("folgeposition", []):
                         if fp.get("@_ftnr") == fp_letter:
-                            existing_gt["folgeposition"].append(copy.deepcopy(fp))
+                            existing_gt["folgeposition"].append(fp)
                             break
             else:
                 # Create new Grundtext with only the specific Folgeposition
-                new_gt = copy.deepcopy(target_gt)
-                new_gt["folgeposition"] = []
+                new_gt = _copy_gt_shell(target_gt)
                 for fp in target_gt.get("folgeposition", []):
                     if fp.get("@_ftnr") == fp_letter:
-                        new_gt["folgeposition"].append(copy.deepcopy(fp))
+                        new_gt["folgeposition"].append(fp)
                         break
                 result_ulg["positionen"]["grundtextnr"].append(new_gt)
+                added_gts[(ulg_nr, gt_nr)] = new_gt
         else:
             # We want the entire Grundtext
             if not existing_gt:
-                # Add the entire Grundtext
-                result_ulg["positionen"]["grundtextnr"].append(copy.deepcopy(target_gt))
+                # Add the entire Grundtext. A shallow copy is enough: it already holds every
+                # Folgeposition, so later requests for one of them never append to its list
+                new_gt = dict(target_gt)
+                result_ulg["positionen"]["grundtextnr"].append(new_gt)
+                added_gts[(ulg_nr, gt_nr)] = new_gt
             # If it already exists, we keep it as is (entire Grundtext)
 
     return result
@@ -384,10 +421,7 @@ def filter_lg_by_position_numbers(lg_json_data: dict, position_numbers: list[str
     
     if not position_numbers:
         # Return empty structure if no positions specified
-        result = copy.deepcopy(lg_json_data)
-        if "ulg-liste" in result and "ulg" in result["ulg-liste"]:
-            result["ulg-liste"]["ulg"] = []
-        return result
+        return _copy_lg_without_ulgs(lg_json_data)
     
     # Use the existing filter_json_by_full_nr function
     return filter_json_by_full_nr(lg_json_data, position_numbers)
@@ -411,8 +445,7 @@ def validate_position_number_format(position_number: str) -> bool:
         return False
     
     # Check if it matches the expected pattern
-    pattern = r"^(\d{2})(\d{2})(\d{2})([A-Z]?)$"
-    return bool(re.match(pattern, position_number))
+    return _POS_RE.match(position_number) is not None
 
 
 def get_position_info(position_number: str) -> dict:
@@ -435,14 +468,17 @@ def get_position_info(position_number: str) -> dict:
             'is_full_grundtext': False
         }
     """
-    if not validate_position_number_format(position_number):
+    if not isinstance(position_number, str):
         return {}
     
-    match = re.match(r"^(\d{2})(\d{2})(\d{2})([A-Z]?)$", position_number)
+    match = _POS_RE.match(position_number)
     if not match:
         return {}
     
-    lg_nr, ulg_nr, gt_nr, fp_letter = match.groups()
+    # The same few two-digit numbers recur across positions; interning lets dicts keyed by
+    # them compare by identity
+    lg_nr, ulg_nr, gt_nr = map(sys.intern, match.groups()[:3])
+    fp_letter = match.group(4)
     
     return {
         'lg_nr': lg_nr,
@@ -473,39 +509,47 @@ def fetch_and_filter_lg_by_position_numbers_v2(position_numbers: list[str]) -> d
     if not position_numbers:
         return {}
 
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-    if not supabase_url or not supabase_key:
+    try:
+        supabase = get_supabase_client()
+    except ValueError:
         print("Error: Supabase credentials not found.")
         return {}
-    
-    supabase: Client = create_client(supabase_url, supabase_key)
 
-    # Step 1: Parse all position numbers to get unique entity numbers
-    lg_nrs, ulg_nrs, gt_nrs = set(), set(), set()
+    # Step 1: Parse all position numbers to get the unique LGs, ULGs and Grundtexts they need
+    lg_nrs, ulg_keys, gt_keys = set(), set(), set()
     for nr in position_numbers:
-        if validate_position_number_format(nr):
-            info = get_position_info(nr)
+        # get_position_info returns {} for invalid numbers, so it doubles as the validation
+        info = get_position_info(nr)
+        if info:
             lg_nrs.add(info['lg_nr'])
-            ulg_nrs.add(info['ulg_nr'])
-            gt_nrs.add(info['grundtext_nr'])
+            ulg_keys.add((info['lg_nr'], info['ulg_nr']))
+            gt_keys.add((info['lg_nr'], info['ulg_nr'], info['grundtext_nr']))
 
     if not lg_nrs:
         return {}
 
-    # Step 2: Bulk fetch all required data
+    # Step 2: Bulk fetch all required data. The four queries are independent, so they run
+    # concurrently and the wait is the slowest round trip instead of the sum of all four.
+    # ULGs, Grundtexts and Folgepositions are limited to the requested keys in the database
+    # instead of fetching every row of each LG and discarding most of them in Step 4
     try:
-        # Fetch LGs
-        lg_records = supabase.table('regulations').select('lg_nr, entity_json').eq('entity_type', 'LG').in_('lg_nr', list(lg_nrs)).execute().data
-        
-        # Fetch ULGs
-        ulg_records = supabase.table('regulations').select('lg_nr, ulg_nr, entity_json').eq('entity_type', 'ULG').in_('lg_nr', list(lg_nrs)).order('ulg_nr').execute().data
-        
-        # Fetch Grundtexts
-        gt_records = supabase.table('regulations').select('lg_nr, ulg_nr, grundtext_nr, entity_json').eq('entity_type', 'Grundtext').in_('lg_nr', list(lg_nrs)).order('grundtext_nr').execute().data
-        
-        # Fetch Folgepositions
-        fp_records = supabase.table('regulations').select('lg_nr, ulg_nr, grundtext_nr, position_nr, entity_json').eq('entity_type', 'Folgeposition').in_('lg_nr', list(lg_nrs)).order('position_nr').execute().data
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Fetch LGs
+            lg_future = executor.submit(supabase.table('regulations').select('lg_nr, entity_json').eq('entity_type', 'LG').in_('lg_nr', list(lg_nrs)).execute)
+            
+            # Fetch ULGs
+            ulg_future = executor.submit(_scope_to_keys(supabase.table('regulations').select('lg_nr, ulg_nr, entity_json').eq('entity_type', 'ULG'), ('lg_nr', 'ulg_nr'), ulg_keys).order('ulg_nr').execute)
+            
+            # Fetch Grundtexts
+            gt_future = executor.submit(_scope_to_keys(supabase.table('regulations').select('lg_nr, ulg_nr, grundtext_nr, entity_json').eq('entity_type', 'Grundtext'), ('lg_nr', 'ulg_nr', 'grundtext_nr'), gt_keys).order('grundtext_nr').execute)
+            
+            # Fetch Folgepositions
+            fp_future = executor.submit(_scope_to_keys(supabase.table('regulations').select('lg_nr, ulg_nr, grundtext_nr, position_nr, entity_json').eq('entity_type', 'Folgeposition'), ('lg_nr', 'ulg_nr', 'grundtext_nr'), gt_keys).order('position_nr').execute)
+
+            lg_records = lg_future.result().data
+            ulg_records = ulg_future.result().data
+            gt_records = gt_future.result().data
+            fp_records = fp_future.result().data
 
     except Exception as e:
         print(f"Error during bulk fetch from Supabase: {e}")
@@ -518,49 +562,43 @@ def fetch_and_filter_lg_by_position_numbers_v2(position_numbers: list[str]) -> d
     for fp in fp_records:
         key = (fp['lg_nr'], fp['ulg_nr'], fp['grundtext_nr'])
         try:
-            fp_json = json.loads(fp['entity_json']) if fp['entity_json'] else {}
+            fp_json = _entity_json(fp['entity_json'])
             fp_json["@_ftnr"] = fp['position_nr']
             fps_by_gt[key].append(fp_json)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, orjson.JSONDecodeError):
             print(f"Warning: Invalid JSON for Folgeposition {fp['position_nr']}")
 
     gts_by_ulg = defaultdict(list)
     for gt in gt_records:
-        key = (gt['lg_nr'], gt['ulg_nr'])
+        lg_nr, ulg_nr, gt_nr = gt['lg_nr'], gt['ulg_nr'], gt['grundtext_nr']
         try:
-            gt_json = json.loads(gt['entity_json']) if gt['entity_json'] else {}
-            gt_json["@_nr"] = gt['grundtext_nr']
-            fp_key = (gt['lg_nr'], gt['ulg_nr'], gt['grundtext_nr'])
-            gt_json["folgeposition"] = fps_by_gt.get(fp_key, [])
-            gts_by_ulg[key].append(gt_json)
-        except json.JSONDecodeError:
-            print(f"Warning: Invalid JSON for Grundtext {gt['grundtext_nr']}")
+            gt_json = _entity_json(gt['entity_json'])
+            gt_json["@_nr"] = gt_nr
+            gt_json["folgeposition"] = fps_by_gt.get((lg_nr, ulg_nr, gt_nr), [])
+            gts_by_ulg[(lg_nr, ulg_nr)].append(gt_json)
+        except (json.JSONDecodeError, orjson.JSONDecodeError):
+            print(f"Warning: Invalid JSON for Grundtext {gt_nr}")
 
     ulgs_by_lg = defaultdict(list)
     for ulg in ulg_records:
-        key = ulg['lg_nr']
+        lg_nr, ulg_nr = ulg['lg_nr'], ulg['ulg_nr']
         try:
-            ulg_json = json.loads(ulg['entity_json']) if ulg['entity_json'] else {}
-            ulg_json["@_nr"] = ulg['ulg_nr']
-            gt_key = (ulg['lg_nr'], ulg['ulg_nr'])
-            if "positionen" not in ulg_json:
-                ulg_json["positionen"] = {}
-            ulg_json["positionen"]["grundtextnr"] = gts_by_ulg.get(gt_key, [])
-            ulgs_by_lg[key].append(ulg_json)
-        except json.JSONDecodeError:
-            print(f"Warning: Invalid JSON for ULG {ulg['ulg_nr']}")
+            ulg_json = _entity_json(ulg['entity_json'])
+            ulg_json["@_nr"] = ulg_nr
+            ulg_json.setdefault("positionen", {})["grundtextnr"] = gts_by_ulg.get((lg_nr, ulg_nr), [])
+            ulgs_by_lg[lg_nr].append(ulg_json)
+        except (json.JSONDecodeError, orjson.JSONDecodeError):
+            print(f"Warning: Invalid JSON for ULG {ulg_nr}")
 
     lg_data = {}
     for lg in lg_records:
         lg_nr = lg['lg_nr']
         try:
-            lg_json = json.loads(lg['entity_json']) if lg['entity_json'] else {}
+            lg_json = _entity_json(lg['entity_json'])
             lg_json["@_nr"] = lg_nr
-            if "ulg-liste" not in lg_json:
-                lg_json["ulg-liste"] = {}
-            lg_json["ulg-liste"]["ulg"] = ulgs_by_lg.get(lg_nr, [])
+            lg_json.setdefault("ulg-liste", {})["ulg"] = ulgs_by_lg.get(lg_nr, [])
             lg_data[lg_nr] = lg_json
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, orjson.JSONDecodeError):
             print(f"Warning: Invalid JSON for LG {lg_nr}")
 
     # Step 4: Filter the reconstructed data
@@ -569,15 +607,21 @@ def fetch_and_filter_lg_by_position_numbers_v2(position_numbers: list[str]) -> d
         return filter_json_by_full_nr(lg_json, position_numbers)
     
     elif len(lg_data) > 1:
+        # Group the positions by their LG prefix once instead of rescanning them for every LG
+        positions_by_lg = defaultdict(list)
+        for pos in position_numbers:
+            positions_by_lg[pos[:2]].append(pos)
+
         filtered_lgs = []
         for lg_nr, lg_json in lg_data.items():
-            lg_specific_positions = [pos for pos in position_numbers if pos.startswith(lg_nr)]
+            lg_specific_positions = positions_by_lg.get(lg_nr)
             if lg_specific_positions:
                 filtered_lg = filter_json_by_full_nr(lg_json, lg_specific_positions)
                 if ("ulg-liste" in filtered_lg and "ulg" in filtered_lg["ulg-liste"] and filtered_lg["ulg-liste"]["ulg"]):
                     filtered_lgs.append(filtered_lg)
         
-        filtered_lgs.sort(key=lambda lg: lg.get('@_nr', ''))
+        # Every reconstructed LG has '@_nr' set in Step 3
+        filtered_lgs.sort(key=operator.itemgetter('@_nr'))
         return filtered_lgs
         
     else:
@@ -644,15 +688,13 @@ def add_custom_content_to_lg(position_nr: str, custom_json: dict, content_type:
     
     print(f"Debug: Determined content type: {content_type}")
     
-    # Initialize Supabase client
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-    if not supabase_url or not supabase_key:
+    # Shared, pooled Supabase client
+    try:
+        supabase = get_supabase_client()
+    except ValueError:
         print("Error: Supabase credentials not found.")
         return {}
     
-    supabase: Client = create_client(supabase_url, supabase_key)
-    
     try:
         # Debug: Check what's in the database for this LG
         print(f"Debug: Searching for LG {lg_nr} in database...")
@@ -690,11 +732,11 @@ def add_custom_content_to_lg(position_nr: str, custom_json: dict, content_type:
     
     try:
         # Create LG structure
-        lg_json = json.loads(lg_record['entity_json']) if lg_record['entity_json'] else {}
+        lg_json = _entity_json(lg_record['entity_json'])
         lg_json["@_nr"] = lg_nr
         
         # Create ULG structure
-        ulg_json = json.loads(ulg_record['entity_json']) if ulg_record['entity_json'] else {}
+        ulg_json = _entity_json(ulg_record['entity_json'])
         ulg_json["@_nr"] = ulg_nr
         
         # Initialize empty positions (we only want the custom content)
@@ -742,7 +784,7 @@ def add_custom_content_to_lg(position_nr: str, custom_json: dict, content_type:
         print(f"Debug: Successfully built LG structure with custom content")
         return lg_json
         
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
         print(f"Warning: Invalid JSON in database records: {e}")
         return {}
     
@@ -855,13 +855,11 @@ def enrich_walls_with_elements_and_regulations(wall_data: Dict[str, Any], user_i
                 regulations_map = {reg["id"]: reg for reg in regulations_details}
                 
                 # Combine the data to create the expected structure
-                for link in element_regulation_links:
-                    regulation_data = regulations_map.get(link["regulation_id"])
-                    if regulation_data:
-                        all_regulations.append({
-                            **link,
-                            "regulations": regulation_data
-                        })
+                all_regulations = [
+                    {**link, "regulations": regulation_data}
+                    for link in element_regulation_links
+                    if (regulation_data := regulations_map.get(link["regulation_id"]))
+                ]
         
         # Group regulations by element ID
         regulations_by_element_id = {}
@@ -0,0 +1,10 @@
+-- Persistent cache for Gemini embeddings.
+-- Keyed by the SHA-256 of (model, task type, text) so re-importing the same
+-- catalogue does not re-embed identical searchable_text.
+create extension if not exists vector;
+
+create table if not exists embedding_cache (
+    text_hash  text primary key,
+    embedding  vector(768) not null,
+    created_at timestamptz not null default now()
+);
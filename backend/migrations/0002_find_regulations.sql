@@ -0,0 +1,80 @@
+-- Structured regulation lookup used by analyze_query_with_gemini.
+-- Runs the exact -> LG without leading zeros -> LG ILIKE -> searchable_text ILIKE
+-- fallbacks in one round trip and returns the row metadata without the large
+-- entity_json / embedding columns.
+create or replace function find_regulations(
+    p_entity_type  text default null,
+    p_lg_nr        text default null,
+    p_ulg_nr       text default null,
+    p_grundtext_nr text default null,
+    p_position_nr  text default null,
+    p_search_text  text default null
+)
+returns table (
+    id              regulations.id%type,
+    entity_type     regulations.entity_type%type,
+    lg_nr           regulations.lg_nr%type,
+    ulg_nr          regulations.ulg_nr%type,
+    grundtext_nr    regulations.grundtext_nr%type,
+    position_nr     regulations.position_nr%type,
+    full_nr         regulations.full_nr%type,
+    short_text      regulations.short_text%type,
+    searchable_text regulations.searchable_text%type,
+    created_at      regulations.created_at%type
+)
+language plpgsql
+stable
+as $$
+#variable_conflict use_column
+begin
+    -- 1. Exact match on every extracted field
+    return query
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.created_at
+    from regulations r
+    where (p_entity_type is null or r.entity_type = p_entity_type)
+      and (p_lg_nr is null or r.lg_nr = p_lg_nr)
+      and (p_ulg_nr is null or r.ulg_nr = p_ulg_nr)
+      and (p_grundtext_nr is null or r.grundtext_nr = p_grundtext_nr)
+      and (p_position_nr is null or r.position_nr = p_position_nr);
+    if found then
+        return;
+    end if;
+
+    if p_lg_nr is not null then
+        -- 2. LG number without leading zeros ("00" -> "0")
+        if p_lg_nr ~ '^[0-9]+$' then
+            return query
+            select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+                   r.full_nr, r.short_text, r.searchable_text, r.created_at
+            from regulations r
+            where r.entity_type = 'LG'
+              and r.lg_nr = (p_lg_nr::numeric)::text;
+            if found then
+                return;
+            end if;
+        end if;
+
+        -- 3. LG number containing the extracted number
+        return query
+        select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+               r.full_nr, r.short_text, r.searchable_text, r.created_at
+        from regulations r
+        where r.entity_type = 'LG'
+          and r.lg_nr ilike '%' || p_lg_nr || '%';
+        if found then
+            return;
+        end if;
+    end if;
+
+    -- 4. Free text search on searchable_text
+    if coalesce(p_search_text, '') <> '' then
+        return query
+        select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+               r.full_nr, r.short_text, r.searchable_text, r.created_at
+        from regulations r
+        where (p_entity_type is null or r.entity_type = p_entity_type)
+          and r.searchable_text ilike '%' || p_search_text || '%';
+    end if;
+end;
+$$;
@@ -0,0 +1,40 @@
+-- Semantic cache for the Gemini query analysis in analyze_query_with_gemini.
+-- A new query is embedded and compared against cached queries; a close enough
+-- match (cosine similarity) reuses the stored analysis instead of calling Gemini.
+create extension if not exists vector;
+
+create table if not exists query_analysis_cache (
+    id              bigint generated always as identity primary key,
+    query_text      text not null,
+    query_embedding vector(768) not null,
+    analysis_json   jsonb not null,
+    created_at      timestamptz not null default now(),
+    expires_at      timestamptz not null default now() + interval '24 hours'
+);
+
+create index if not exists query_analysis_cache_expires_at_idx
+    on query_analysis_cache (expires_at);
+
+create or replace function match_query_cache(
+    query_embedding vector(768),
+    match_threshold float,
+    match_count int
+)
+returns table (
+    query_text    text,
+    analysis_json jsonb,
+    similarity    float
+)
+language sql
+stable
+as $$
+    select c.query_text,
+           c.analysis_json,
+           1 - (c.query_embedding <=> match_query_cache.query_embedding) as similarity
+    from query_analysis_cache c
+    where c.expires_at > now()
+      and 1 - (c.query_embedding <=> match_query_cache.query_embedding) >= match_threshold
+    order by c.query_embedding <=> match_query_cache.query_embedding
+    limit match_count;
+$$;
+
@@ -0,0 +1,91 @@
+-- Store embeddings as half-precision vectors (pgvector >= 0.7).
+-- halfvec(768) takes 2 bytes per dimension instead of 4, which halves table and
+-- index size; the 768-dim Gemini embeddings lose no meaningful recall at fp16.
+create extension if not exists vector;
+
+-- Vector indexes are tied to the column type, so drop them before the conversion
+do $$
+declare
+    idx record;
+begin
+    for idx in
+        select i.relname as index_name
+        from pg_index x
+        join pg_class i on i.oid = x.indexrelid
+        join pg_class t on t.oid = x.indrelid
+        join pg_am am on am.oid = i.relam
+        where t.relname = 'regulations'
+          and am.amname in ('ivfflat', 'hnsw')
+    loop
+        execute format('drop index if exists %I', idx.index_name);
+    end loop;
+end;
+$$;
+
+drop function if exists match_regulations(vector, float, int);
+drop function if exists match_query_cache(vector, float, int);
+
+alter table regulations
+    alter column embedding type halfvec(768) using embedding::halfvec(768);
+alter table embedding_cache
+    alter column embedding type halfvec(768) using embedding::halfvec(768);
+alter table query_analysis_cache
+    alter column query_embedding type halfvec(768) using query_embedding::halfvec(768);
+
+create index if not exists regulations_embedding_idx
+    on regulations using hnsw (embedding halfvec_cosine_ops);
+
+create or replace function match_regulations(
+    query_embedding halfvec(768),
+    match_threshold float,
+    match_count int
+)
+returns table (
+    id              regulations.id%type,
+    entity_type     regulations.entity_type%type,
+    lg_nr           regulations.lg_nr%type,
+    ulg_nr          regulations.ulg_nr%type,
+    grundtext_nr    regulations.grundtext_nr%type,
+    position_nr     regulations.position_nr%type,
+    full_nr         regulations.full_nr%type,
+    short_text      regulations.short_text%type,
+    searchable_text regulations.searchable_text%type,
+    entity_json     regulations.entity_json%type,
+    embedding       regulations.embedding%type,
+    created_at      regulations.created_at%type,
+    similarity      float
+)
+language sql
+stable
+as $$
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.embedding, r.created_at,
+           1 - (r.embedding <=> match_regulations.query_embedding) as similarity
+    from regulations r
+    where 1 - (r.embedding <=> match_regulations.query_embedding) > match_threshold
+    order by r.embedding <=> match_regulations.query_embedding
+    limit match_count;
+$$;
+
+create or replace function match_query_cache(
+    query_embedding halfvec(768),
+    match_threshold float,
+    match_count int
+)
+returns table (
+    query_text    text,
+    analysis_json jsonb,
+    similarity    float
+)
+language sql
+stable
+as $$
+    select c.query_text,
+           c.analysis_json,
+           1 - (c.query_embedding <=> match_query_cache.query_embedding) as similarity
+    from query_analysis_cache c
+    where c.expires_at > now()
+      and 1 - (c.query_embedding <=> match_query_cache.query_embedding) >= match_threshold
+    order by c.query_embedding <=> match_query_cache.query_embedding
+    limit match_count;
+$$;
@@ -0,0 +1,35 @@
+-- Full-text search over regulations.searchable_text for search_in_searchable_text.
+-- The GIN index on the German tsvector replaces the sequential scan of ILIKE '%query%'.
+create index if not exists regulations_searchable_text_fts_idx
+    on regulations using gin (to_tsvector('german', searchable_text));
+
+create or replace function match_regulations_text(
+    query text,
+    match_count int
+)
+returns table (
+    id              regulations.id%type,
+    entity_type     regulations.entity_type%type,
+    lg_nr           regulations.lg_nr%type,
+    ulg_nr          regulations.ulg_nr%type,
+    grundtext_nr    regulations.grundtext_nr%type,
+    position_nr     regulations.position_nr%type,
+    full_nr         regulations.full_nr%type,
+    short_text      regulations.short_text%type,
+    searchable_text regulations.searchable_text%type,
+    entity_json     regulations.entity_json%type,
+    created_at      regulations.created_at%type,
+    rank            real
+)
+language sql
+stable
+as $$
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.created_at,
+           ts_rank_cd(to_tsvector('german', r.searchable_text), q.tsq) as rank
+    from regulations r,
+         plainto_tsquery('german', match_regulations_text.query) as q(tsq)
+    where to_tsvector('german', r.searchable_text) @@ q.tsq
+    order by rank desc
+    limit match_count;
+$$;
@@ -0,0 +1,45 @@
+-- Regulation lookup by full_nr for find_regulation_by_number.
+-- full_nr is not unique (a Grundtext and its UngeteiltePositionen share it), so the
+-- index is a plain btree. The RPC tries the exact number first and the variant
+-- without leading zeros second, in a single round trip.
+create index if not exists regulations_full_nr_idx
+    on regulations (full_nr);
+
+create or replace function find_regulation_by_full_nr(
+    p_full_nr     text,
+    p_alt_full_nr text default null
+)
+returns table (
+    id              regulations.id%type,
+    entity_type     regulations.entity_type%type,
+    lg_nr           regulations.lg_nr%type,
+    ulg_nr          regulations.ulg_nr%type,
+    grundtext_nr    regulations.grundtext_nr%type,
+    position_nr     regulations.position_nr%type,
+    full_nr         regulations.full_nr%type,
+    short_text      regulations.short_text%type,
+    searchable_text regulations.searchable_text%type,
+    entity_json     regulations.entity_json%type,
+    created_at      regulations.created_at%type
+)
+language plpgsql
+stable
+as $$
+#variable_conflict use_column
+begin
+    return query
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.created_at
+    from regulations r
+    where r.full_nr = p_full_nr;
+    if found or p_alt_full_nr is null or p_alt_full_nr = p_full_nr then
+        return;
+    end if;
+
+    return query
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.created_at
+    from regulations r
+    where r.full_nr = p_alt_full_nr;
+end;
+$$;
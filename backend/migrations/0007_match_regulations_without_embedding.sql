@@ -0,0 +1,34 @@
+-- match_regulations without the embedding column: callers never read the vector
+-- back, and it was the bulk of every similarity-search response.
+drop function if exists match_regulations(halfvec, float, int);
+
+create or replace function match_regulations(
+    query_embedding halfvec(768),
+    match_threshold float,
+    match_count int
+)
+returns table (
+    id              regulations.id%type,
+    entity_type     regulations.entity_type%type,
+    lg_nr           regulations.lg_nr%type,
+    ulg_nr          regulations.ulg_nr%type,
+    grundtext_nr    regulations.grundtext_nr%type,
+    position_nr     regulations.position_nr%type,
+    full_nr         regulations.full_nr%type,
+    short_text      regulations.short_text%type,
+    searchable_text regulations.searchable_text%type,
+    entity_json     regulations.entity_json%type,
+    created_at      regulations.created_at%type,
+    similarity      float
+)
+language sql
+stable
+as $$
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.created_at,
+           1 - (r.embedding <=> match_regulations.query_embedding) as similarity
+    from regulations r
+    where 1 - (r.embedding <=> match_regulations.query_embedding) > match_threshold
+    order by r.embedding <=> match_regulations.query_embedding
+    limit match_count;
+$$;
@@ -0,0 +1,12 @@
+-- HNSW index for match_regulations and its search breadth.
+-- 0004 already builds regulations_embedding_idx with pgvector's defaults
+-- (m = 16, ef_construction = 64); this makes the parameters explicit for
+-- databases where the index is still missing.
+create index if not exists regulations_embedding_idx
+    on regulations using hnsw (embedding halfvec_cosine_ops)
+    with (m = 16, ef_construction = 64);
+
+-- An HNSW scan returns at most ef_search rows, so it has to cover the largest
+-- match_count the API asks for (the default of 40 would cap larger requests).
+alter function match_regulations(halfvec, float, int)
+    set hnsw.ef_search = 100;
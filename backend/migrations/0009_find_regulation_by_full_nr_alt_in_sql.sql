@@ -0,0 +1,53 @@
+-- find_regulation_by_full_nr derives the leading-zero-free variant itself, so the
+-- client only passes the number it was given. For a 6-digit number plus optional
+-- position letter ('003901C'), each 2-digit component loses its leading zero
+-- ('0' || '39' || '1' || 'C' = '0391C'). Both lookups use regulations_full_nr_idx.
+drop function if exists find_regulation_by_full_nr(text, text);
+
+create or replace function find_regulation_by_full_nr(
+    p_full_nr text
+)
+returns table (
+    id              regulations.id%type,
+    entity_type     regulations.entity_type%type,
+    lg_nr           regulations.lg_nr%type,
+    ulg_nr          regulations.ulg_nr%type,
+    grundtext_nr    regulations.grundtext_nr%type,
+    position_nr     regulations.position_nr%type,
+    full_nr         regulations.full_nr%type,
+    short_text      regulations.short_text%type,
+    searchable_text regulations.searchable_text%type,
+    entity_json     regulations.entity_json%type,
+    created_at      regulations.created_at%type
+)
+language plpgsql
+stable
+as $$
+#variable_conflict use_column
+declare
+    v_alt_full_nr text;
+begin
+    return query
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.created_at
+    from regulations r
+    where r.full_nr = p_full_nr;
+    if found or p_full_nr !~ '^[0-9]{6}[A-Za-z]?$' then
+        return;
+    end if;
+
+    v_alt_full_nr := substr(p_full_nr, 1, 2)::int::text
+                  || substr(p_full_nr, 3, 2)::int::text
+                  || substr(p_full_nr, 5, 2)::int::text
+                  || upper(substr(p_full_nr, 7));
+    if v_alt_full_nr = p_full_nr then
+        return;
+    end if;
+
+    return query
+    select r.id, r.entity_type, r.lg_nr, r.ulg_nr, r.grundtext_nr, r.position_nr,
+           r.full_nr, r.short_text, r.searchable_text, r.entity_json, r.created_at
+    from regulations r
+    where r.full_nr = v_alt_full_nr;
+end;
+$$;
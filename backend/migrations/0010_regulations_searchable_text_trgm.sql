@@ -0,0 +1,8 @@
+-- Trigram index for the ILIKE '%query%' fallback in search_in_searchable_text.
+-- A leading wildcard cannot use a btree or the tsvector index, so without this
+-- the fallback scans the whole table; with it, queries of 3+ characters become
+-- a bitmap index scan.
+create extension if not exists pg_trgm;
+
+create index if not exists regulations_searchable_text_trgm_idx
+    on regulations using gin (searchable_text gin_trgm_ops);
@@ -0,0 +1,21 @@
+-- Regulation counts for a page of elements in one round trip.
+-- Used by get_elements_with_regulation_counts / get_elements_by_user_with_regulation_counts
+-- instead of one count query per element.
+create index if not exists element_regulations_element_id_idx
+    on element_regulations (element_id);
+
+create or replace function get_regulation_counts(
+    element_ids uuid[]
+)
+returns table (
+    element_id element_regulations.element_id%type,
+    cnt        bigint
+)
+language sql
+stable
+as $$
+    select er.element_id, count(*) as cnt
+    from element_regulations er
+    where er.element_id = any(element_ids)
+    group by er.element_id;
+$$;
@@ -0,0 +1,22 @@
+-- Distinct element types for get_unique_element_types, computed in the database so
+-- only the K distinct values cross the wire. The recursive CTE walks the type index
+-- as a loose index scan (one index probe per distinct type) instead of reading every row.
+create index if not exists element_list_type_idx
+    on element_list (type);
+
+create or replace function unique_element_types()
+returns table (
+    type element_list.type%type
+)
+language sql
+stable
+as $$
+    with recursive t as (
+        select min(e.type) as type from element_list e
+        union all
+        select (select min(e.type) from element_list e where e.type > t.type)
+        from t
+        where t.type is not null
+    )
+    select t.type from t where t.type is not null;
+$$;
@@ -0,0 +1,7 @@
+-- Trigram index for search_elements_by_name (ILIKE '%term%' on element_list.name).
+-- The index is on name itself rather than lower(name): PostgREST sends the filter as
+-- name ILIKE ..., and gin_trgm_ops already serves ILIKE case-insensitively.
+create extension if not exists pg_trgm;
+
+create index if not exists element_list_name_trgm_idx
+    on element_list using gin (name gin_trgm_ops);
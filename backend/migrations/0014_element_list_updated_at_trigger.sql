@@ -0,0 +1,17 @@
+-- Maintain element_list.updated_at in the database so UPDATEs from the API only send
+-- the columns that actually changed.
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists element_list_updated_at on element_list;
+create trigger element_list_updated_at
+    before update on element_list
+    for each row
+    execute function set_updated_at();
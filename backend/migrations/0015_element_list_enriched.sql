@@ -0,0 +1,36 @@
+-- Superseded: 0025 drops this view and its refresh function again.
+-- Precomputed element list with owner info and regulation counts for
+-- get_elements_with_user_info, so a page is an index scan instead of a join plus a
+-- per-row count subquery. The users column keeps the shape of the former
+-- users:user_id(id, email, name) embed.
+create materialized view if not exists element_list_enriched as
+select
+    e.*,
+    jsonb_build_object('id', u.id, 'email', u.email, 'name', u.name) as users,
+    coalesce(r.cnt, 0) as regulation_count
+from element_list e
+join users u on u.id = e.user_id
+left join (
+    select element_id, count(*) as cnt
+    from element_regulations
+    group by element_id
+) r on r.element_id = e.id;
+
+-- The unique index is required for refresh ... concurrently
+create unique index if not exists element_list_enriched_id_idx
+    on element_list_enriched (id);
+
+create index if not exists element_list_enriched_user_id_idx
+    on element_list_enriched (user_id);
+
+-- Called by the backend after bulk writes; can also be scheduled, e.g. with pg_cron:
+--   select cron.schedule('refresh-element-list-enriched', '*/5 * * * *',
+--                        'select refresh_element_list_enriched()');
+create or replace function refresh_element_list_enriched()
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    refresh materialized view concurrently element_list_enriched;
+$$;
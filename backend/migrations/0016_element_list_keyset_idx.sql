@@ -0,0 +1,4 @@
+-- Keyset pagination for get_elements_after: ORDER BY updated_at DESC, id DESC
+-- with a (updated_at, id) < cursor condition reads exactly one page from this index.
+create index if not exists element_list_updated_at_id_idx
+    on element_list (updated_at desc, id desc);
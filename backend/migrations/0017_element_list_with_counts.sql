@@ -0,0 +1,15 @@
+-- element_list rows with their live regulation count, for the list endpoints that
+-- page through elements with counts. Filters on element_list columns (user_id, ...)
+-- are pushed into the view, and the count is one index lookup per returned row on
+-- element_regulations_element_id_idx. security_invoker keeps the caller's RLS policies.
+create or replace view element_list_with_counts
+with (security_invoker = true) as
+select
+    e.*,
+    c.regulation_count
+from element_list e
+left join lateral (
+    select count(*) as regulation_count
+    from element_regulations r
+    where r.element_id = e.id
+) c on true;
@@ -0,0 +1,11 @@
+-- Composite indexes for the per-user element queries.
+-- element_list (type) is created in 0012 and the name trigram index in 0013.
+
+-- get_elements_by_user_and_type: user_id = ? and type = ?
+create index if not exists element_list_user_type_idx
+    on element_list (user_id, type);
+
+-- get_elements_by_user_id / list_element_summaries and the per-user list views:
+-- user_id = ? paginated newest-first
+create index if not exists element_list_user_updated_idx
+    on element_list (user_id, updated_at desc);
@@ -0,0 +1,40 @@
+-- Update an element only if the submitted values differ from the stored row.
+-- p_changes holds the columns to set (a null value clears the column). An unchanged
+-- submission writes nothing: no new row version, no WAL, no updated_at trigger.
+-- Returns null if the element does not exist, otherwise
+-- {"changed": bool, "element": <row after the call>}.
+create or replace function update_element_if_changed(
+    p_id      uuid,
+    p_changes jsonb
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_current element_list;
+    v_new     element_list;
+begin
+    select * into v_current from element_list where id = p_id for update;
+    if not found then
+        return null;
+    end if;
+
+    v_new := jsonb_populate_record(v_current, p_changes);
+
+    if (v_new.name, v_new.type, v_new.description, v_new.category_id)
+       is not distinct from
+       (v_current.name, v_current.type, v_current.description, v_current.category_id) then
+        return jsonb_build_object('changed', false, 'element', to_jsonb(v_current));
+    end if;
+
+    update element_list
+    set name        = v_new.name,
+        type        = v_new.type,
+        description = v_new.description,
+        category_id = v_new.category_id
+    where id = p_id
+    returning * into v_new;
+
+    return jsonb_build_object('changed', true, 'element', to_jsonb(v_new));
+end;
+$$;
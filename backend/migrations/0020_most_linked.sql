@@ -0,0 +1,39 @@
+-- Top-N aggregates over element_regulations for get_most_linked_regulations /
+-- get_most_linked_elements, so only the N result rows leave the database instead
+-- of every link. element_regulations (element_id) is indexed in 0011.
+create index if not exists element_regulations_regulation_id_idx
+    on element_regulations (regulation_id);
+
+create or replace function most_linked_regulations(
+    p_limit int
+)
+returns table (
+    regulation_id element_regulations.regulation_id%type,
+    link_count    bigint
+)
+language sql
+stable
+as $$
+    select er.regulation_id, count(*) as link_count
+    from element_regulations er
+    group by er.regulation_id
+    order by link_count desc, er.regulation_id
+    limit p_limit;
+$$;
+
+create or replace function most_linked_elements(
+    p_limit int
+)
+returns table (
+    element_id element_regulations.element_id%type,
+    link_count bigint
+)
+language sql
+stable
+as $$
+    select er.element_id, count(*) as link_count
+    from element_regulations er
+    group by er.element_id
+    order by link_count desc, er.element_id
+    limit p_limit;
+$$;
@@ -0,0 +1,17 @@
+-- Element counts for a set of regulations in one round trip; the regulation-side
+-- counterpart of get_regulation_counts (0011). Uses element_regulations_regulation_id_idx (0020).
+create or replace function get_element_counts(
+    regulation_ids bigint[]
+)
+returns table (
+    regulation_id element_regulations.regulation_id%type,
+    cnt           bigint
+)
+language sql
+stable
+as $$
+    select er.regulation_id, count(*) as cnt
+    from element_regulations er
+    where er.regulation_id = any(regulation_ids)
+    group by er.regulation_id;
+$$;
@@ -0,0 +1,33 @@
+-- Create an element and its regulation links in one transaction for
+-- create_element_with_multiple_regulations. If any link insert fails (e.g. an
+-- unknown regulation id violates the foreign key) the element insert is rolled back
+-- too, so no element is left without the links it was created with.
+-- Returns {"element": <new row>, "regulation_links": [<new link rows>]}.
+create or replace function create_element_with_regulations(
+    p_element        jsonb,
+    p_regulation_ids bigint[] default '{}'
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_element element_list;
+    v_links   jsonb;
+begin
+    insert into element_list (name, type, user_id, description, category_id)
+    select e.name, e.type, e.user_id, nullif(e.description, ''), e.category_id
+    from jsonb_populate_record(null::element_list, p_element) e
+    returning * into v_element;
+
+    with inserted as (
+        insert into element_regulations (element_id, regulation_id)
+        select v_element.id, r
+        from (select distinct unnest(coalesce(p_regulation_ids, '{}')) as r) ids
+        returning *
+    )
+    select coalesce(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb) into v_links
+    from inserted;
+
+    return jsonb_build_object('element', to_jsonb(v_element), 'regulation_links', v_links);
+end;
+$$;
@@ -0,0 +1,40 @@
+-- Element-regulation links of one user's elements for
+-- get_element_regulation_links_by_user, newest first. Starts from the user's
+-- elements (element_list (user_id, ...) from 0018) and reaches the links through
+-- element_regulations (element_id) from 0011, instead of scanning the junction table
+-- and filtering on an embedded resource. The element_list and regulations columns
+-- keep the shape of the former embedded select.
+create or replace function links_by_user(
+    p_user_id uuid,
+    p_limit   int,
+    p_offset  int default 0
+)
+returns table (
+    id            element_regulations.id%type,
+    element_id    element_regulations.element_id%type,
+    regulation_id element_regulations.regulation_id%type,
+    created_at    element_regulations.created_at%type,
+    element_list  jsonb,
+    regulations   jsonb
+)
+language sql
+stable
+as $$
+    select er.id, er.element_id, er.regulation_id, er.created_at,
+           jsonb_build_object(
+               'id', el.id, 'name', el.name, 'description', el.description,
+               'type', el.type, 'user_id', el.user_id
+           ) as element_list,
+           jsonb_build_object(
+               'id', r.id, 'entity_type', r.entity_type, 'lg_nr', r.lg_nr,
+               'ulg_nr', r.ulg_nr, 'full_nr', r.full_nr, 'short_text', r.short_text,
+               'searchable_text', r.searchable_text
+           ) as regulations
+    from element_list el
+    join element_regulations er on er.element_id = el.id
+    join regulations r on r.id = er.regulation_id
+    where el.user_id = p_user_id
+    order by er.created_at desc, er.id
+    limit p_limit
+    offset p_offset;
+$$;
@@ -0,0 +1,5 @@
+-- Hierarchy lookups for fetch_and_filter_lg_by_position_numbers_v2 and
+-- add_custom_content_to_lg: entity_type = ? plus lg_nr, or the (lg_nr, ulg_nr) /
+-- (lg_nr, ulg_nr, grundtext_nr) keys of the requested positions.
+create index if not exists regulations_entity_position_idx
+    on regulations (entity_type, lg_nr, ulg_nr, grundtext_nr);
@@ -0,0 +1,7 @@
+-- Drop the element_list_enriched materialized view (0015). Keeping it current meant a
+-- full refresh per write, and as a materialized view it is not covered by the RLS
+-- policies of element_list / users. get_elements_with_user_info reads the live
+-- security_invoker view element_list_with_counts (0017) with an embedded users column.
+drop function if exists refresh_element_list_enriched();
+
+drop materialized view if exists element_list_enriched;
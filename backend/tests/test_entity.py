@@ -0,0 +1,164 @@
+"""
+Tests for the LG filtering helpers in app.services.entity.
+
+Run from the backend directory:
+    python -m unittest discover tests
+"""
+
+import copy
+import unittest
+
+from app.services.entity import (
+    PUSHDOWN_MAX_KEYS,
+    _scope_to_keys,
+    filter_json_by_full_nr,
+    filter_json_entity,
+)
+
+
+def _make_lg() -> dict:
+    """Small LG 00 with ULG 11 (Grundtext 01 with A/B, Grundtext 02 with A) and ULG 12 (Grundtext 01 with C)."""
+    return {
+        "@_nr": "00",
+        "lg-eigenschaften": {"ueberschrift": "Allgemeines"},
+        "ulg-liste": {"ulg": [
+            {
+                "@_nr": "11",
+                "ulg-eigenschaften": {"ueberschrift": "ULG 11"},
+                "positionen": {"grundtextnr": [
+                    {
+                        "@_nr": "01",
+                        "grundtext": {"langtext": "GT 01"},
+                        "folgeposition": [{"@_ftnr": "A", "kurztext": "A"}, {"@_ftnr": "B", "kurztext": "B"}],
+                    },
+                    {
+                        "@_nr": "02",
+                        "grundtext": {"langtext": "GT 02"},
+                        "folgeposition": [{"@_ftnr": "A", "kurztext": "A"}],
+                    },
+                ]},
+            },
+            {
+                "@_nr": "12",
+                "ulg-eigenschaften": {"ueberschrift": "ULG 12"},
+                "positionen": {"grundtextnr": [
+                    {
+                        "@_nr": "01",
+                        "grundtext": {"langtext": "GT 01"},
+                        "folgeposition": [{"@_ftnr": "C", "kurztext": "C"}],
+                    },
+                ]},
+            },
+        ]},
+    }
+
+
+class _RecordingQuery:
+    """Stands in for a postgrest query builder and records the filters applied to it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def or_(self, filters):
+        self.calls.append(("or_", filters))
+        return self
+
+    def in_(self, column, values):
+        self.calls.append(("in_", column, values))
+        return self
+
+
+class FilterJsonEntityTest(unittest.TestCase):
+    def setUp(self):
+        self.lg = _make_lg()
+        self.original = copy.deepcopy(self.lg)
+
+    def tearDown(self):
+        self.assertEqual(self.lg, self.original, "input LG was mutated")
+
+    def test_ulg(self):
+        result = filter_json_entity(self.lg, "ULG", "12")
+        self.assertEqual(result["ulg-liste"]["ulg"], [self.original["ulg-liste"]["ulg"][1]])
+        self.assertEqual(result["lg-eigenschaften"], self.original["lg-eigenschaften"])
+
+    def test_grundtext_within_ulg(self):
+        result = filter_json_entity(self.lg, "Grundtext", "02", target_ulg_nr="11")
+        ulgs = result["ulg-liste"]["ulg"]
+        self.assertEqual([ulg["@_nr"] for ulg in ulgs], ["11"])
+        self.assertEqual(ulgs[0]["positionen"]["grundtextnr"], [self.original["ulg-liste"]["ulg"][0]["positionen"]["grundtextnr"][1]])
+
+    def test_folgeposition(self):
+        result = filter_json_entity(self.lg, "Folgeposition", "B", target_ulg_nr=11, target_grundtext_nr="01")
+        ulgs = result["ulg-liste"]["ulg"]
+        self.assertEqual([ulg["@_nr"] for ulg in ulgs], ["11"])
+        gts = ulgs[0]["positionen"]["grundtextnr"]
+        self.assertEqual([gt["@_nr"] for gt in gts], ["01"])
+        self.assertEqual(gts[0]["folgeposition"], [{"@_ftnr": "B", "kurztext": "B"}])
+        self.assertEqual(gts[0]["grundtext"], {"langtext": "GT 01"})
+
+    def test_not_found_empties_list(self):
+        result = filter_json_entity(self.lg, "ULG", "99")
+        self.assertEqual(result["ulg-liste"]["ulg"], [])
+
+
+class FilterJsonByFullNrTest(unittest.TestCase):
+    def setUp(self):
+        self.lg = _make_lg()
+        self.original = copy.deepcopy(self.lg)
+
+    def tearDown(self):
+        self.assertEqual(self.lg, self.original, "input LG was mutated")
+
+    def test_positions(self):
+        result = filter_json_by_full_nr(self.lg, ["001101B", "001102", "001101A", "001201", "invalid", "009901"])
+        ulgs = result["ulg-liste"]["ulg"]
+        self.assertEqual([ulg["@_nr"] for ulg in ulgs], ["11", "12"])
+
+        gts_11 = ulgs[0]["positionen"]["grundtextnr"]
+        self.assertEqual([gt["@_nr"] for gt in gts_11], ["01", "02"])
+        self.assertEqual([fp["@_ftnr"] for fp in gts_11[0]["folgeposition"]], ["B", "A"])
+        self.assertEqual(gts_11[1], self.original["ulg-liste"]["ulg"][0]["positionen"]["grundtextnr"][1])
+
+        self.assertEqual(ulgs[1]["positionen"]["grundtextnr"], self.original["ulg-liste"]["ulg"][1]["positionen"]["grundtextnr"])
+        self.assertEqual(ulgs[1]["ulg-eigenschaften"], {"ueberschrift": "ULG 12"})
+
+    def test_whole_grundtext_then_folgeposition(self):
+        result = filter_json_by_full_nr(self.lg, ["001101", "001101A"])
+        gts = result["ulg-liste"]["ulg"][0]["positionen"]["grundtextnr"]
+        self.assertEqual([fp["@_ftnr"] for fp in gts[0]["folgeposition"]], ["A", "B"])
+
+    def test_no_positions(self):
+        result = filter_json_by_full_nr(self.lg, [])
+        self.assertEqual(result["ulg-liste"]["ulg"], [])
+        self.assertEqual(result["lg-eigenschaften"], self.original["lg-eigenschaften"])
+
+
+class ScopeToKeysTest(unittest.TestCase):
+    COLUMNS = ("lg_nr", "ulg_nr", "grundtext_nr")
+
+    def test_exact_keys_below_threshold(self):
+        query = _RecordingQuery()
+        _scope_to_keys(query, self.COLUMNS, {("39", "25", "02"), ("00", "11", "01")})
+        self.assertEqual(query.calls, [(
+            "or_",
+            "and(lg_nr.eq.00,ulg_nr.eq.11,grundtext_nr.eq.01),"
+            "and(lg_nr.eq.39,ulg_nr.eq.25,grundtext_nr.eq.02)",
+        )])
+
+    def test_exact_keys_at_threshold(self):
+        query = _RecordingQuery()
+        keys = {("00", f"{i:03d}", "01") for i in range(PUSHDOWN_MAX_KEYS)}
+        _scope_to_keys(query, self.COLUMNS, keys)
+        self.assertEqual(len(query.calls), 1)
+        self.assertEqual(query.calls[0][0], "or_")
+        self.assertEqual(query.calls[0][1].count("and("), PUSHDOWN_MAX_KEYS)
+
+    def test_whole_lgs_above_threshold(self):
+        query = _RecordingQuery()
+        keys = {(f"{i % 2:02d}", f"{i // 2:02d}", "01") for i in range(PUSHDOWN_MAX_KEYS + 1)}
+        _scope_to_keys(query, self.COLUMNS, keys)
+        self.assertEqual(query.calls, [("in_", "lg_nr", ["00", "01"])])
+
+
+if __name__ == "__main__":
+    unittest.main()